@@ -11,6 +11,7 @@ notifications_bp = Blueprint('notifications', __name__)
 class NotificationQuerySchema(Schema):
     limit = fields.Int(load_default=50, validate=validate.Range(min=1, max=100))
     unread_only = fields.Bool(load_default=False)
+    cursor = fields.Str(load_default=None, allow_none=True, validate=validate.Length(equal=24))
 
 class MarkReadSchema(Schema):
     notification_id = fields.Str(required=True, validate=validate.Length(min=24, max=24))
@@ -37,7 +38,8 @@ def get_notifications():
         # Parse query parameters
         query_params = {
             'limit': request.args.get('limit', 50, type=int),
-            'unread_only': request.args.get('unread_only', 'false').lower() == 'true'
+            'unread_only': request.args.get('unread_only', 'false').lower() == 'true',
+            'cursor': request.args.get('cursor')
         }
         
         validated_data = cast(dict, NotificationQuerySchema().load(query_params))
@@ -46,7 +48,8 @@ def get_notifications():
         result = NotificationService.get_user_notifications(
             user_id=user_id,
             limit=validated_data['limit'],
-            unread_only=validated_data['unread_only']
+            unread_only=validated_data['unread_only'],
+            cursor=validated_data['cursor']
         )
         
         return jsonify({
@@ -163,14 +166,14 @@ def test_notification(notification_type: str):
         
         # Test notification creation
         if notification_type == "like":
-            notification = NotificationService.notify_like_received(
+            NotificationService.notify_like_received(
                 skill_id="507f1f77bcf86cd799439011",
                 skill_owner_id=user_id,
                 liker_id="507f1f77bcf86cd799439012",
                 skill_title="Test Skill"
             )
         elif notification_type == "comment":
-            notification = NotificationService.notify_comment_received(
+            NotificationService.notify_comment_received(
                 skill_id="507f1f77bcf86cd799439011",
                 skill_owner_id=user_id,
                 commenter_id="507f1f77bcf86cd799439012", 
@@ -178,7 +181,7 @@ def test_notification(notification_type: str):
                 comment_content="This is a test comment for the notification system!"
             )
         elif notification_type == "download":
-            notification = NotificationService.notify_skill_downloaded(
+            NotificationService.notify_skill_downloaded(
                 skill_id="507f1f77bcf86cd799439011",
                 skill_owner_id=user_id,
                 downloader_id="507f1f77bcf86cd799439012",
@@ -187,13 +190,13 @@ def test_notification(notification_type: str):
         else:
             return jsonify({"error": "Invalid notification type"}), 400
         
+        # Notifications are dispatched in the background, so there is no id to return yet
         return jsonify({
-            "message": f"Test {notification_type} notification created",
+            "message": f"Test {notification_type} notification queued",
             "notification": {
-                "id": str(notification["_id"]) if notification else None,
                 "type": notification_type
             }
-        }), 201
+        }), 202
         
     except Exception as e:
         return jsonify({"error": f"Failed to create test notification: {str(e)}"}), 500
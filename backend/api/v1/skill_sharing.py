@@ -3,8 +3,11 @@ from marshmallow import Schema, fields, ValidationError, validate
 from typing import cast
 from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from backend.auth.routes import require_auth
 from backend.services.social_service import SocialService
+from backend.repositories.shared_skill_repository import SharedSkillRepository
+from backend.services.cache_service import CacheService
 
 # Create blueprint
 skill_sharing_bp = Blueprint('skill_sharing', __name__)
@@ -63,6 +66,15 @@ def share_skill():
         if not original_skill:
             return jsonify({"error": "Skill not found or access denied"}), 404
         
+        # One share per original skill per user (unique_original_share_idx)
+        existing_shared = g.db.shared_skills.find_one({
+            "original_skill_id": original_skill["_id"],
+            "shared_by": ObjectId(current_user_id)
+        }, {"_id": 1})
+        
+        if existing_shared:
+            return jsonify({"error": "This skill has already been shared"}), 409
+        
         # Create shared skill document
         shared_skill_data = {
             "original_skill_id": original_skill["_id"],
@@ -85,8 +97,10 @@ def share_skill():
         }
         
         # Insert into shared_skills collection
+        SharedSkillRepository.add_search_fields(shared_skill_data)
         result = g.db.shared_skills.insert_one(shared_skill_data)
         shared_skill_id = str(result.inserted_id)
+        CacheService.invalidate_search_filters()
         
         # Update user's sharing stats
         g.db.users.update_one(
@@ -107,6 +121,9 @@ def share_skill():
         
     except ValidationError as e:
         return jsonify({"error": "Invalid input data", "details": e.messages}), 400
+    except DuplicateKeyError:
+        # A concurrent share of the same skill won the insert
+        return jsonify({"error": "This skill has already been shared"}), 409
     except Exception as e:
         return jsonify({"error": f"Failed to share skill: {str(e)}"}), 500
 
@@ -22,6 +22,22 @@ class CustomJSONEncoder(json.JSONEncoder):
 load_dotenv()
 
 
+def create_mongo_client(mongo_uri: str) -> MongoClient:
+    """Create the process-wide MongoDB client with a bounded connection pool"""
+    return MongoClient(
+        mongo_uri,
+        # Sized for notification fan-out: every like/comment adds background writes
+        maxPoolSize=int(os.getenv('MONGO_MAX_POOL_SIZE', 200)),
+        minPoolSize=int(os.getenv('MONGO_MIN_POOL_SIZE', 10)),
+        maxIdleTimeMS=int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 300000)),
+        waitQueueTimeoutMS=int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 10000)),
+        retryWrites=True,
+        w=os.getenv('MONGO_WRITE_CONCERN', 'majority'),
+        # Compressors whose packages aren't installed are skipped by pymongo
+        compressors=os.getenv('MONGO_COMPRESSORS', 'zstd,snappy,zlib')
+    )
+
+
 def create_app():
     app = Flask(__name__)
     app.json_encoder = CustomJSONEncoder
@@ -70,25 +86,23 @@ def create_app():
     warm_cache_on_startup()
 
 
+    # One MongoClient per worker process, shared by every request it serves
+    mongo_uri = os.getenv("MONGO_URI")
+    if mongo_uri:
+        app.extensions['mongo'] = create_mongo_client(mongo_uri)
+
     @app.before_request
     def before_request():
         try:
-            if 'db_client' not in g:
-                mongo_uri = os.getenv("MONGO_URI")
-                if not mongo_uri:
+            if 'db' not in g:
+                db_client = app.extensions.get('mongo')
+                if db_client is None:
                     raise ValueError("MONGO_URI environment variable not set.")
-                g.db_client = MongoClient(mongo_uri)
-                g.db = g.db_client.get_default_database()
+                g.db = db_client.get_default_database()
         except Exception as e:
             app.logger.critical(f"Could not connect to MongoDB: {e}")
             g.db = None 
 
-    @app.teardown_request
-    def teardown_request(exception):
-        db_client = g.pop('db_client', None)
-        if db_client is not None:
-            db_client.close()
-
     logging.basicConfig(level=logging.INFO)
     app.logger.setLevel(logging.INFO)
 
@@ -28,13 +28,25 @@ class User:
         })
 
     @staticmethod
-    def find_by_id(user_id: str):
+    def find_by_id(user_id: str, projection=None):
         try:
-            doc = g.db.users.find_one({'_id': ObjectId(user_id)})
+            doc = g.db.users.find_one({'_id': ObjectId(user_id)}, projection)
             return doc
         except:
             return None
 
+    @staticmethod
+    def find_by_ids(user_ids, projection=None):
+        object_ids = []
+        for user_id in user_ids:
+            try:
+                object_ids.append(user_id if isinstance(user_id, ObjectId) else ObjectId(user_id))
+            except:
+                continue
+        if not object_ids:
+            return []
+        return list(g.db.users.find({'_id': {'$in': object_ids}}, projection))
+
     @staticmethod
     def update_last_login(user_id: str):
         g.db.users.update_one(
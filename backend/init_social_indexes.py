@@ -17,11 +17,15 @@ Make sure your MONGO_URI environment variable is set properly.
 import os
 import sys
 from pymongo import MongoClient, TEXT, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Notifications older than this are expired by the TTL index
+NOTIFICATION_TTL_SECONDS = 30 * 24 * 3600
+
 def create_social_indexes():
     """Create indexes for social features collections"""
     
@@ -44,10 +48,17 @@ def create_social_indexes():
     shared_skills = db.shared_skills
     
     try:
-        # Text search index for title and description
-        shared_skills.create_index([("title", TEXT), ("description", TEXT)], 
-                                 name="text_search_idx")
-        print("  ✅ Text search index created")
+        # Weighted text search index for title, tags and description.
+        # A collection can only have one text index, so drop the old
+        # unweighted title/description one first.
+        try:
+            shared_skills.drop_index("text_search_idx")
+        except OperationFailure:
+            pass
+        shared_skills.create_index([("title", TEXT), ("description", TEXT), ("tags", TEXT)], 
+                                 weights={"title": 10, "tags": 5, "description": 1},
+                                 name="skill_text_idx")
+        print("  ✅ Weighted text search index created")
         
         # Category and popularity index
         shared_skills.create_index([("category", ASCENDING), ("likes_count", DESCENDING)], 
@@ -64,6 +75,24 @@ def create_social_indexes():
                                  name="recent_activity_idx")
         print("  ✅ Recent activity index created")
         
+        # Advanced search filter + sort indexes (rating/likes sort served from the index)
+        shared_skills.create_index([("visibility", ASCENDING), ("category", ASCENDING), ("difficulty", ASCENDING),
+                                  ("has_custom_tasks", ASCENDING), ("rating.average", DESCENDING),
+                                  ("likes_count", DESCENDING)], 
+                                 name="adv_search_sort_idx")
+        print("  ✅ Advanced search sort index created")
+        
+        shared_skills.create_index([("visibility", ASCENDING), ("category", ASCENDING),
+                                  ("rating.average", DESCENDING), ("likes_count", DESCENDING)], 
+                                 name="category_rating_sort_idx")
+        print("  ✅ Category rating sort index created")
+        
+        # Date-bounded advanced search index
+        shared_skills.create_index([("visibility", ASCENDING), ("created_at", DESCENDING),
+                                  ("rating.average", DESCENDING)], 
+                                 name="recent_rating_idx")
+        print("  ✅ Recent rating index created")
+        
         # Visibility and custom tasks index
         shared_skills.create_index([("visibility", ASCENDING), ("has_custom_tasks", ASCENDING)], 
                                  name="visibility_custom_tasks_idx")
@@ -74,6 +103,29 @@ def create_social_indexes():
                                  name="user_shared_skills_idx")
         print("  ✅ User shared skills index created")
         
+        # Backfill lowercased search fields for skills shared before they were stored
+        backfilled = shared_skills.update_many(
+            {"title_lower": {"$exists": False}},
+            [{"$set": {
+                "title_lower": {"$toLower": "$title"},
+                "tags_lower": {"$setUnion": [{"$map": {
+                    "input": {"$ifNull": ["$tags", []]},
+                    "as": "tag",
+                    "in": {"$toLower": "$$tag"}
+                }}]}
+            }}]
+        )
+        print(f"  ✅ Search fields backfilled on {backfilled.modified_count} skills")
+        
+        # Prefix-anchored suggestion indexes (title and tags)
+        shared_skills.create_index([("visibility", ASCENDING), ("title_lower", ASCENDING)], 
+                                 name="title_prefix_idx")
+        print("  ✅ Title prefix index created")
+        
+        shared_skills.create_index([("visibility", ASCENDING), ("tags_lower", ASCENDING)], 
+                                 name="tags_prefix_idx")
+        print("  ✅ Tags prefix index created")
+        
     except Exception as e:
         print(f"  ❌ Error creating shared_skills indexes: {e}")
     
@@ -97,6 +149,11 @@ def create_social_indexes():
                                 name="task_popularity_idx")
         print("  ✅ Task popularity index created")
         
+        # Text search index for task content
+        custom_tasks.create_index([("task.title", TEXT), ("task.description", TEXT), ("task.instructions", TEXT)], 
+                                name="task_text_idx")
+        print("  ✅ Task text search index created")
+        
         # Unique constraint: one custom task per user per skill per day
         custom_tasks.create_index([("skill_id", ASCENDING), ("day", ASCENDING), ("user_id", ASCENDING)], 
                                 unique=True, name="unique_user_task_per_day")
@@ -171,16 +228,36 @@ def create_social_indexes():
                                  name="user_notifications_idx")
         print("  ✅ User notifications index created")
         
+        # Cursor pagination index (newest first by _id)
+        notifications.create_index([("user_id", ASCENDING), ("_id", DESCENDING)], 
+                                 name="user_notifications_cursor_idx")
+        print("  ✅ User notifications cursor index created")
+        
         # Notification type and reference index
         notifications.create_index([("user_id", ASCENDING), ("notification_type", ASCENDING), 
                                   ("reference_id", ASCENDING), ("reference_type", ASCENDING)], 
                                  name="notification_dedup_idx")
         print("  ✅ Notification deduplication index created")
         
-        # Cleanup index for old notifications
-        notifications.create_index([("created_at", ASCENDING)], 
-                                 name="notification_cleanup_idx")
-        print("  ✅ Notification cleanup index created")
+        # Unread badge count index (only unread notifications are indexed)
+        notifications.create_index([("user_id", ASCENDING), ("read", ASCENDING)], 
+                                 name="unread_notifications_idx",
+                                 partialFilterExpression={"read": False})
+        print("  ✅ Unread notifications index created")
+        
+        # TTL index: MongoDB's background reaper removes notifications after 30 days
+        # (it runs about once a minute, so expiry is eventual rather than instant)
+        try:
+            notifications.create_index([("created_at", ASCENDING)], 
+                                     name="notification_cleanup_idx",
+                                     expireAfterSeconds=NOTIFICATION_TTL_SECONDS)
+        except OperationFailure:
+            # Existing non-TTL index with the same key: convert it in place
+            db.command("collMod", "notifications", index={
+                "name": "notification_cleanup_idx",
+                "expireAfterSeconds": NOTIFICATION_TTL_SECONDS
+            })
+        print("  ✅ Notification cleanup TTL index created")
         
         # Batch processing index
         notifications.create_index([("notification_type", ASCENDING), ("batch_processed", ASCENDING), 
@@ -280,6 +357,12 @@ def create_social_indexes():
                                       name="content_reports_idx")
         print("  ✅ Content reports index created")
         
+        # Report reasons per content index (auto-moderation threshold counts)
+        moderation_reports.create_index([("content_type", ASCENDING), ("content_id", ASCENDING), 
+                                       ("reason", ASCENDING)], 
+                                      name="content_report_reasons_idx")
+        print("  ✅ Content report reasons index created")
+        
         # Reporter activity index
         moderation_reports.create_index([("reporter_id", ASCENDING), ("created_at", DESCENDING)], 
                                       name="reporter_activity_idx")
@@ -295,6 +378,11 @@ def create_social_indexes():
                                       name="moderator_review_idx")
         print("  ✅ Moderator review index created")
         
+        # Response time metrics index (covers the created_at/reviewed_at window)
+        moderation_reports.create_index([("created_at", ASCENDING), ("reviewed_at", ASCENDING)], 
+                                      name="response_metrics_idx")
+        print("  ✅ Response metrics index created")
+        
         # Auto-moderation index
         moderation_reports.create_index([("is_automated", ASCENDING), ("rule_id", ASCENDING)], 
                                       name="auto_moderation_idx")
@@ -321,23 +409,55 @@ def create_social_indexes():
     except Exception as e:
         print(f"  ❌ Error creating moderation_rules indexes: {e}")
     
+    # Create indexes for the personal progress collections the social and stats services query
+    print("\n📈 Creating indexes for skills, habit_checkins and skill_completions collections...")
+    
+    try:
+        # Duplicate-title check when downloading a community skill
+        db.skills.create_index([("user_id", ASCENDING), ("title", ASCENDING)], 
+                             name="user_skill_title_idx")
+        print("  ✅ User skill title index created")
+        
+        # Stats checkin windows: equality on user and habit, range on date
+        db.habit_checkins.create_index([("user_id", ASCENDING), ("habit_id", ASCENDING), ("date", ASCENDING)], 
+                                     name="user_habit_date_idx")
+        print("  ✅ User habit date index created")
+        
+        # Stats completion windows
+        db.skill_completions.create_index([("user_id", ASCENDING), ("completed_at", ASCENDING)], 
+                                        name="user_completed_at_idx")
+        print("  ✅ User completed_at index created")
+        
+    except Exception as e:
+        print(f"  ❌ Error creating personal progress indexes: {e}")
+    
+    try:
+        # One share per original skill per user
+        shared_skills.create_index([("original_skill_id", ASCENDING), ("shared_by", ASCENDING)], 
+                                 unique=True, name="unique_original_share_idx")
+        print("  ✅ Unique original skill share index created")
+    except Exception as e:
+        print(f"  ❌ Error creating unique share index (remove duplicate shares first): {e}")
+    
     print("\n🎉 Social features indexes creation completed!")
     print("\n📋 Summary of created collections and indexes:")
-    print("  📚 shared_skills: 6 indexes (text search, category, difficulty, trending, visibility, user)")
-    print("  📝 custom_tasks: 4 indexes (skill-day, user, popularity, uniqueness)")
+    print("  📚 shared_skills: 12 indexes (weighted text search, category, difficulty, advanced search sort, category rating sort, recent rating, trending, visibility, user, title prefix, tag prefix, unique original share)")
+    print("  📝 custom_tasks: 5 indexes (skill-day, user, popularity, text search, uniqueness)")
     print("  👍 plan_interactions: 4 indexes (uniqueness, plan, user, trending)")
     print("  💬 plan_comments: 4 indexes (plan-chrono, user, threading, popularity)")
-    print("  🔔 notifications: 4 indexes (user, deduplication, cleanup, batch processing)")
+    print("  🔔 notifications: 6 indexes (user, cursor pagination, deduplication, unread, 30-day TTL cleanup, batch processing)")
     print("  👥 user_relationships: 4 indexes (uniqueness, followers, following, recent)")
     print("  📊 analytics_events: 6 indexes (user activity, event type, skill analytics, user interactions, trending, session)")
-    print("  🛡️ moderation_reports: 6 indexes (queue, content, reporter, reported user, moderator, auto-moderation)")
+    print("  🛡️ moderation_reports: 8 indexes (queue, content, content reasons, reporter, reported user, moderator, response metrics, auto-moderation)")
     print("  ⚙️ moderation_rules: 2 indexes (active rules, performance)")
+    print("  📈 skills / habit_checkins / skill_completions: 1 index each (user title, user habit date, user completed_at)")
     
     # Verify indexes were created
     print("\n🔍 Verifying indexes...")
     collections_to_check = ['shared_skills', 'custom_tasks', 'plan_interactions', 'plan_comments', 
                           'notifications', 'user_relationships', 'analytics_events', 
-                          'moderation_reports', 'moderation_rules']
+                          'moderation_reports', 'moderation_rules', 'skills', 'habit_checkins',
+                          'skill_completions']
     
     for collection_name in collections_to_check:
         collection = db[collection_name]
@@ -0,0 +1,55 @@
+from dataclasses import dataclass, fields
+from typing import Dict, Any
+
+class NotificationPayload:
+    """Base for the structured data stored on each notification type"""
+    __slots__ = ()
+
+    def to_data(self) -> Dict[str, Any]:
+        """Plain dict for the Mongo document, built only at the storage boundary"""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+@dataclass(slots=True, frozen=True)
+class LikeNotification(NotificationPayload):
+    skill_title: str
+    liker_name: str
+
+@dataclass(slots=True, frozen=True)
+class CommentNotification(NotificationPayload):
+    skill_title: str
+    commenter_name: str
+    comment_preview: str
+
+@dataclass(slots=True, frozen=True)
+class ReplyNotification(NotificationPayload):
+    skill_title: str
+    skill_id: str
+    replier_name: str
+    reply_preview: str
+
+@dataclass(slots=True, frozen=True)
+class DownloadNotification(NotificationPayload):
+    skill_title: str
+    downloader_name: str
+
+@dataclass(slots=True, frozen=True)
+class CustomTaskNotification(NotificationPayload):
+    skill_title: str
+    contributor_name: str
+    day: int
+    task_title: str
+
+@dataclass(slots=True, frozen=True)
+class TaskVoteNotification(NotificationPayload):
+    skill_title: str
+    task_title: str
+    voter_name: str
+    vote_type: str
+
+@dataclass(slots=True, frozen=True)
+class RatingNotification(NotificationPayload):
+    skill_title: str
+    rater_name: str
+    rating: int
+    stars: str
+    review_preview: str
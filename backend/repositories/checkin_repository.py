@@ -44,6 +44,30 @@ class CheckinRepository:
             "completed": True
         })
 
+    def find_completed_by_day(self, user_id: str, habit_ids: list, start_date, end_date) -> dict:
+        """Map (habit_id, "YYYY-MM-DD") to that day's completed checkin within a date range"""
+        pipeline = [
+            {"$match": {
+                "user_id": user_id,
+                "habit_id": {"$in": habit_ids},
+                "date": {"$gte": start_date, "$lt": end_date},
+                "completed": True
+            }},
+            {"$sort": {"date": 1}},
+            {"$group": {
+                "_id": {
+                    "habit_id": "$habit_id",
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}}
+                },
+                "checked_in_at": {"$first": "$checked_in_at"}
+            }}
+        ]
+        
+        return {
+            (result["_id"]["habit_id"], result["_id"]["day"]): {"checked_in_at": result.get("checked_in_at")}
+            for result in self.collection.aggregate(pipeline)
+        }
+
     def delete_by_habit_id(self, habit_id: str, user_id: str) -> DeleteResult:
         return self.collection.delete_many({
             "habit_id": habit_id,
@@ -70,6 +94,21 @@ class CheckinRepository:
             return_document=ReturnDocument.AFTER
         )
 
+    def count_recent_by_habit(self, user_id: str, habit_ids: list, days: int) -> dict:
+        """Map habit_id to its number of checkins over the last `days` days, in one aggregation"""
+        from datetime import datetime, timedelta
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        pipeline = [
+            {"$match": {
+                "user_id": user_id,
+                "habit_id": {"$in": habit_ids},
+                "date": {"$gte": cutoff_date}
+            }},
+            {"$group": {"_id": "$habit_id", "count": {"$sum": 1}}}
+        ]
+        
+        return {result["_id"]: result["count"] for result in self.collection.aggregate(pipeline)}
+
     def get_recent_for_habit(self, habit_id, days):
         from datetime import datetime, timedelta
         cutoff_date = datetime.utcnow() - timedelta(days=days)
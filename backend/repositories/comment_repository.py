@@ -2,6 +2,7 @@ from bson import ObjectId
 from pymongo.results import InsertOneResult, UpdateResult, DeleteResult
 from datetime import datetime
 from typing import List, Dict, Optional
+from backend.repositories.utils import IdLike, to_object_id
 
 class CommentRepository:
     """Repository for managing comments on shared skills"""
@@ -18,18 +19,18 @@ class CommentRepository:
         result: InsertOneResult = self.collection.insert_one(comment_data)
         return self.collection.find_one({"_id": result.inserted_id})
 
-    def find_by_id(self, comment_id: str) -> Optional[Dict]:
+    def find_by_id(self, comment_id: IdLike) -> Optional[Dict]:
         """Find a comment by its ID"""
         try:
-            return self.collection.find_one({"_id": ObjectId(comment_id)})
+            return self.collection.find_one({"_id": to_object_id(comment_id)})
         except:
             return None
 
-    def find_by_plan(self, plan_id: str, limit: int = 100) -> List[Dict]:
+    def find_by_plan(self, plan_id: IdLike, limit: int = 100) -> List[Dict]:
         """Find comments for a specific plan, organized for threading"""
         # First get all comments for the plan
         all_comments = list(self.collection.find({
-            "plan_id": ObjectId(plan_id)
+            "plan_id": to_object_id(plan_id)
         }).sort("created_at", 1))
         
         # Organize into nested structure
@@ -51,19 +52,39 @@ class CommentRepository:
         
         return root_comments[:limit]
 
-    def find_by_user(self, user_id: str, limit: int = 50) -> List[Dict]:
-        """Find comments made by a specific user"""
-        return list(self.collection.find({
-            "user_id": ObjectId(user_id)
-        }).sort("created_at", -1).limit(limit))
+    def find_by_user(self, user_id: IdLike, limit: int = 50, content_preview: Optional[int] = None) -> List[Dict]:
+        """Find comments made by a specific user
+
+        When content_preview is set, content is truncated server-side to that
+        many characters and a content_truncated flag is returned instead of
+        the full comment document.
+        """
+        if content_preview is None:
+            return list(self.collection.find({
+                "user_id": to_object_id(user_id)
+            }).sort("created_at", -1).limit(limit))
+        
+        pipeline = [
+            {"$match": {"user_id": to_object_id(user_id)}},
+            {"$sort": {"created_at": -1}},
+            {"$limit": limit},
+            {"$project": {
+                "plan_id": 1,
+                "created_at": 1,
+                "content": {"$substrCP": ["$content", 0, content_preview]},
+                "content_truncated": {"$gt": [{"$strLenCP": "$content"}, content_preview]}
+            }}
+        ]
+        
+        return list(self.collection.aggregate(pipeline))
 
-    def find_replies(self, parent_comment_id: str) -> List[Dict]:
+    def find_replies(self, parent_comment_id: IdLike) -> List[Dict]:
         """Find direct replies to a comment"""
         return list(self.collection.find({
-            "parent_comment_id": ObjectId(parent_comment_id)
+            "parent_comment_id": to_object_id(parent_comment_id)
         }).sort("created_at", 1))
 
-    def get_comment_thread(self, comment_id: str, max_depth: int = 3) -> Dict:
+    def get_comment_thread(self, comment_id: IdLike, max_depth: int = 3) -> Dict:
         """Get a comment and all its nested replies up to max_depth"""
         def get_replies_recursive(comment_obj: Dict, current_depth: int) -> Dict:
             if current_depth >= max_depth:
@@ -85,30 +106,30 @@ class CommentRepository:
             
         return get_replies_recursive(root_comment, 0)
 
-    def increment_likes(self, comment_id: str) -> UpdateResult:
+    def increment_likes(self, comment_id: IdLike) -> UpdateResult:
         """Increment likes count for a comment"""
         return self.collection.update_one(
-            {"_id": ObjectId(comment_id)},
+            {"_id": to_object_id(comment_id)},
             {
                 "$inc": {"likes_count": 1},
                 "$set": {"updated_at": datetime.utcnow()}
             }
         )
 
-    def decrement_likes(self, comment_id: str) -> UpdateResult:
+    def decrement_likes(self, comment_id: IdLike) -> UpdateResult:
         """Decrement likes count for a comment"""
         return self.collection.update_one(
-            {"_id": ObjectId(comment_id)},
+            {"_id": to_object_id(comment_id)},
             {
                 "$inc": {"likes_count": -1},
                 "$set": {"updated_at": datetime.utcnow()}
             }
         )
 
-    def update_comment(self, comment_id: str, user_id: str, content: str) -> UpdateResult:
+    def update_comment(self, comment_id: IdLike, user_id: IdLike, content: str) -> UpdateResult:
         """Update a comment (only by the author)"""
         return self.collection.update_one(
-            {"_id": ObjectId(comment_id), "user_id": ObjectId(user_id)},
+            {"_id": to_object_id(comment_id), "user_id": to_object_id(user_id)},
             {
                 "$set": {
                     "content": content,
@@ -117,29 +138,29 @@ class CommentRepository:
             }
         )
 
-    def delete_comment(self, comment_id: str, user_id: str) -> DeleteResult:
+    def delete_comment(self, comment_id: IdLike, user_id: IdLike) -> DeleteResult:
         """Delete a comment (only by the author)"""
         return self.collection.delete_one({
-            "_id": ObjectId(comment_id),
-            "user_id": ObjectId(user_id)
+            "_id": to_object_id(comment_id),
+            "user_id": to_object_id(user_id)
         })
 
-    def delete_comment_and_replies(self, comment_id: str, user_id: str) -> int:
+    def delete_comment_and_replies(self, comment_id: IdLike, user_id: IdLike) -> int:
         """Delete a comment and all its replies (only by the author)"""
         # First verify ownership of the root comment
         root_comment = self.collection.find_one({
-            "_id": ObjectId(comment_id),
-            "user_id": ObjectId(user_id)
+            "_id": to_object_id(comment_id),
+            "user_id": to_object_id(user_id)
         })
         
         if not root_comment:
             return 0
         
         # Get all reply IDs recursively
-        def get_all_reply_ids(parent_id: str) -> List[ObjectId]:
+        def get_all_reply_ids(parent_id: IdLike) -> List[ObjectId]:
             reply_ids = []
             replies = list(self.collection.find(
-                {"parent_comment_id": ObjectId(parent_id)},
+                {"parent_comment_id": to_object_id(parent_id)},
                 {"_id": 1}
             ))
             
@@ -151,17 +172,17 @@ class CommentRepository:
             return reply_ids
         
         # Get all IDs to delete (root + all replies)
-        all_ids_to_delete = [ObjectId(comment_id)]
+        all_ids_to_delete = [to_object_id(comment_id)]
         all_ids_to_delete.extend(get_all_reply_ids(comment_id))
         
         # Delete all comments
         result = self.collection.delete_many({"_id": {"$in": all_ids_to_delete}})
         return result.deleted_count
 
-    def get_plan_comment_stats(self, plan_id: str) -> Dict:
+    def get_plan_comment_stats(self, plan_id: IdLike) -> Dict:
         """Get comment statistics for a plan"""
         pipeline = [
-            {"$match": {"plan_id": ObjectId(plan_id)}},
+            {"$match": {"plan_id": to_object_id(plan_id)}},
             {"$group": {
                 "_id": None,
                 "total_comments": {"$sum": 1},
@@ -205,10 +226,10 @@ class CommentRepository:
             "unique_commenters": 0
         }
 
-    def get_user_comment_stats(self, user_id: str) -> Dict:
+    def get_user_comment_stats(self, user_id: IdLike) -> Dict:
         """Get comment statistics for a user"""
         pipeline = [
-            {"$match": {"user_id": ObjectId(user_id)}},
+            {"$match": {"user_id": to_object_id(user_id)}},
             {"$group": {
                 "_id": None,
                 "total_comments": {"$sum": 1},
@@ -234,25 +255,25 @@ class CommentRepository:
         """Get recent comments, optionally filtered by plan"""
         query = {}
         if plan_id:
-            query["plan_id"] = ObjectId(plan_id)
+            query["plan_id"] = to_object_id(plan_id)
         
         return list(self.collection.find(query)
                    .sort("created_at", -1)
                    .limit(limit))
 
-    def count_comments_for_plan(self, plan_id: str) -> int:
+    def count_comments_for_plan(self, plan_id: IdLike) -> int:
         """Count total comments for a plan"""
-        return self.collection.count_documents({"plan_id": ObjectId(plan_id)})
+        return self.collection.count_documents({"plan_id": to_object_id(plan_id)})
 
-    def count_comments_by_user(self, user_id: str) -> int:
+    def count_comments_by_user(self, user_id: IdLike) -> int:
         """Count comments made by a user"""
-        return self.collection.count_documents({"user_id": ObjectId(user_id)})
+        return self.collection.count_documents({"user_id": to_object_id(user_id)})
 
     def get_most_liked_comments(self, plan_id: Optional[str] = None, limit: int = 10) -> List[Dict]:
         """Get most liked comments, optionally for a specific plan"""
         query = {"likes_count": {"$gt": 0}}
         if plan_id:
-            query["plan_id"] = ObjectId(plan_id)
+            query["plan_id"] = to_object_id(plan_id)
         
         return list(self.collection.find(query)
                    .sort([("likes_count", -1), ("created_at", -1)])
@@ -265,7 +286,7 @@ class CommentRepository:
         }
         
         if plan_id:
-            search_filter["plan_id"] = ObjectId(plan_id)
+            search_filter["plan_id"] = to_object_id(plan_id)
         
         return list(self.collection.find(search_filter)
                    .sort("created_at", -1)
@@ -168,6 +168,16 @@ class CustomTaskRepository:
         """Count custom tasks for a specific skill"""
         return self.collection.count_documents({"skill_id": ObjectId(skill_id)})
 
+    def count_tasks_for_skills(self, skill_ids: List[ObjectId]) -> Dict[ObjectId, int]:
+        """Count custom tasks for several skills in one aggregation"""
+        if not skill_ids:
+            return {}
+        pipeline = [
+            {"$match": {"skill_id": {"$in": skill_ids}}},
+            {"$group": {"_id": "$skill_id", "count": {"$sum": 1}}}
+        ]
+        return {result["_id"]: result["count"] for result in self.collection.aggregate(pipeline)}
+
     def count_tasks_by_user(self, user_id: str) -> int:
         """Count custom tasks created by a user"""
         return self.collection.count_documents({"user_id": ObjectId(user_id)})
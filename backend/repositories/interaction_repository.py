@@ -1,7 +1,7 @@
-from bson import ObjectId
 from pymongo.results import InsertOneResult, UpdateResult, DeleteResult
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from backend.repositories.utils import IdLike, to_object_id
 
 class InteractionRepository:
     """Repository for managing user interactions with shared skills (likes, downloads, ratings)"""
@@ -9,12 +9,15 @@ class InteractionRepository:
     def __init__(self, db_collection):
         self.collection = db_collection
 
-    def upsert_interaction(self, user_id: str, plan_id: str, interaction_type: str, data: Dict = None) -> Dict:
+    def upsert_interaction(self, user_id: IdLike, plan_id: IdLike, interaction_type: str, data: Dict = None) -> Dict:
         """Upsert an interaction (like, download, rate)"""
+        interaction_filter = {
+            "user_id": to_object_id(user_id),
+            "plan_id": to_object_id(plan_id),
+            "interaction_type": interaction_type
+        }
         interaction_data = {
-            "user_id": ObjectId(user_id),
-            "plan_id": ObjectId(plan_id),
-            "interaction_type": interaction_type,
+            **interaction_filter,
             "created_at": datetime.utcnow()
         }
         
@@ -25,78 +28,108 @@ class InteractionRepository:
 
         # Use upsert to replace existing interaction of same type
         result = self.collection.replace_one(
-            {
-                "user_id": ObjectId(user_id),
-                "plan_id": ObjectId(plan_id),
-                "interaction_type": interaction_type
-            },
+            interaction_filter,
             interaction_data,
             upsert=True
         )
 
         # Return the interaction document
-        return self.collection.find_one({
-            "user_id": ObjectId(user_id),
-            "plan_id": ObjectId(plan_id),
-            "interaction_type": interaction_type
-        })
+        return self.collection.find_one(interaction_filter)
 
-    def remove_interaction(self, user_id: str, plan_id: str, interaction_type: str) -> DeleteResult:
+    def remove_interaction(self, user_id: IdLike, plan_id: IdLike, interaction_type: str) -> DeleteResult:
         """Remove a specific interaction"""
         return self.collection.delete_one({
-            "user_id": ObjectId(user_id),
-            "plan_id": ObjectId(plan_id),
+            "user_id": to_object_id(user_id),
+            "plan_id": to_object_id(plan_id),
             "interaction_type": interaction_type
         })
 
-    def get_user_interaction(self, user_id: str, plan_id: str, interaction_type: str) -> Optional[Dict]:
+    def get_user_interaction(self, user_id: IdLike, plan_id: IdLike, interaction_type: str) -> Optional[Dict]:
         """Get a specific interaction by user and plan"""
         return self.collection.find_one({
-            "user_id": ObjectId(user_id),
-            "plan_id": ObjectId(plan_id),
+            "user_id": to_object_id(user_id),
+            "plan_id": to_object_id(plan_id),
             "interaction_type": interaction_type
         })
 
-    def get_user_interactions(self, user_id: str, interaction_type: Optional[str] = None) -> List[Dict]:
+    def get_user_interactions(self, user_id: IdLike, interaction_type: Optional[str] = None) -> List[Dict]:
         """Get all interactions for a user, optionally filtered by type"""
-        query = {"user_id": ObjectId(user_id)}
+        query = {"user_id": to_object_id(user_id)}
         
         if interaction_type:
             query["interaction_type"] = interaction_type
             
         return list(self.collection.find(query).sort("created_at", -1))
 
-    def get_plan_interactions(self, plan_id: str, interaction_type: Optional[str] = None) -> List[Dict]:
+    def get_plan_interactions(self, plan_id: IdLike, interaction_type: Optional[str] = None) -> List[Dict]:
         """Get all interactions for a plan, optionally filtered by type"""
-        query = {"plan_id": ObjectId(plan_id)}
+        query = {"plan_id": to_object_id(plan_id)}
         
         if interaction_type:
             query["interaction_type"] = interaction_type
             
         return list(self.collection.find(query).sort("created_at", -1))
 
-    def get_plan_stats(self, plan_id: str) -> Dict:
+    _PLAN_STATS_GROUP = {
+        "$group": {
+            "_id": "$interaction_type",
+            "count": {"$sum": 1},
+            "avg_rating": {
+                "$avg": {
+                    "$cond": [
+                        {"$eq": ["$interaction_type", "rate"]},
+                        "$rating",
+                        None
+                    ]
+                }
+            }
+        }
+    }
+
+    def get_plan_stats(self, plan_id: IdLike) -> Dict:
         """Get interaction statistics for a plan"""
         pipeline = [
-            {"$match": {"plan_id": ObjectId(plan_id)}},
-            {"$group": {
-                "_id": "$interaction_type",
-                "count": {"$sum": 1},
-                "avg_rating": {
-                    "$avg": {
-                        "$cond": [
-                            {"$eq": ["$interaction_type", "rate"]},
-                            "$rating",
-                            None
-                        ]
-                    }
-                }
-            }}
+            {"$match": {"plan_id": to_object_id(plan_id)}},
+            self._PLAN_STATS_GROUP
         ]
         
-        results = list(self.collection.aggregate(pipeline))
+        return self._format_plan_stats(self.collection.aggregate(pipeline))
+
+    def get_plan_stats_with_user(self, plan_id: IdLike, user_id: Optional[IdLike] = None) -> Tuple[Dict, Dict]:
+        """Get a plan's interaction statistics and, optionally, one user's interactions with it
+
+        Both come from a single $facet over the plan's interactions. The user
+        part is an empty dict when no user_id is given.
+        """
+        facets = {"stats": [self._PLAN_STATS_GROUP]}
+        if user_id:
+            facets["user"] = [
+                {"$match": {"user_id": to_object_id(user_id)}},
+                {"$project": {"_id": 0, "interaction_type": 1, "rating": 1}}
+            ]
+        
+        pipeline = [
+            {"$match": {"plan_id": to_object_id(plan_id)}},
+            {"$facet": facets}
+        ]
+        
+        result = next(self.collection.aggregate(pipeline), {})
+        stats = self._format_plan_stats(result.get("stats", []))
         
-        # Format the results into a more usable structure
+        user_interactions = {}
+        if user_id:
+            by_type = {interaction["interaction_type"]: interaction for interaction in result.get("user", [])}
+            user_interactions = {
+                "has_liked": "like" in by_type,
+                "has_downloaded": "download" in by_type,
+                "user_rating": by_type["rate"].get("rating") if "rate" in by_type else None
+            }
+        
+        return stats, user_interactions
+
+    @staticmethod
+    def _format_plan_stats(results) -> Dict:
+        """Format per-interaction-type group results into a more usable structure"""
         stats = {
             "likes": 0,
             "downloads": 0,
@@ -118,59 +151,59 @@ class InteractionRepository:
         
         return stats
 
-    def get_user_liked_plans(self, user_id: str) -> List[Dict]:
+    def get_user_liked_plans(self, user_id: IdLike) -> List[Dict]:
         """Get all plans liked by a user"""
         return list(self.collection.find({
-            "user_id": ObjectId(user_id),
+            "user_id": to_object_id(user_id),
             "interaction_type": "like"
         }).sort("created_at", -1))
 
-    def get_user_downloaded_plans(self, user_id: str) -> List[Dict]:
+    def get_user_downloaded_plans(self, user_id: IdLike) -> List[Dict]:
         """Get all plans downloaded by a user"""
         return list(self.collection.find({
-            "user_id": ObjectId(user_id),
+            "user_id": to_object_id(user_id),
             "interaction_type": "download"
         }).sort("created_at", -1))
 
-    def get_user_rated_plans(self, user_id: str) -> List[Dict]:
+    def get_user_rated_plans(self, user_id: IdLike) -> List[Dict]:
         """Get all plans rated by a user"""
         return list(self.collection.find({
-            "user_id": ObjectId(user_id),
+            "user_id": to_object_id(user_id),
             "interaction_type": "rate"
         }).sort("created_at", -1))
 
-    def check_user_has_liked(self, user_id: str, plan_id: str) -> bool:
+    def check_user_has_liked(self, user_id: IdLike, plan_id: IdLike) -> bool:
         """Check if user has liked a specific plan"""
         count = self.collection.count_documents({
-            "user_id": ObjectId(user_id),
-            "plan_id": ObjectId(plan_id),
+            "user_id": to_object_id(user_id),
+            "plan_id": to_object_id(plan_id),
             "interaction_type": "like"
         })
         return count > 0
 
-    def check_user_has_downloaded(self, user_id: str, plan_id: str) -> bool:
+    def check_user_has_downloaded(self, user_id: IdLike, plan_id: IdLike) -> bool:
         """Check if user has downloaded a specific plan"""
         count = self.collection.count_documents({
-            "user_id": ObjectId(user_id),
-            "plan_id": ObjectId(plan_id),
+            "user_id": to_object_id(user_id),
+            "plan_id": to_object_id(plan_id),
             "interaction_type": "download"
         })
         return count > 0
 
-    def get_user_rating_for_plan(self, user_id: str, plan_id: str) -> Optional[int]:
+    def get_user_rating_for_plan(self, user_id: IdLike, plan_id: IdLike) -> Optional[int]:
         """Get user's rating for a specific plan"""
         interaction = self.collection.find_one({
-            "user_id": ObjectId(user_id),
-            "plan_id": ObjectId(plan_id),
+            "user_id": to_object_id(user_id),
+            "plan_id": to_object_id(plan_id),
             "interaction_type": "rate"
         })
         return interaction.get("rating") if interaction else None
 
-    def get_rating_distribution(self, plan_id: str) -> Dict:
+    def get_rating_distribution(self, plan_id: IdLike) -> Dict:
         """Get rating distribution for a plan"""
         pipeline = [
             {"$match": {
-                "plan_id": ObjectId(plan_id),
+                "plan_id": to_object_id(plan_id),
                 "interaction_type": "rate"
             }},
             {"$group": {
@@ -225,10 +258,10 @@ class InteractionRepository:
         
         return list(self.collection.aggregate(pipeline))
 
-    def get_user_interaction_stats(self, user_id: str) -> Dict:
+    def get_user_interaction_stats(self, user_id: IdLike) -> Dict:
         """Get interaction statistics for a user"""
         pipeline = [
-            {"$match": {"user_id": ObjectId(user_id)}},
+            {"$match": {"user_id": to_object_id(user_id)}},
             {"$group": {
                 "_id": "$interaction_type",
                 "count": {"$sum": 1}
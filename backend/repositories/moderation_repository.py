@@ -1,7 +1,27 @@
-from bson import ObjectId
 from pymongo.results import InsertOneResult, UpdateResult, DeleteResult
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from backend.repositories.utils import IdLike, to_object_id
+
+# Reported content type -> (collection, fields needed for the queue preview)
+CONTENT_PREVIEW_SOURCES = {
+    "skill": ("shared_skills", {"title": 1, "description": 1, "category": 1, "difficulty": 1}),
+    "comment": ("plan_comments", {"content": 1, "likes_count": 1}),
+    "user": ("users", {"username": 1, "bio": 1, "created_at": 1}),
+    "custom_task": ("custom_tasks", {"title": 1, "description": 1, "day": 1})
+}
+
+# Fields read by the report listings and the credibility/duplicate checks
+REPORT_SUMMARY_PROJECTION = {
+    "_id": 1,
+    "content_type": 1,
+    "content_id": 1,
+    "reason": 1,
+    "status": 1,
+    "created_at": 1,
+    "priority_score": 1,
+    "reporter_id": 1
+}
 
 class ModerationRepository:
     """Repository for managing content moderation and reporting"""
@@ -25,31 +45,64 @@ class ModerationRepository:
                    .skip(skip)
                    .limit(limit))
 
-    def get_reports_by_content(self, content_type: str, content_id: str) -> List[Dict]:
+    def get_reports_by_content(self, content_type: str, content_id: IdLike) -> List[Dict]:
         """Get all reports for a specific piece of content"""
         return list(self.collection.find({
             "content_type": content_type,
-            "content_id": ObjectId(content_id)
-        }).sort("created_at", -1))
+            "content_id": to_object_id(content_id)
+        }, REPORT_SUMMARY_PROJECTION).sort("created_at", -1))
+
+    def user_has_reported(self, reporter_id: IdLike, content_type: str, content_id: IdLike) -> bool:
+        """Check whether a user has already reported a specific piece of content"""
+        return self.collection.count_documents({
+            "reporter_id": to_object_id(reporter_id),
+            "content_type": content_type,
+            "content_id": to_object_id(content_id)
+        }, limit=1) > 0
+
+    def get_reason_counts(self, content_type: str, content_id: IdLike) -> Dict[str, int]:
+        """Count reports for a piece of content grouped by reason"""
+        pipeline = [
+            {"$match": {
+                "content_type": content_type,
+                "content_id": to_object_id(content_id)
+            }},
+            {"$group": {
+                "_id": "$reason",
+                "n": {"$sum": 1}
+            }}
+        ]
+        
+        return {
+            (result["_id"] or "other"): result["n"]
+            for result in self.collection.aggregate(pipeline)
+        }
 
-    def get_reports_by_user(self, user_id: str, limit: int = 20) -> List[Dict]:
+    def get_reports_by_user(self, user_id: IdLike, limit: int = 20) -> List[Dict]:
         """Get reports filed by a specific user"""
-        return list(self.collection.find({"reporter_id": ObjectId(user_id)})
+        return list(self.collection.find({"reporter_id": to_object_id(user_id)}, REPORT_SUMMARY_PROJECTION)
                    .sort("created_at", -1)
                    .limit(limit))
 
-    def get_reports_against_user(self, user_id: str, limit: int = 20) -> List[Dict]:
+    def count_reports_by_user_since(self, user_id: IdLike, since: datetime, limit: int = 0) -> int:
+        """Count reports filed by a user since a point in time"""
+        return self.collection.count_documents({
+            "reporter_id": to_object_id(user_id),
+            "created_at": {"$gte": since}
+        }, limit=limit)
+
+    def get_reports_against_user(self, user_id: IdLike, limit: int = 20) -> List[Dict]:
         """Get reports filed against a specific user's content"""
-        return list(self.collection.find({"reported_user_id": ObjectId(user_id)})
+        return list(self.collection.find({"reported_user_id": to_object_id(user_id)}, REPORT_SUMMARY_PROJECTION)
                    .sort("created_at", -1)
                    .limit(limit))
 
-    def update_report_status(self, report_id: str, status: str, moderator_id: str, 
+    def update_report_status(self, report_id: IdLike, status: str, moderator_id: IdLike, 
                            resolution_notes: str = None) -> UpdateResult:
         """Update report status and add moderation notes"""
         update_data = {
             "status": status,
-            "moderator_id": ObjectId(moderator_id),
+            "moderator_id": to_object_id(moderator_id),
             "reviewed_at": datetime.utcnow()
         }
         
@@ -60,7 +113,7 @@ class ModerationRepository:
             update_data["resolved_at"] = datetime.utcnow()
         
         return self.collection.update_one(
-            {"_id": ObjectId(report_id)},
+            {"_id": to_object_id(report_id)},
             {"$set": update_data}
         )
 
@@ -68,8 +121,100 @@ class ModerationRepository:
         """Get moderation statistics"""
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
+        pipeline = [{"$match": {"created_at": {"$gte": cutoff_date}}}] + self._status_breakdown_stages()
+        results = list(self.collection.aggregate(pipeline))
+        
+        return self._format_status_breakdown(results, days)
+
+    def get_frequent_reporters(self, limit: int = 10, days: int = 30) -> List[Dict]:
+        """Get users who file reports frequently"""
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        
+        pipeline = [{"$match": {"created_at": {"$gte": cutoff_date}}}] + self._frequent_reporters_stages(limit)
+        return list(self.collection.aggregate(pipeline))
+
+    def get_frequently_reported_content(self, limit: int = 10, days: int = 30) -> List[Dict]:
+        """Get content that gets reported frequently"""
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        
+        pipeline = [{"$match": {"created_at": {"$gte": cutoff_date}}}] + self._frequently_reported_stages(limit)
+        return list(self.collection.aggregate(pipeline))
+
+    def get_moderation_dashboard(self, days: int = 30, limit: int = 10) -> Dict:
+        """Get stats, top reporters/content, response metrics and insight flags in one aggregation"""
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        
         pipeline = [
             {"$match": {"created_at": {"$gte": cutoff_date}}},
+            {"$facet": {
+                "by_status": self._status_breakdown_stages(),
+                "frequent_reporters": self._frequent_reporters_stages(limit),
+                "frequently_reported": self._frequently_reported_stages(limit),
+                "response_metrics": [
+                    {"$match": {"reviewed_at": {"$exists": True}}},
+                    {"$project": {
+                        "_id": 0,
+                        "response_time_hours": {
+                            "$divide": [
+                                {"$subtract": ["$reviewed_at", "$created_at"]},
+                                3600000  # Convert milliseconds to hours
+                            ]
+                        }
+                    }},
+                    {"$group": {
+                        "_id": None,
+                        "avg_response_time": {"$avg": "$response_time_hours"},
+                        "max_response_time": {"$max": "$response_time_hours"},
+                        "min_response_time": {"$min": "$response_time_hours"},
+                        "total_resolved": {"$sum": 1}
+                    }}
+                ]
+            }},
+            # Totals and the insight thresholds are derived server-side from the status facet
+            {"$addFields": {
+                "totals": {
+                    "total": {"$sum": "$by_status.total"},
+                    "pending": {"$sum": {"$map": {
+                        "input": {"$filter": {"input": "$by_status", "cond": {"$eq": ["$$this._id", "pending"]}}},
+                        "in": "$$this.total"
+                    }}},
+                    "resolved": {"$sum": {"$map": {
+                        "input": {"$filter": {"input": "$by_status", "cond": {"$eq": ["$$this._id", "resolved"]}}},
+                        "in": "$$this.total"
+                    }}}
+                }
+            }},
+            {"$addFields": {
+                "insight_flags": {
+                    "high_pending": {"$and": [
+                        {"$gt": ["$totals.total", 0]},
+                        {"$gt": ["$totals.pending", {"$multiply": ["$totals.total", 0.3]}]}
+                    ]},
+                    "high_resolution_rate": {"$and": [
+                        {"$gt": ["$totals.resolved", 0]},
+                        {"$gt": ["$totals.resolved", {"$multiply": ["$totals.total", 0.8]}]}
+                    ]},
+                    "low_resolution_rate": {"$and": [
+                        {"$gt": ["$totals.resolved", 0]},
+                        {"$lte": ["$totals.resolved", {"$multiply": ["$totals.total", 0.8]}]}
+                    ]}
+                }
+            }}
+        ]
+        
+        result = next(self.collection.aggregate(pipeline), None) or {}
+        
+        return {
+            **self._format_status_breakdown(result.get("by_status", []), days),
+            "frequent_reporters": result.get("frequent_reporters", []),
+            "frequently_reported_content": result.get("frequently_reported", []),
+            "response_metrics": next(iter(result.get("response_metrics", [])), None),
+            "insight_flags": result.get("insight_flags", {})
+        }
+
+    @staticmethod
+    def _status_breakdown_stages() -> List[Dict]:
+        return [
             {"$group": {
                 "_id": {
                     "status": "$status",
@@ -90,27 +235,20 @@ class ModerationRepository:
                 }
             }}
         ]
-        
-        results = list(self.collection.aggregate(pipeline))
-        
-        stats = {
+
+    @staticmethod
+    def _format_status_breakdown(results: List[Dict], days: int) -> Dict:
+        return {
             "period_days": days,
             "total_reports": sum(r["total"] for r in results),
             "by_status": {r["_id"]: r["total"] for r in results},
             "detailed_breakdown": results
         }
-        
-        return stats
 
-    def get_frequent_reporters(self, limit: int = 10, days: int = 30) -> List[Dict]:
-        """Get users who file reports frequently"""
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        
-        pipeline = [
-            {"$match": {
-                "created_at": {"$gte": cutoff_date},
-                "reporter_id": {"$ne": None}
-            }},
+    @staticmethod
+    def _frequent_reporters_stages(limit: int) -> List[Dict]:
+        return [
+            {"$match": {"reporter_id": {"$ne": None}}},
             {"$group": {
                 "_id": "$reporter_id",
                 "report_count": {"$sum": 1},
@@ -134,15 +272,10 @@ class ModerationRepository:
                 "report_types": 1
             }}
         ]
-        
-        return list(self.collection.aggregate(pipeline))
 
-    def get_frequently_reported_content(self, limit: int = 10, days: int = 30) -> List[Dict]:
-        """Get content that gets reported frequently"""
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        
-        pipeline = [
-            {"$match": {"created_at": {"$gte": cutoff_date}}},
+    @staticmethod
+    def _frequently_reported_stages(limit: int) -> List[Dict]:
+        return [
             {"$group": {
                 "_id": {
                     "content_type": "$content_type",
@@ -159,8 +292,6 @@ class ModerationRepository:
             {"$sort": {"report_count": -1}},
             {"$limit": limit}
         ]
-        
-        return list(self.collection.aggregate(pipeline))
 
     def calculate_priority_score(self, report_data: Dict) -> int:
         """Calculate priority score for a report"""
@@ -200,17 +331,17 @@ class ModerationRepository:
         update_data['bulk_updated_at'] = datetime.utcnow()
         
         return self.collection.update_many(
-            {"_id": {"$in": [ObjectId(rid) for rid in report_ids]}},
+            {"_id": {"$in": [to_object_id(rid) for rid in report_ids]}},
             {"$set": update_data}
         )
 
-    def get_moderation_queue(self, moderator_id: str = None, limit: int = 20) -> List[Dict]:
+    def get_moderation_queue(self, moderator_id: IdLike = None, limit: int = 20) -> List[Dict]:
         """Get moderation queue with prioritized reports"""
         query = {"status": "pending"}
         
         if moderator_id:
             # Optionally filter by assigned moderator
-            query["assigned_moderator_id"] = ObjectId(moderator_id)
+            query["assigned_moderator_id"] = to_object_id(moderator_id)
         
         pipeline = [
             {"$match": query},
@@ -219,22 +350,40 @@ class ModerationRepository:
             }},
             {"$sort": {"priority_score": -1, "created_at": 1}},
             {"$limit": limit},
-            {"$lookup": {
-                "from": "users",
-                "localField": "reporter_id",
-                "foreignField": "_id",
-                "as": "reporter_info"
-            }},
-            {"$lookup": {
-                "from": "users",
-                "localField": "reported_user_id",
-                "foreignField": "_id",
-                "as": "reported_user_info"
+            {"$project": {
+                "content_type": 1,
+                "content_id": 1,
+                "reason": 1,
+                "description": 1,
+                "priority_score": 1,
+                "created_at": 1,
+                "reporter_id": 1,
+                "reported_user_id": 1
             }}
         ]
         
         return list(self.collection.aggregate(pipeline))
 
+    def get_content_previews(self, content_refs) -> Dict[tuple, Dict]:
+        """Load preview fields for reported content, one $in query per content type
+
+        content_refs is an iterable of (content_type, content_id) pairs; the
+        result is keyed the same way.
+        """
+        ids_by_type = {}
+        for content_type, content_id in content_refs:
+            if content_type in CONTENT_PREVIEW_SOURCES and content_id:
+                ids_by_type.setdefault(content_type, set()).add(content_id)
+        
+        previews = {}
+        for content_type, content_ids in ids_by_type.items():
+            collection_name, projection = CONTENT_PREVIEW_SOURCES[content_type]
+            collection = self.collection.database[collection_name]
+            for doc in collection.find({"_id": {"$in": list(content_ids)}}, projection):
+                previews[(content_type, doc["_id"])] = doc
+        
+        return previews
+
     def create_auto_moderation_rule(self, rule_data: Dict) -> Dict:
         """Create an automated moderation rule"""
         rule_data['created_at'] = datetime.utcnow()
@@ -327,7 +476,7 @@ class ModerationRepository:
         
         return False
 
-    def get_content_reports_summary(self, content_type: str, content_id: str) -> Dict:
+    def get_content_reports_summary(self, content_type: str, content_id: IdLike) -> Dict:
         """Get summary of reports for specific content"""
         reports = self.get_reports_by_content(content_type, content_id)
         
@@ -1,13 +1,20 @@
 from bson import ObjectId
-from pymongo.results import InsertOneResult, UpdateResult, DeleteResult
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.results import UpdateResult, DeleteResult, BulkWriteResult
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from backend.repositories.utils import IdLike, to_object_id
 
 class NotificationRepository:
     """Repository for managing user notifications"""
 
+    # How long an unread counter is trusted before it is recounted
+    COUNTER_RECOUNT_AFTER = timedelta(days=1)
+
     def __init__(self, db_collection):
         self.collection = db_collection
+        # One {_id: user_id, unread: n} document per user backs the unread badge
+        self.counters = db_collection.database.user_notification_counters
 
     def create(self, notification_data: Dict) -> Dict:
         """Create a new notification"""
@@ -15,50 +22,156 @@ class NotificationRepository:
         notification_data['read'] = False
         notification_data['delivered'] = False
         
-        result: InsertOneResult = self.collection.insert_one(notification_data)
-        return self.collection.find_one({"_id": result.inserted_id})
+        # insert_one sets _id on the document, so it can be returned without reading it back
+        self.collection.insert_one(notification_data)
+        self.increment_unread({notification_data["user_id"]: 1})
+        return notification_data
+
+    def bulk_create(self, operations: List) -> BulkWriteResult:
+        """Apply a batch of InsertOne/UpdateOne operations in one round-trip"""
+        return self.collection.bulk_write(operations, ordered=False)
 
-    def find_by_id(self, notification_id: str) -> Optional[Dict]:
+    @staticmethod
+    def aggregated_upsert(notification: Dict, increment: int = 1) -> UpdateOne:
+        """Build an operation folding `increment` events into the matching notification
+
+        The notification is created if none matches.
+        """
+        now = datetime.utcnow()
+        key = {
+            field: notification[field]
+            for field in ("user_id", "notification_type", "reference_id", "reference_type")
+        }
+        
+        pipeline = [
+            # An existing notification without a count stands for one event; a new one for none
+            {"$set": {"_base_count": {"$cond": [
+                {"$eq": [{"$type": "$created_at"}, "missing"]},
+                0,
+                {"$ifNull": ["$data.count", 1]}
+            ]}}},
+            {"$set": {
+                "data": {"$ifNull": ["$data", {"$literal": notification["data"]}]},
+                "actor_id": {"$ifNull": ["$actor_id", notification.get("actor_id")]},
+                "created_at": {"$ifNull": ["$created_at", now]},
+                "read": {"$ifNull": ["$read", False]},
+                "delivered": {"$ifNull": ["$delivered", False]},
+                "updated_at": now
+            }},
+            {"$set": {"data.count": {"$add": ["$_base_count", increment]}}},
+            {"$unset": "_base_count"}
+        ]
+        
+        return UpdateOne(key, pipeline, upsert=True)
+
+    def find_by_id(self, notification_id: IdLike) -> Optional[Dict]:
         """Find a notification by its ID"""
         try:
-            return self.collection.find_one({"_id": ObjectId(notification_id)})
+            return self.collection.find_one({"_id": to_object_id(notification_id)})
         except:
             return None
 
-    def find_by_user(self, user_id: str, limit: int = 50, unread_only: bool = False) -> List[Dict]:
-        """Find notifications for a user"""
-        query = {"user_id": ObjectId(user_id)}
+    def find_by_user(self, user_id: IdLike, limit: int = 50, unread_only: bool = False,
+                     before_id: Optional[ObjectId] = None, projection: Optional[Dict] = None) -> List[Dict]:
+        """Find notifications for a user, newest first, optionally older than before_id"""
+        query = {"user_id": to_object_id(user_id)}
         
         if unread_only:
             query["read"] = False
+        
+        if before_id:
+            query["_id"] = {"$lt": before_id}
             
-        return list(self.collection.find(query)
-                   .sort("created_at", -1)
+        return list(self.collection.find(query, projection)
+                   .sort("_id", -1)
                    .limit(limit))
 
-    def find_unread_count(self, user_id: str) -> int:
-        """Get count of unread notifications for user"""
-        return self.collection.count_documents({
-            "user_id": ObjectId(user_id),
-            "read": False
-        })
+    def find_by_user_with_actors(self, user_id: IdLike, limit: int = 50, unread_only: bool = False,
+                                 before_id: Optional[ObjectId] = None,
+                                 projection: Optional[Dict] = None) -> List[Dict]:
+        """Same page as find_by_user, with each actor's username joined in as `actor`"""
+        query = {"user_id": to_object_id(user_id)}
+        
+        if unread_only:
+            query["read"] = False
+        
+        if before_id:
+            query["_id"] = {"$lt": before_id}
+        
+        pipeline = [
+            {"$match": query},
+            {"$sort": {"_id": -1}},
+            {"$limit": limit}
+        ]
+        if projection:
+            pipeline.append({"$project": projection})
+        
+        # Join after the limit so only the page itself is looked up
+        pipeline += [
+            {"$lookup": {
+                "from": "users",
+                "let": {"actor_id": "$actor_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$actor_id"]}}},
+                    {"$project": {"username": 1}}
+                ],
+                "as": "actor"
+            }},
+            {"$unwind": {"path": "$actor", "preserveNullAndEmptyArrays": True}}
+        ]
+        
+        return list(self.collection.aggregate(pipeline))
+
+    def find_unread_count(self, user_id: IdLike) -> int:
+        """Get count of unread notifications for user from their counter document"""
+        user_oid = to_object_id(user_id)
+        now = datetime.utcnow()
+        counter = self.counters.find_one({"_id": user_oid}, {"unread": 1, "counted_at": 1})
+        if counter is not None and counter.get("counted_at", datetime.min) > now - self.COUNTER_RECOUNT_AFTER:
+            return max(counter.get("unread", 0), 0)
+        
+        # Missing or stale counter: count once and (re)seed it. The TTL index expires
+        # old notifications without touching counters, so they are recounted daily.
+        unread = self.collection.count_documents({"user_id": user_oid, "read": False})
+        self.counters.update_one(
+            {"_id": user_oid},
+            {"$set": {"unread": unread, "counted_at": now}},
+            upsert=True
+        )
+        return unread
 
-    def mark_as_read(self, notification_id: str, user_id: str) -> UpdateResult:
+    def increment_unread(self, counts_by_user: Dict[ObjectId, int]) -> None:
+        """Adjust unread counters by the given (possibly negative) amounts"""
+        operations = [
+            UpdateOne({"_id": user_id}, {"$inc": {"unread": count}})
+            for user_id, count in counts_by_user.items() if count
+        ]
+        if operations:
+            self.counters.bulk_write(operations, ordered=False)
+
+    def mark_as_read(self, notification_id: IdLike, user_id: IdLike) -> UpdateResult:
         """Mark a notification as read"""
-        return self.collection.update_one(
-            {"_id": ObjectId(notification_id), "user_id": ObjectId(user_id)},
-            {
-                "$set": {
-                    "read": True,
-                    "read_at": datetime.utcnow()
-                }
+        query = {"_id": to_object_id(notification_id), "user_id": to_object_id(user_id)}
+        update = {
+            "$set": {
+                "read": True,
+                "read_at": datetime.utcnow()
             }
-        )
+        }
+        
+        # Only a transition from unread lowers the counter
+        result = self.collection.update_one({**query, "read": False}, update)
+        if result.modified_count:
+            self.increment_unread({query["user_id"]: -1})
+            return result
+        
+        return self.collection.update_one(query, update)
 
-    def mark_all_as_read(self, user_id: str) -> UpdateResult:
+    def mark_all_as_read(self, user_id: IdLike) -> UpdateResult:
         """Mark all notifications as read for a user"""
-        return self.collection.update_many(
-            {"user_id": ObjectId(user_id), "read": False},
+        user_oid = to_object_id(user_id)
+        result = self.collection.update_many(
+            {"user_id": user_oid, "read": False},
             {
                 "$set": {
                     "read": True,
@@ -66,11 +179,13 @@ class NotificationRepository:
                 }
             }
         )
+        self.counters.update_one({"_id": user_oid}, {"$set": {"unread": 0}}, upsert=True)
+        return result
 
-    def mark_as_delivered(self, notification_id: str) -> UpdateResult:
+    def mark_as_delivered(self, notification_id: IdLike) -> UpdateResult:
         """Mark notification as delivered (for tracking delivery status)"""
         return self.collection.update_one(
-            {"_id": ObjectId(notification_id)},
+            {"_id": to_object_id(notification_id)},
             {
                 "$set": {
                     "delivered": True,
@@ -79,46 +194,63 @@ class NotificationRepository:
             }
         )
 
-    def delete_notification(self, notification_id: str, user_id: str) -> DeleteResult:
+    def delete_notification(self, notification_id: IdLike, user_id: IdLike) -> DeleteResult:
         """Delete a notification"""
-        return self.collection.delete_one({
-            "_id": ObjectId(notification_id),
-            "user_id": ObjectId(user_id)
-        })
+        query = {"_id": to_object_id(notification_id), "user_id": to_object_id(user_id)}
+        
+        # Deleting an unread notification also lowers the counter
+        result = self.collection.delete_one({**query, "read": False})
+        if result.deleted_count:
+            self.increment_unread({query["user_id"]: -1})
+            return result
+        
+        return self.collection.delete_one(query)
 
     def delete_old_notifications(self, days_old: int = 30) -> DeleteResult:
         """Delete notifications older than specified days"""
         cutoff_date = datetime.utcnow() - timedelta(days=days_old)
+        
+        # Take the unread ones about to go out of their owners' counters
+        unread_by_user = self.collection.aggregate([
+            {"$match": {"created_at": {"$lt": cutoff_date}, "read": False}},
+            {"$group": {"_id": "$user_id", "unread": {"$sum": 1}}}
+        ])
+        self.increment_unread({r["_id"]: -r["unread"] for r in unread_by_user})
+        
         return self.collection.delete_many({
             "created_at": {"$lt": cutoff_date}
         })
 
-    def find_by_type_and_reference(self, user_id: str, notification_type: str, 
-                                 reference_id: str, reference_type: str) -> Optional[Dict]:
+    def find_by_type_and_reference(self, user_id: IdLike, notification_type: str, 
+                                 reference_id: IdLike, reference_type: str) -> Optional[Dict]:
         """Find existing notification by type and reference"""
         return self.collection.find_one({
-            "user_id": ObjectId(user_id),
+            "user_id": to_object_id(user_id),
             "notification_type": notification_type,
-            "reference_id": ObjectId(reference_id),
+            "reference_id": to_object_id(reference_id),
             "reference_type": reference_type
         })
 
-    def update_notification_data(self, notification_id: str, data: Dict) -> UpdateResult:
-        """Update notification data (for aggregating similar notifications)"""
-        return self.collection.update_one(
-            {"_id": ObjectId(notification_id)},
-            {
-                "$set": {
-                    "data": data,
-                    "updated_at": datetime.utcnow()
-                }
-            }
+    def increment_count_and_set_actor(self, notification_id: ObjectId,
+                                      latest_actor: Optional[Dict] = None) -> Optional[Dict]:
+        """Bump an aggregated notification's count in a single write"""
+        increment = {
+            "data.count": {"$add": [{"$ifNull": ["$data.count", 1]}, 1]},
+            "updated_at": datetime.utcnow()
+        }
+        if latest_actor:
+            increment["data.latest_actor"] = {"$literal": latest_actor}
+        
+        return self.collection.find_one_and_update(
+            {"_id": notification_id},
+            [{"$set": increment}],
+            return_document=ReturnDocument.AFTER
         )
 
-    def get_notification_stats(self, user_id: str) -> Dict:
+    def get_notification_stats(self, user_id: IdLike) -> Dict:
         """Get notification statistics for a user"""
         pipeline = [
-            {"$match": {"user_id": ObjectId(user_id)}},
+            {"$match": {"user_id": to_object_id(user_id)}},
             {"$group": {
                 "_id": "$notification_type",
                 "total": {"$sum": 1},
@@ -170,10 +302,10 @@ class NotificationRepository:
             "batch_processed": {"$ne": True}
         }).sort("created_at", 1).limit(limit))
 
-    def mark_batch_processed(self, notification_ids: List[str]) -> UpdateResult:
+    def mark_batch_processed(self, notification_ids: List[IdLike]) -> UpdateResult:
         """Mark notifications as batch processed"""
         return self.collection.update_many(
-            {"_id": {"$in": [ObjectId(nid) for nid in notification_ids]}},
+            {"_id": {"$in": [to_object_id(nid) for nid in notification_ids]}},
             {
                 "$set": {
                     "batch_processed": True,
@@ -182,13 +314,13 @@ class NotificationRepository:
             }
         )
 
-    def aggregate_similar_notifications(self, user_id: str, hours: int = 1) -> List[Dict]:
+    def aggregate_similar_notifications(self, user_id: IdLike, hours: int = 1) -> List[Dict]:
         """Aggregate similar notifications for better UX"""
         cutoff_date = datetime.utcnow() - timedelta(hours=hours)
         
         pipeline = [
             {"$match": {
-                "user_id": ObjectId(user_id),
+                "user_id": to_object_id(user_id),
                 "created_at": {"$gte": cutoff_date},
                 "read": False
             }},
@@ -1,40 +1,58 @@
-from bson import ObjectId
+from pymongo import ReturnDocument
 from pymongo.results import InsertOneResult, UpdateResult, DeleteResult
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+import re
+from backend.repositories.utils import IdLike, to_object_id
 
 class SharedSkillRepository:
     """Repository for managing shared skills in the social platform"""
 
+    # Fields needed by search/list views; leaves out the curriculum array
+    LIST_PROJECTION = {
+        "title": 1, "description": 1, "category": 1, "difficulty": 1,
+        "rating": 1, "likes_count": 1, "downloads_count": 1, "tags": 1, "shared_by": 1,
+        "has_custom_tasks": 1, "image_url": 1, "created_at": 1
+    }
+
     def __init__(self, db_collection):
         self.collection = db_collection
 
+    @staticmethod
+    def add_search_fields(skill_data: Dict) -> Dict:
+        """Store lowercased title/tags so suggestions can use an anchored index range"""
+        skill_data['title_lower'] = skill_data.get('title', '').lower()
+        skill_data['tags_lower'] = sorted({tag.lower() for tag in skill_data.get('tags', [])})
+        return skill_data
+
     def create(self, skill_data: Dict) -> Dict:
         """Create a new shared skill"""
+        self.add_search_fields(skill_data)
         skill_data['created_at'] = datetime.utcnow()
         skill_data['updated_at'] = datetime.utcnow()
         skill_data['likes_count'] = 0
         skill_data['downloads_count'] = 0
-        skill_data['rating'] = {'average': 0.0, 'count': 0}
+        skill_data['rating'] = {'average': 0.0, 'count': 0, 'sum': 0}
         
         result: InsertOneResult = self.collection.insert_one(skill_data)
         return self.collection.find_one({"_id": result.inserted_id})
 
-    def find_by_id(self, skill_id: str) -> Optional[Dict]:
+    def find_by_id(self, skill_id: IdLike) -> Optional[Dict]:
         """Find a shared skill by its ID"""
         try:
-            return self.collection.find_one({"_id": ObjectId(skill_id)})
+            return self.collection.find_one({"_id": to_object_id(skill_id)})
         except:
             return None
 
-    def find_by_user(self, user_id: str) -> List[Dict]:
+    def find_by_user(self, user_id: IdLike) -> List[Dict]:
         """Find all skills shared by a specific user"""
         return list(self.collection.find({
-            "shared_by": ObjectId(user_id)
+            "shared_by": to_object_id(user_id)
         }).sort("created_at", -1))
 
-    def find_public_skills(self, skip: int = 0, limit: int = 10, filters: Dict = None) -> List[Dict]:
-        """Find public shared skills with pagination and optional filters"""
+    @staticmethod
+    def _public_skills_query(filters: Optional[Dict]) -> Dict:
+        """Match filter shared by the public listing and its count"""
         query = {"visibility": "public"}
         
         # Apply filters if provided
@@ -47,14 +65,78 @@ class SharedSkillRepository:
                 query['has_custom_tasks'] = filters['has_custom_tasks']
             if filters.get('min_rating'):
                 query['rating.average'] = {"$gte": float(filters['min_rating'])}
+        
+        return query
+
+    @staticmethod
+    def _public_page_stages(skip: int, limit: int, projection: Optional[Dict], with_sharer: bool) -> List[Dict]:
+        """Sort/page stages for the public listing, plus the optional sharer join"""
+        stages = [
+            {"$sort": {"created_at": -1}},
+            {"$skip": skip},
+            {"$limit": limit}
+        ]
+        if projection:
+            stages.append({"$project": projection})
+        if with_sharer:
+            stages.append({"$lookup": {
+                "from": "users",
+                "let": {"sharer_id": "$shared_by"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$sharer_id"]}}},
+                    {"$project": {"_id": 0, "username": 1}}
+                ],
+                "as": "sharer"
+            }})
+        return stages
+
+    def find_public_skills(self, skip: int = 0, limit: int = 10, filters: Dict = None,
+                           projection: Dict = None, with_sharer: bool = False) -> List[Dict]:
+        """Find public shared skills with pagination and optional filters
+
+        Pass a projection (usually LIST_PROJECTION) to leave the curriculum and
+        other detail-only fields on the server. With with_sharer, each skill also
+        carries a "sharer" list holding the sharing user's username, joined on
+        the server after the page is cut.
+        """
+        query = self._public_skills_query(filters)
+        
+        if not with_sharer:
+            return list(self.collection.find(query, projection)
+                       .sort("created_at", -1)
+                       .skip(skip)
+                       .limit(limit))
+        
+        pipeline = [{"$match": query}] + self._public_page_stages(skip, limit, projection, with_sharer)
+        return list(self.collection.aggregate(pipeline))
 
-        return list(self.collection.find(query)
-                   .sort("created_at", -1)
-                   .skip(skip)
-                   .limit(limit))
+    def find_public_skills_page(self, skip: int = 0, limit: int = 10, filters: Dict = None,
+                                projection: Dict = None, with_sharer: bool = False) -> Tuple[List[Dict], int]:
+        """Like find_public_skills, but also returns the total match count
 
-    def search_skills(self, query: str, skip: int = 0, limit: int = 10, filters: Dict = None) -> List[Dict]:
-        """Search skills using MongoDB text search"""
+        Page and count come from one $facet over the same filtered stream, so
+        they are consistent with each other and cost a single round-trip.
+        """
+        pipeline = [
+            {"$match": self._public_skills_query(filters)},
+            {"$facet": {
+                "skills": self._public_page_stages(skip, limit, projection, with_sharer),
+                "total": [{"$count": "count"}]
+            }}
+        ]
+        
+        result = next(self.collection.aggregate(pipeline), {})
+        total = result.get("total") or [{"count": 0}]
+        return result.get("skills", []), total[0]["count"]
+
+    def search_skills(self, query: str, skip: int = 0, limit: int = 10, filters: Dict = None,
+                      with_total: bool = True) -> Tuple[List[Dict], Optional[int]]:
+        """Search skills using MongoDB text search
+
+        Returns the requested page and the total match count from one
+        aggregation, so the $text index scan runs once per request. With
+        with_total=False the count is skipped and None is returned for it.
+        """
         search_query = {
             "$text": {"$search": query},
             "visibility": "public"
@@ -68,11 +150,50 @@ class SharedSkillRepository:
                 search_query['difficulty'] = filters['difficulty']
             if filters.get('has_custom_tasks') is not None:
                 search_query['has_custom_tasks'] = filters['has_custom_tasks']
+            if filters.get('min_rating'):
+                search_query['rating.average'] = {"$gte": float(filters['min_rating'])}
 
-        return list(self.collection.find(search_query, {"score": {"$meta": "textScore"}})
-                   .sort([("score", {"$meta": "textScore"}), ("likes_count", -1)])
-                   .skip(skip)
-                   .limit(limit))
+        # Rank matches as high (query in title), medium (in a tag) or low
+        query_pattern = re.escape(query.lower())
+        relevance = {"$cond": [
+            {"$regexMatch": {
+                "input": {"$ifNull": ["$title_lower", {"$toLower": "$title"}]},
+                "regex": query_pattern
+            }},
+            "high",
+            {"$cond": [
+                {"$anyElementTrue": [{"$map": {
+                    "input": {"$ifNull": ["$tags_lower", []]},
+                    "as": "tag",
+                    "in": {"$regexMatch": {"input": "$$tag", "regex": query_pattern}}
+                }}]},
+                "medium",
+                "low"
+            ]}
+        ]}
+        
+        page_stages = [
+            {"$sort": {"score": -1, "likes_count": -1}},
+            {"$skip": skip},
+            {"$limit": limit},
+            {"$project": {**self.LIST_PROJECTION, "score": 1, "relevance": relevance}}
+        ]
+        pipeline = [
+            {"$match": search_query},
+            {"$addFields": {"score": {"$meta": "textScore"}}}
+        ]
+        
+        if not with_total:
+            return list(self.collection.aggregate(pipeline + page_stages)), None
+        
+        pipeline.append({"$facet": {
+            "skills": page_stages,
+            "total": [{"$count": "count"}]
+        }})
+        
+        result = next(self.collection.aggregate(pipeline), {"skills": [], "total": []})
+        total = result["total"][0]["count"] if result["total"] else 0
+        return result["skills"], total
 
     def get_trending_skills(self, time_period: str = "week", limit: int = 10) -> List[Dict]:
         """Get trending skills based on recent activity"""
@@ -126,53 +247,73 @@ class SharedSkillRepository:
         
         return list(self.collection.aggregate(pipeline))
 
-    def increment_likes(self, skill_id: str) -> UpdateResult:
+    def increment_likes(self, skill_id: IdLike) -> UpdateResult:
         """Increment the likes count for a skill"""
         return self.collection.update_one(
-            {"_id": ObjectId(skill_id)},
+            {"_id": to_object_id(skill_id)},
             {
                 "$inc": {"likes_count": 1},
                 "$set": {"updated_at": datetime.utcnow()}
             }
         )
 
-    def decrement_likes(self, skill_id: str) -> UpdateResult:
+    def decrement_likes(self, skill_id: IdLike) -> UpdateResult:
         """Decrement the likes count for a skill"""
         return self.collection.update_one(
-            {"_id": ObjectId(skill_id)},
+            {"_id": to_object_id(skill_id)},
             {
                 "$inc": {"likes_count": -1},
                 "$set": {"updated_at": datetime.utcnow()}
             }
         )
 
-    def increment_downloads(self, skill_id: str) -> UpdateResult:
+    def increment_downloads(self, skill_id: IdLike) -> UpdateResult:
         """Increment the downloads count for a skill"""
         return self.collection.update_one(
-            {"_id": ObjectId(skill_id)},
+            {"_id": to_object_id(skill_id)},
             {
                 "$inc": {"downloads_count": 1},
                 "$set": {"updated_at": datetime.utcnow()}
             }
         )
 
-    def update_rating(self, skill_id: str, new_average: float, new_count: int) -> UpdateResult:
-        """Update the rating for a skill"""
-        return self.collection.update_one(
-            {"_id": ObjectId(skill_id)},
-            {
-                "$set": {
-                    "rating.average": round(new_average, 2),
+    def apply_rating_change(self, skill_id: IdLike, sum_delta: int, count_delta: int) -> Optional[Dict]:
+        """Atomically adjust the rating sum/count and recompute the average
+
+        Skills created before rating.sum was stored get it derived from the
+        existing average and count on their first update.
+        """
+        current_sum = {"$ifNull": ["$rating.sum", {"$multiply": [
+            {"$ifNull": ["$rating.average", 0]},
+            {"$ifNull": ["$rating.count", 0]}
+        ]}]}
+        new_sum = {"$add": [current_sum, sum_delta]}
+        new_count = {"$add": [{"$ifNull": ["$rating.count", 0]}, count_delta]}
+        
+        return self.collection.find_one_and_update(
+            {"_id": to_object_id(skill_id)},
+            [
+                {"$set": {
+                    "rating.sum": new_sum,
                     "rating.count": new_count,
                     "updated_at": datetime.utcnow()
-                }
-            }
+                }},
+                {"$set": {
+                    "rating.average": {"$cond": [
+                        {"$gt": ["$rating.count", 0]},
+                        {"$round": [{"$divide": ["$rating.sum", "$rating.count"]}, 2]},
+                        0.0
+                    ]}
+                }}
+            ],
+            projection={"rating": 1},
+            return_document=ReturnDocument.AFTER
         )
 
-    def update_custom_task_status(self, skill_id: str, has_custom_tasks: bool) -> UpdateResult:
+    def update_custom_task_status(self, skill_id: IdLike, has_custom_tasks: bool) -> UpdateResult:
         """Update whether the skill has custom tasks"""
         return self.collection.update_one(
-            {"_id": ObjectId(skill_id)},
+            {"_id": to_object_id(skill_id)},
             {
                 "$set": {
                     "has_custom_tasks": has_custom_tasks,
@@ -181,23 +322,9 @@ class SharedSkillRepository:
             }
         )
 
-    def delete_by_id(self, skill_id: str, user_id: str) -> DeleteResult:
+    def delete_by_id(self, skill_id: IdLike, user_id: IdLike) -> DeleteResult:
         """Delete a shared skill (only by the owner)"""
         return self.collection.delete_one({
-            "_id": ObjectId(skill_id),
-            "shared_by": ObjectId(user_id)
-        })
-
-    def count_public_skills(self, filters: Dict = None) -> int:
-        """Count public skills with optional filters"""
-        query = {"visibility": "public"}
-        
-        if filters:
-            if filters.get('category'):
-                query['category'] = filters['category']
-            if filters.get('difficulty'):
-                query['difficulty'] = filters['difficulty']
-            if filters.get('has_custom_tasks') is not None:
-                query['has_custom_tasks'] = filters['has_custom_tasks']
-
-        return self.collection.count_documents(query)
\ No newline at end of file
+            "_id": to_object_id(skill_id),
+            "shared_by": to_object_id(user_id)
+        })
\ No newline at end of file
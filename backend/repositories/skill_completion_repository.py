@@ -64,6 +64,41 @@ class SkillCompletionRepository:
             }
         }))
     
+    def get_daily_rollup(self, user_id: str, start_date: datetime, end_date: datetime,
+                         include_details: bool = True) -> Dict[str, Dict]:
+        """Per-day completion counts in [start_date, end_date), keyed by YYYY-MM-DD
+
+        Grouping runs on the server, so one small row per active day comes back
+        instead of every completion document. With include_details each row also
+        carries the formatted entries the stats timeline displays.
+        """
+        group = {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$completed_at"}},
+            "count": {"$sum": 1}
+        }
+        if include_details:
+            group["details"] = {"$push": {
+                "type": "skill",
+                "title": {"$ifNull": ["$completion_data.skill_title", "Unknown Skill"]},
+                "day_title": {"$ifNull": [
+                    "$completion_data.day_title",
+                    {"$concat": ["Day ", {"$toString": {"$ifNull": ["$day_number", 1]}}]}
+                ]},
+                "completed_at": {"$dateToString": {"format": "%H:%M", "date": "$completed_at"}}
+            }}
+        
+        pipeline = [
+            {
+                "$match": {
+                    "user_id": ObjectId(user_id),
+                    "completed_at": {"$gte": start_date, "$lt": end_date}
+                }
+            },
+            {"$group": group}
+        ]
+        
+        return {row.pop("_id"): row for row in self.collection.aggregate(pipeline)}
+    
     def get_completion_stats(self, user_id: str, days: int = 30) -> Dict:
         """Get completion statistics for the user"""
         pipeline = [
@@ -1,5 +1,6 @@
 from bson import ObjectId
-from pymongo.results import InsertOneResult, UpdateResult, DeleteResult
+from pymongo import ReturnDocument
+from pymongo.results import InsertOneResult, DeleteResult
 from datetime import datetime
 
 class SkillRepository:
@@ -11,8 +12,21 @@ class SkillRepository:
         result: InsertOneResult = self.collection.insert_one(skill_data)
         return self.collection.find_one({"_id": result.inserted_id})
 
-    def find_by_user(self, user_id: str) -> list:
-        return list(self.collection.find({"user_id": user_id}))
+    def find_by_user(self, user_id: str, projection: dict = None) -> list:
+        return list(self.collection.find({"user_id": user_id}, projection))
+
+    def get_status_summary(self, user_id: str) -> dict:
+        # Per-status skill counts and progress sums, computed server-side
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            {"$group": {
+                "_id": "$status",
+                "count": {"$sum": 1},
+                "completed_days": {"$sum": "$progress.completed_days"},
+                "completion_sum": {"$sum": "$progress.completion_percentage"}
+            }}
+        ]
+        return {result["_id"]: result for result in self.collection.aggregate(pipeline)}
 
     def find_by_id(self, skill_id: str, user_id: str) -> dict:
         return self.collection.find_one({
@@ -20,39 +34,127 @@ class SkillRepository:
             "user_id": user_id
         })
 
-    def update_day_completion(self, skill_id: str, user_id: str, day_number: int) -> UpdateResult:
-        return self.collection.update_one(
-            {"_id": ObjectId(skill_id), "user_id": user_id},
-            {"$set": { f"curriculum.daily_tasks.{day_number - 1}.completed": True, "updated_at": datetime.utcnow()}}
-        )
+    def update_day_completion(self, skill_id: str, user_id: str, day_number: int) -> dict:
+        # Mark an open day completed and recompute progress; None if the skill/day is missing or already done
+        return self._set_day_completion(skill_id, user_id, day_number, completed=True)
     
-    def update_day_completion_undo(self, skill_id: str, user_id: str, day_number: int) -> UpdateResult:
-        return self.collection.update_one(
-            {"_id": ObjectId(skill_id), "user_id": user_id},
-            {"$unset": { f"curriculum.daily_tasks.{day_number - 1}.completed": ""}, "$set": {"updated_at": datetime.utcnow()}}
+    def update_day_completion_undo(self, skill_id: str, user_id: str, day_number: int) -> dict:
+        # Clear a completed day and recompute progress; None if the skill/day is missing or not completed
+        return self._set_day_completion(skill_id, user_id, day_number, completed=False)
+
+    def _set_day_completion(self, skill_id: str, user_id: str, day_number: int, completed: bool) -> dict:
+        index = day_number - 1
+        # Only open days can be completed and only completed days undone
+        day_filter = {"$ne": True} if completed else True
+        
+        tasks = "$curriculum.daily_tasks"
+        day_task = {"$arrayElemAt": [tasks, index]}
+        if completed:
+            updated_task = {"$mergeObjects": [day_task, {"completed": True}]}
+        else:
+            updated_task = {"$arrayToObject": {"$filter": {
+                "input": {"$objectToArray": day_task},
+                "cond": {"$ne": ["$$this.k", "completed"]}
+            }}}
+        
+        return self.collection.find_one_and_update(
+            {
+                "_id": ObjectId(skill_id),
+                "user_id": user_id,
+                f"curriculum.daily_tasks.{index}": {"$exists": True},
+                f"curriculum.daily_tasks.{index}.completed": day_filter
+            },
+            [
+                {"$set": {"curriculum.daily_tasks": {"$concatArrays": [
+                    {"$slice": [tasks, index]},
+                    [updated_task],
+                    {"$slice": [tasks, index + 1, {"$max": [{"$size": tasks}, 1]}]}
+                ]}}}
+            ] + self._progress_stages(),
+            projection={
+                "title": 1,
+                "skill_name": 1,
+                "progress": 1,
+                "curriculum.daily_tasks": {"$slice": [index, 1]}
+            },
+            return_document=ReturnDocument.AFTER
         )
 
-    def update_progress_stats(self, skill_id: str, user_id: str, progress_data: dict) -> UpdateResult:
-        return self.collection.update_one(
+    def normalize_and_recalculate(self, skill_id: str, user_id: str) -> dict:
+        # Reset non-boolean completion flags to false, then recompute progress in the same update
+        normalized_tasks = {"$map": {
+            "input": {"$ifNull": ["$curriculum.daily_tasks", []]},
+            "as": "task",
+            "in": {"$cond": [
+                {"$in": [{"$type": "$$task.completed"}, ["bool", "missing"]]},
+                "$$task",
+                {"$mergeObjects": ["$$task", {"completed": False}]}
+            ]}
+        }}
+        
+        return self.collection.find_one_and_update(
             {"_id": ObjectId(skill_id), "user_id": user_id},
-            {"$set": {"progress": progress_data, "updated_at": datetime.utcnow()}}
+            [{"$set": {"curriculum.daily_tasks": normalized_tasks}}] + self._progress_stages(),
+            projection={"progress": 1, "curriculum.daily_tasks.completed": 1},
+            return_document=ReturnDocument.AFTER
         )
-    
+
+    @staticmethod
+    def _progress_stages() -> list:
+        # Single pass over the tasks: count completed days and note the first open one
+        progress_fold = {"$reduce": {
+            "input": {"$ifNull": ["$curriculum.daily_tasks", []]},
+            "initialValue": {"total": 0, "completed": 0, "first_open": -1},
+            "in": {
+                "total": {"$add": ["$$value.total", 1]},
+                "completed": {"$add": ["$$value.completed", {"$cond": ["$$this.completed", 1, 0]}]},
+                "first_open": {"$cond": [
+                    {"$and": [{"$eq": ["$$value.first_open", -1]}, {"$not": ["$$this.completed"]}]},
+                    "$$value.total",
+                    "$$value.first_open"
+                ]}
+            }
+        }}
+        
+        return [
+            {"$set": {"_progress": progress_fold}},
+            {"$set": {
+                "progress.completed_days": "$_progress.completed",
+                "progress.current_day": {"$cond": [
+                    {"$eq": ["$_progress.first_open", -1]},
+                    "$_progress.total",
+                    {"$add": ["$_progress.first_open", 1]}
+                ]},
+                "progress.completion_percentage": {"$cond": [
+                    {"$gt": ["$_progress.total", 0]},
+                    {"$round": [{"$multiply": [
+                        {"$divide": ["$_progress.completed", "$_progress.total"]}, 100
+                    ]}, 2]},
+                    0
+                ]},
+                "progress.projected_completion": {"$add": [
+                    {"$ifNull": ["$progress.started_at", "$$NOW"]},
+                    {"$multiply": ["$_progress.total", 24 * 60 * 60 * 1000]}
+                ]},
+                "progress.last_activity": "$$NOW",
+                "updated_at": "$$NOW"
+            }},
+            {"$unset": "_progress"}
+        ]
+
     def update_skill(self, skill_id: str, user_id: str, update_data: dict) -> dict:
         update_data["updated_at"] = datetime.utcnow()
         
-        result: UpdateResult = self.collection.update_one(
+        updated_skill = self.collection.find_one_and_update(
             {"_id": ObjectId(skill_id), "user_id": user_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if updated_skill is None:
             raise ValueError("Skill not found or access denied")
         
-        return self.collection.find_one({
-            "_id": ObjectId(skill_id), 
-            "user_id": user_id
-        })
+        return updated_skill
 
     def delete_by_id(self, skill_id: str, user_id: str) -> DeleteResult:
         return self.collection.delete_one({
@@ -0,0 +1,39 @@
+from bson import ObjectId
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+IdLike = Union[str, ObjectId]
+
+def to_object_id(id_or_oid: IdLike) -> ObjectId:
+    """Return an ObjectId, skipping the parse when one is passed in already"""
+    return id_or_oid if isinstance(id_or_oid, ObjectId) else ObjectId(id_or_oid)
+
+def parse_object_id(value: IdLike, label: str = "id") -> ObjectId:
+    """Validate and convert an id at a service entry point
+
+    Raises ValueError (mapped to a 400 by the blueprints) instead of letting
+    bson.errors.InvalidId surface from deep inside a query.
+    """
+    if isinstance(value, ObjectId):
+        return value
+    if not ObjectId.is_valid(value):
+        raise ValueError(f"Invalid {label}")
+    return ObjectId(value)
+
+def coerce_datetime(value) -> Optional[datetime]:
+    """Normalize a stored timestamp to a naive UTC datetime
+
+    Older documents hold ISO strings (sometimes with a trailing Z) or aware
+    datetimes; everything else in the app compares against datetime.utcnow().
+    Returns None for missing or unparseable values.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
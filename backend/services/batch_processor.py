@@ -373,6 +373,8 @@ class BatchProcessor:
                 ]
                 
                 digest_candidates = list(g.db.notifications.aggregate(pipeline))
+                digest_notifications = []
+                digest_keys = []
                 
                 for candidate in digest_candidates:
                     user_id = str(candidate["_id"])
@@ -385,19 +387,25 @@ class BatchProcessor:
                         # Create digest notification
                         digest_message = f"You have {unread_count} unread notifications"
                         
-                        NotificationService.create_notification(
-                            user_id=user_id,
-                            notification_type="daily_digest",
-                            reference_type="system",
-                            reference_id=user_id,
-                            data={
+                        digest_notifications.append({
+                            "user_id": user_id,
+                            "notification_type": "daily_digest",
+                            "reference_type": "system",
+                            "reference_id": user_id,
+                            "data": {
                                 "message": digest_message,
                                 "unread_count": unread_count,
                                 "digest_date": datetime.utcnow().isoformat()
                             }
-                        )
-                        
-                        # Mark digest as sent (prevent duplicate for 24 hours)
+                        })
+                        digest_keys.append(last_digest_key)
+                
+                # Write all digests in one bulk operation
+                if digest_notifications:
+                    NotificationService.create_notifications_bulk(digest_notifications)
+                
+                    # Mark digests as sent only once they are written (prevent duplicate for 24 hours)
+                    for last_digest_key in digest_keys:
                         CacheService.set(last_digest_key, True, 86400)
                 
                 logging.info(f"Processed notification digests for {len(digest_candidates)} users")
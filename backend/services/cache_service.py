@@ -28,6 +28,9 @@ class CacheService:
     MEDIUM_TTL = 1800   # 30 minutes
     LONG_TTL = 86400    # 24 hours
     TRENDING_TTL = 900  # 15 minutes
+    STATS_TTL = 60      # 1 minute
+    PUBLIC_LIST_TTL = 30  # 30 seconds
+    AGGREGATE_TTL = 7200  # 2 hours
 
     @classmethod
     def get_redis_client(cls):
@@ -73,7 +76,7 @@ class CacheService:
             
             # Serialize the value
             if isinstance(value, (dict, list)):
-                serialized_value = json.dumps(value, default=str)
+                serialized_value = json.dumps(value, default=cls._json_default)
             else:
                 serialized_value = pickle.dumps(value)
             
@@ -87,6 +90,13 @@ class CacheService:
             logging.error(f"Cache set error for key {key}: {e}")
             return False
 
+    @staticmethod
+    def _json_default(value: Any) -> str:
+        """Serialize values the way the API's JSON encoder does (ISO datetimes, string ids)"""
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)
+
     @classmethod
     def get(cls, key: str) -> Optional[Any]:
         """Get a value from cache"""
@@ -271,6 +281,55 @@ class CacheService:
         key = f"{cls.SEARCH_PREFIX}results:{query_hash}"
         return cls.get(key)
 
+    @classmethod
+    def cache_filter_options(cls, options: Dict, ttl: int = None) -> bool:
+        """Cache search filter options"""
+        key = f"{cls.SEARCH_PREFIX}filter_options"
+        return cls.set(key, options, ttl or cls.SHORT_TTL)
+
+    @classmethod
+    def get_filter_options(cls) -> Optional[Dict]:
+        """Get cached search filter options"""
+        key = f"{cls.SEARCH_PREFIX}filter_options"
+        return cls.get(key)
+
+    @classmethod
+    def cache_category_counts(cls, categories: List[Dict], ttl: int = None) -> bool:
+        """Cache public skill category counts"""
+        key = f"{cls.SEARCH_PREFIX}categories"
+        return cls.set(key, categories, ttl or cls.SHORT_TTL)
+
+    @classmethod
+    def get_category_counts(cls) -> Optional[List[Dict]]:
+        """Get cached public skill category counts"""
+        key = f"{cls.SEARCH_PREFIX}categories"
+        return cls.get(key)
+
+    @classmethod
+    def public_skills_key(cls, filters: Optional[Dict], page: int, limit: int) -> str:
+        """Cache key for a page of the public shared skills list"""
+        import hashlib
+        filters_hash = hashlib.md5(json.dumps(filters or {}, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{cls.SKILL_PREFIX}public:{filters_hash}:{page}:{limit}"
+
+    @classmethod
+    def trending_shared_skills_key(cls, time_period: str, limit: int) -> str:
+        """Cache key for the trending shared skills list"""
+        return f"{cls.TRENDING_PREFIX}shared_skills:{time_period}:{limit}"
+
+    @classmethod
+    def invalidate_search_filters(cls) -> int:
+        """Drop cached filter options and category counts after skills are shared"""
+        if not cls.is_available():
+            return 0
+        
+        try:
+            client = cls.get_redis_client()
+            return client.delete(f"{cls.SEARCH_PREFIX}filter_options", f"{cls.SEARCH_PREFIX}categories")
+        except Exception as e:
+            logging.error(f"Cache invalidate error for search filters: {e}")
+            return 0
+
     @classmethod
     def cache_analytics_data(cls, analytics_key: str, data: Dict, ttl: int = None) -> bool:
         """Cache analytics data"""
@@ -301,6 +360,92 @@ class CacheService:
         key = f"{cls.NOTIFICATION_PREFIX}user:{user_id}"
         return cls.delete(key)
 
+    @classmethod
+    def claim_notification_aggregate(cls, user_id: str, notification_type: str, reference_type: str,
+                                     reference_id: str, notification_id: str, ttl: int = None) -> Optional[str]:
+        """Claim the aggregation slot for a (user, type, reference) notification with SETNX
+
+        Returns notification_id if the slot was free, the id of the notification
+        already holding it otherwise, or None when Redis is unavailable.
+        """
+        if not cls.is_available():
+            return None
+        
+        try:
+            client = cls.get_redis_client()
+            key = cls._notification_aggregate_key(user_id, notification_type, reference_type, reference_id)
+            
+            if client.set(key, notification_id, nx=True, ex=ttl or cls.AGGREGATE_TTL):
+                return notification_id
+            
+            existing_id = client.get(key)
+            return existing_id.decode('utf-8') if existing_id else None
+            
+        except Exception as e:
+            logging.error(f"Cache claim error for notification aggregate: {e}")
+            return None
+
+    @classmethod
+    def reset_notification_aggregate(cls, user_id: str, notification_type: str, reference_type: str,
+                                     reference_id: str, notification_id: str, ttl: int = None) -> bool:
+        """Point the aggregation slot at a new notification, replacing a stale one"""
+        if not cls.is_available():
+            return False
+        
+        try:
+            client = cls.get_redis_client()
+            key = cls._notification_aggregate_key(user_id, notification_type, reference_type, reference_id)
+            return bool(client.set(key, notification_id, ex=ttl or cls.AGGREGATE_TTL))
+            
+        except Exception as e:
+            logging.error(f"Cache reset error for notification aggregate: {e}")
+            return False
+
+    @classmethod
+    def _notification_aggregate_key(cls, user_id: str, notification_type: str,
+                                    reference_type: str, reference_id: str) -> str:
+        import hashlib
+        digest = hashlib.md5(
+            f"{user_id}:{notification_type}:{reference_type}:{reference_id}".encode()
+        ).hexdigest()
+        return f"{cls.NOTIFICATION_PREFIX}aggregate:{digest}"
+
+    @classmethod
+    def cache_user_credibility(cls, user_id: str, credibility: float, ttl: int = None) -> bool:
+        """Cache a user's reporting credibility score"""
+        key = f"{cls.MODERATION_PREFIX}credibility:{user_id}"
+        return cls.set(key, credibility, ttl or cls.SHORT_TTL)
+
+    @classmethod
+    def get_user_credibility(cls, user_id: str) -> Optional[float]:
+        """Get cached reporting credibility score"""
+        key = f"{cls.MODERATION_PREFIX}credibility:{user_id}"
+        return cls.get(key)
+
+    @classmethod
+    def invalidate_user_credibility(cls, user_id: str) -> bool:
+        """Invalidate reporting credibility cache"""
+        key = f"{cls.MODERATION_PREFIX}credibility:{user_id}"
+        return cls.delete(key)
+
+    @classmethod
+    def cache_moderation_stats(cls, days: int, stats: Dict, ttl: int = None) -> bool:
+        """Cache moderation dashboard statistics for a reporting window"""
+        key = f"{cls.MODERATION_PREFIX}stats:{days}"
+        return cls.set(key, stats, ttl or cls.STATS_TTL)
+
+    @classmethod
+    def get_moderation_stats(cls, days: int) -> Optional[Dict]:
+        """Get cached moderation dashboard statistics"""
+        key = f"{cls.MODERATION_PREFIX}stats:{days}"
+        return cls.get(key)
+
+    @classmethod
+    def invalidate_moderation_stats(cls, days: int) -> bool:
+        """Invalidate moderation statistics cache for a reporting window"""
+        key = f"{cls.MODERATION_PREFIX}stats:{days}"
+        return cls.delete(key)
+
     # Rate limiting
     
     @classmethod
@@ -459,6 +604,29 @@ class CacheService:
         
         return fresh_value
 
+    @classmethod
+    def get_or_set_with_fallback(cls, key: str, fetch_function, ttl: int = None, stale_ttl: int = None) -> Any:
+        """get_or_set that keeps a longer-lived stale copy to serve when fetching fails"""
+        cached_value = cls.get(key)
+        if cached_value is not None:
+            return cached_value
+        
+        stale_key = f"{key}:stale"
+        try:
+            fresh_value = fetch_function()
+        except Exception as e:
+            stale_value = cls.get(stale_key)
+            if stale_value is None:
+                raise
+            logging.warning(f"Serving stale cache for {key} after fetch failure: {e}")
+            return stale_value
+        
+        if fresh_value is not None:
+            cls.set(key, fresh_value, ttl or cls.DEFAULT_TTL)
+            cls.set(stale_key, fresh_value, stale_ttl or cls.LONG_TTL)
+        
+        return fresh_value
+
     @classmethod
     def mget(cls, keys: List[str]) -> Dict[str, Any]:
         """Get multiple keys at once"""
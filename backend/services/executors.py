@@ -0,0 +1,13 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, List
+
+# Runs independent writes to different collections side by side
+WRITE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="interaction-writes")
+
+# The dashboard's reads are independent and mostly wait on Mongo, so they overlap
+STATS_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="stats-queries")
+
+def run_concurrently(*calls, executor: Executor = WRITE_EXECUTOR) -> List[Any]:
+    """Run (func, *args) calls on the executor and wait for all results"""
+    futures = [executor.submit(*call) for call in calls]
+    return [future.result() for future in futures]
@@ -68,7 +68,7 @@ class HabitService:
 
         try:
             import asyncio
-            habit_plan_data["icon_url"] = asyncio.run(UnsplashService.fetch_image(category or title))
+            habit_plan_data["icon_url"] = asyncio.run(UnsplashService.closing(UnsplashService.fetch_image(category or title)))
         except Exception as e:
             logging.error(f"Unsplash fetch failed for habit '{title}': {e}")
 
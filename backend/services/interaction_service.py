@@ -3,9 +3,24 @@ from datetime import datetime
 from flask import g
 from bson import ObjectId
 import logging
+from collections import deque
+from types import SimpleNamespace
 from backend.repositories.interaction_repository import InteractionRepository
 from backend.repositories.shared_skill_repository import SharedSkillRepository
 from backend.repositories.comment_repository import CommentRepository
+from backend.repositories.utils import parse_object_id
+from backend.services.executors import run_concurrently
+from backend.services.user_info import get_user_info, prefetch_users
+
+def _repos() -> SimpleNamespace:
+    """Get the interaction repositories, built once per request and cached on g"""
+    if "_interaction_repos" not in g:
+        g._interaction_repos = SimpleNamespace(
+            interactions=InteractionRepository(g.db.plan_interactions),
+            shared_skills=SharedSkillRepository(g.db.shared_skills),
+            comments=CommentRepository(g.db.plan_comments)
+        )
+    return g._interaction_repos
 
 class InteractionService:
     """Service for managing user interactions with shared skills (likes, comments, ratings)"""
@@ -14,9 +29,11 @@ class InteractionService:
     def toggle_like(user_id: str, plan_id: str) -> Dict[str, Any]:
         """Toggle like on a shared skill"""
         
+        plan_oid = parse_object_id(plan_id, "skill id")
+        
         # Verify the shared skill exists
-        shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
-        shared_skill = shared_skill_repo.find_by_id(plan_id)
+        shared_skill_repo = _repos().shared_skills
+        shared_skill = shared_skill_repo.find_by_id(plan_oid)
         
         if not shared_skill:
             raise ValueError("Shared skill not found")
@@ -25,26 +42,30 @@ class InteractionService:
         if str(shared_skill["shared_by"]) == user_id:
             raise ValueError("You cannot like your own skill")
         
-        interaction_repo = InteractionRepository(g.db.plan_interactions)
+        interaction_repo = _repos().interactions
         
         # Check if user has already liked this plan
-        existing_like = interaction_repo.get_user_interaction(user_id, plan_id, "like")
+        existing_like = interaction_repo.get_user_interaction(user_id, plan_oid, "like")
         
         if existing_like:
             # Remove like
-            interaction_repo.remove_interaction(user_id, plan_id, "like")
-            shared_skill_repo.decrement_likes(plan_id)
+            run_concurrently(
+                (interaction_repo.remove_interaction, user_id, plan_oid, "like"),
+                (shared_skill_repo.decrement_likes, plan_oid)
+            )
             action = "unliked"
             liked = False
         else:
             # Add like
-            interaction_repo.upsert_interaction(user_id, plan_id, "like")
-            shared_skill_repo.increment_likes(plan_id)
+            run_concurrently(
+                (interaction_repo.upsert_interaction, user_id, plan_oid, "like"),
+                (shared_skill_repo.increment_likes, plan_oid)
+            )
             action = "liked"
             liked = True
         
         # Get updated like count
-        updated_skill = shared_skill_repo.find_by_id(plan_id)
+        updated_skill = shared_skill_repo.find_by_id(plan_oid)
         
         logging.info(f"User {user_id} {action} skill {plan_id}")
         
@@ -63,9 +84,11 @@ class InteractionService:
         if not (1 <= rating <= 5):
             raise ValueError("Rating must be between 1 and 5")
         
+        plan_oid = parse_object_id(plan_id, "skill id")
+        
         # Verify the shared skill exists
-        shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
-        shared_skill = shared_skill_repo.find_by_id(plan_id)
+        shared_skill_repo = _repos().shared_skills
+        shared_skill = shared_skill_repo.find_by_id(plan_oid)
         
         if not shared_skill:
             raise ValueError("Shared skill not found")
@@ -74,10 +97,10 @@ class InteractionService:
         if str(shared_skill["shared_by"]) == user_id:
             raise ValueError("You cannot rate your own skill")
         
-        interaction_repo = InteractionRepository(g.db.plan_interactions)
+        interaction_repo = _repos().interactions
         
         # Check if user has already rated this plan
-        existing_rating = interaction_repo.get_user_interaction(user_id, plan_id, "rate")
+        existing_rating = interaction_repo.get_user_interaction(user_id, plan_oid, "rate")
         was_update = existing_rating is not None
         
         # Add/update rating
@@ -85,17 +108,18 @@ class InteractionService:
         if review and review.strip():
             rating_data["review"] = review.strip()[:500]  # Limit review length
         
-        interaction_repo.upsert_interaction(user_id, plan_id, "rate", rating_data)
+        interaction_repo.upsert_interaction(user_id, plan_oid, "rate", rating_data)
         
-        # Recalculate average rating
-        all_ratings = interaction_repo.get_plan_interactions(plan_id, "rate")
-        if all_ratings:
-            total_rating = sum(r.get("rating", 0) for r in all_ratings)
-            avg_rating = total_rating / len(all_ratings)
-            rating_count = len(all_ratings)
-            
-            # Update shared skill rating
-            shared_skill_repo.update_rating(plan_id, avg_rating, rating_count)
+        # Fold the change into the denormalized rating totals on the skill
+        previous_rating = existing_rating.get("rating", 0) if was_update else 0
+        updated_skill = shared_skill_repo.apply_rating_change(
+            plan_oid,
+            rating - previous_rating,
+            0 if was_update else 1
+        )
+        updated_rating = updated_skill["rating"] if updated_skill else {}
+        avg_rating = updated_rating.get("average", 0.0)
+        rating_count = updated_rating.get("count", 0)
         
         action = "updated" if was_update else "added"
         
@@ -105,8 +129,8 @@ class InteractionService:
             "action": action,
             "rating": rating,
             "review": rating_data.get("review"),
-            "average_rating": round(avg_rating, 2) if all_ratings else rating,
-            "rating_count": rating_count if all_ratings else 1,
+            "average_rating": round(avg_rating, 2) if rating_count else rating,
+            "rating_count": rating_count if rating_count else 1,
             "message": f"Rating {action} successfully"
         }
 
@@ -122,36 +146,39 @@ class InteractionService:
         if len(content) > 1000:
             raise ValueError("Comment content cannot exceed 1000 characters")
         
+        plan_oid = parse_object_id(plan_id, "skill id")
+        parent_oid = parse_object_id(parent_id, "parent comment id") if parent_id else None
+        
         # Verify the shared skill exists
-        shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
-        shared_skill = shared_skill_repo.find_by_id(plan_id)
+        shared_skill_repo = _repos().shared_skills
+        shared_skill = shared_skill_repo.find_by_id(plan_oid)
         
         if not shared_skill:
             raise ValueError("Shared skill not found")
         
-        comment_repo = CommentRepository(g.db.plan_comments)
+        comment_repo = _repos().comments
         
         # If replying to a comment, verify parent exists
-        if parent_id:
-            parent_comment = comment_repo.find_by_id(parent_id)
+        if parent_oid:
+            parent_comment = comment_repo.find_by_id(parent_oid)
             if not parent_comment:
                 raise ValueError("Parent comment not found")
-            if str(parent_comment["plan_id"]) != plan_id:
+            if parent_comment["plan_id"] != plan_oid:
                 raise ValueError("Parent comment does not belong to this skill")
         
         # Create comment data
         comment_data = {
-            "plan_id": ObjectId(plan_id),
+            "plan_id": plan_oid,
             "user_id": ObjectId(user_id),
             "content": content,
-            "parent_comment_id": ObjectId(parent_id) if parent_id else None
+            "parent_comment_id": parent_oid
         }
         
         # Create comment
         comment = comment_repo.create(comment_data)
         
         # Add user info to response
-        comment["user_info"] = InteractionService._get_user_info(user_id)
+        comment["user_info"] = get_user_info(user_id)
         
         logging.info(f"User {user_id} added comment to skill {plan_id}")
         
@@ -170,22 +197,29 @@ class InteractionService:
     def get_comments(plan_id: str, limit: int = 100) -> Dict[str, Any]:
         """Get comments for a shared skill"""
         
-        comment_repo = CommentRepository(g.db.plan_comments)
+        plan_oid = parse_object_id(plan_id, "skill id")
+        comment_repo = _repos().comments
         
         # Get comments organized in thread structure
-        comments = comment_repo.find_by_plan(plan_id, limit)
-        
-        # Add user info to all comments and replies
-        def add_user_info_recursive(comment_list):
-            for comment in comment_list:
-                comment["user_info"] = InteractionService._get_user_info(str(comment["user_id"]))
-                if "replies" in comment:
-                    add_user_info_recursive(comment["replies"])
-        
-        add_user_info_recursive(comments)
+        comments = comment_repo.find_by_plan(plan_oid, limit)
+        
+        # Walk the comment tree once to collect every comment and author
+        all_comments = []
+        user_ids = set()
+        stack = deque(comments)
+        while stack:
+            comment = stack.popleft()
+            all_comments.append(comment)
+            user_ids.add(str(comment["user_id"]))
+            stack.extend(comment.get("replies", ()))
+        
+        # Add user info to all comments and replies from a single batch lookup
+        prefetch_users(user_ids)
+        for comment in all_comments:
+            comment["user_info"] = get_user_info(comment["user_id"])
         
         # Get comment stats
-        stats = comment_repo.get_plan_comment_stats(plan_id)
+        stats = comment_repo.get_plan_comment_stats(plan_oid)
         
         return {
             "plan_id": plan_id,
@@ -197,8 +231,9 @@ class InteractionService:
     def toggle_comment_like(user_id: str, comment_id: str) -> Dict[str, Any]:
         """Toggle like on a comment"""
         
-        comment_repo = CommentRepository(g.db.plan_comments)
-        comment = comment_repo.find_by_id(comment_id)
+        comment_oid = parse_object_id(comment_id, "comment id")
+        comment_repo = _repos().comments
+        comment = comment_repo.find_by_id(comment_oid)
         
         if not comment:
             raise ValueError("Comment not found")
@@ -212,26 +247,30 @@ class InteractionService:
         # For now, we'll just increment/decrement based on user action
         
         # This is a simplified implementation - you'd want to track who liked what
-        interaction_repo = InteractionRepository(g.db.plan_interactions)
+        interaction_repo = _repos().interactions
         
         # Check if user has liked this comment (using comment_id as plan_id for interaction tracking)
-        existing_like = interaction_repo.get_user_interaction(user_id, comment_id, "comment_like")
+        existing_like = interaction_repo.get_user_interaction(user_id, comment_oid, "comment_like")
         
         if existing_like:
             # Remove like
-            interaction_repo.remove_interaction(user_id, comment_id, "comment_like")
-            comment_repo.decrement_likes(comment_id)
+            run_concurrently(
+                (interaction_repo.remove_interaction, user_id, comment_oid, "comment_like"),
+                (comment_repo.decrement_likes, comment_oid)
+            )
             action = "unliked"
             liked = False
         else:
             # Add like
-            interaction_repo.upsert_interaction(user_id, comment_id, "comment_like")
-            comment_repo.increment_likes(comment_id)
+            run_concurrently(
+                (interaction_repo.upsert_interaction, user_id, comment_oid, "comment_like"),
+                (comment_repo.increment_likes, comment_oid)
+            )
             action = "liked"
             liked = True
         
         # Get updated comment
-        updated_comment = comment_repo.find_by_id(comment_id)
+        updated_comment = comment_repo.find_by_id(comment_oid)
         
         logging.info(f"User {user_id} {action} comment {comment_id}")
         
@@ -246,8 +285,8 @@ class InteractionService:
     def get_user_interactions_summary(user_id: str) -> Dict[str, Any]:
         """Get summary of user's interactions"""
         
-        interaction_repo = InteractionRepository(g.db.plan_interactions)
-        comment_repo = CommentRepository(g.db.plan_comments)
+        interaction_repo = _repos().interactions
+        comment_repo = _repos().comments
         
         # Get interaction stats
         interaction_stats = interaction_repo.get_user_interaction_stats(user_id)
@@ -257,7 +296,7 @@ class InteractionService:
         
         # Get recent interactions
         recent_likes = interaction_repo.get_user_liked_plans(user_id)[:5]
-        recent_comments = comment_repo.find_by_user(user_id, 5)
+        recent_comments = comment_repo.find_by_user(user_id, 5, content_preview=100)
         
         return {
             "user_id": user_id,
@@ -271,7 +310,7 @@ class InteractionService:
                     {
                         "comment_id": str(comment["_id"]),
                         "plan_id": str(comment["plan_id"]),
-                        "content": comment["content"][:100] + "..." if len(comment["content"]) > 100 else comment["content"],
+                        "content": comment["content"] + "..." if comment["content_truncated"] else comment["content"],
                         "created_at": comment["created_at"]
                     } for comment in recent_comments
                 ]
@@ -282,23 +321,17 @@ class InteractionService:
     def get_plan_interaction_summary(plan_id: str, user_id: Optional[str] = None) -> Dict[str, Any]:
         """Get interaction summary for a plan"""
         
-        interaction_repo = InteractionRepository(g.db.plan_interactions)
-        comment_repo = CommentRepository(g.db.plan_comments)
+        plan_oid = parse_object_id(plan_id, "skill id")
+        interaction_repo = _repos().interactions
+        comment_repo = _repos().comments
         
-        # Get plan stats
-        interaction_stats = interaction_repo.get_plan_stats(plan_id)
-        comment_stats = comment_repo.get_plan_comment_stats(plan_id)
-        
-        # Get user's interactions if user_id provided
-        user_interactions = {}
-        if user_id:
-            user_interactions = {
-                "has_liked": interaction_repo.check_user_has_liked(user_id, plan_id),
-                "user_rating": interaction_repo.get_user_rating_for_plan(user_id, plan_id)
-            }
+        # Get plan stats and the user's own interactions in one round-trip
+        interaction_stats, user_interactions = interaction_repo.get_plan_stats_with_user(plan_oid, user_id)
+        user_interactions.pop("has_downloaded", None)
+        comment_stats = comment_repo.get_plan_comment_stats(plan_oid)
         
         # Get rating distribution
-        rating_distribution = interaction_repo.get_rating_distribution(plan_id)
+        rating_distribution = interaction_repo.get_rating_distribution(plan_oid)
         
         return {
             "plan_id": plan_id,
@@ -310,22 +343,3 @@ class InteractionService:
             "rating_distribution": rating_distribution,
             "user_interactions": user_interactions
         }
-
-    @staticmethod
-    def _get_user_info(user_id: str) -> Dict:
-        """Get basic user information"""
-        from backend.auth.models import User
-        
-        user = User.find_by_id(user_id)
-        if user:
-            return {
-                "user_id": user_id,
-                "username": user.get("username", "Unknown"),
-                "avatar_url": f"https://ui-avatars.com/api/?name={user.get('username', 'U')}&background=8B5CF6&color=fff&size=40"
-            }
-        else:
-            return {
-                "user_id": user_id,
-                "username": "Unknown User",
-                "avatar_url": "https://ui-avatars.com/api/?name=U&background=8B5CF6&color=fff&size=40"
-            }
\ No newline at end of file
@@ -4,8 +4,75 @@ from flask import g, current_app
 from bson import ObjectId
 import logging
 import re
+import threading
 from backend.repositories.moderation_repository import ModerationRepository
 from backend.services.notification_service import NotificationService
+from backend.services.cache_service import CacheService
+
+class _TumblingWindowBuffer:
+    """Collect items for a short window and hand them to flush_fn as one batch
+
+    The flush runs on a timer thread, so the app and database handle of the
+    request that opened the window are carried over into a fresh app context.
+    """
+
+    def __init__(self, flush_fn, window_seconds: float = 0.05, max_size: int = 100):
+        self.flush_fn = flush_fn
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._items = []
+        self._timer = None
+        self._app = None
+        self._db = None
+
+    def add(self, item: Any):
+        with self._lock:
+            if self._timer is None:
+                self._app = current_app._get_current_object()
+                self._db = g.db
+                self._timer = threading.Timer(self.window_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            self._items.append(item)
+            flush_now = len(self._items) >= self.max_size
+        
+        if flush_now:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            items, app, db = self._items, self._app, self._db
+            self._items, self._timer, self._app, self._db = [], None, None, None
+        
+        if not items:
+            return
+        try:
+            with app.app_context():
+                g.db = db
+                self.flush_fn(items)
+        except Exception as e:
+            logging.error(f"Failed to flush moderation batch of {len(items)} in {self.flush_fn.__name__}: {e}")
+
+def _flush_outcome_notifications(items: List[Dict]):
+    NotificationService.create_notifications_bulk(items)
+
+def _flush_urgent_reports(items: List[Dict]):
+    if hasattr(current_app, 'websocket_service'):
+        current_app.websocket_service.notify_system_update(
+            update_type="urgent_reports",
+            data={"urgent_reports": items}
+        )
+
+def _flush_auto_removals(items: List[Tuple[str, ObjectId]]):
+    removed = ModerationService.remove_contents_bulk(items)
+    logging.info(f"Automatic action applied: {ModerationService.CONTENT_REMOVAL} to {removed} of {len(items)} queued items")
+
+_outcome_notifications = _TumblingWindowBuffer(_flush_outcome_notifications)
+_urgent_reports = _TumblingWindowBuffer(_flush_urgent_reports)
+_auto_removals = _TumblingWindowBuffer(_flush_auto_removals)
 
 class ModerationService:
     """Service for content moderation and community safety"""
@@ -36,6 +103,36 @@ class ModerationService:
     PERMANENT_BAN = "permanent_ban"
     ACCOUNT_SUSPENSION = "account_suspension"
 
+    _VALID_REASONS = frozenset({
+        SPAM, INAPPROPRIATE_CONTENT, HARASSMENT, HATE_SPEECH, VIOLENCE,
+        ILLEGAL_CONTENT, COPYRIGHT_VIOLATION, MISINFORMATION, FAKE_PROFILE, OTHER
+    })
+    _VALID_CONTENT_TYPES = frozenset({SKILL, COMMENT, USER, CUSTOM_TASK})
+    # Reasons whose automatic removal is written before the report returns, never batched
+    _SAFETY_CRITICAL_REASONS = frozenset({VIOLENCE, ILLEGAL_CONTENT})
+    _VALID_ACTIONS = frozenset({
+        NO_ACTION, WARNING, CONTENT_REMOVAL, TEMPORARY_BAN, PERMANENT_BAN, ACCOUNT_SUSPENSION
+    })
+
+    # Fields report_content needs from the reported document (skips bodies and descriptions)
+    _OWNER_AGE_PROJECTION = {"_id": 1, "shared_by": 1, "user_id": 1, "created_at": 1}
+
+    # Stats windows dropped from the cache when a report is reviewed
+    _STATS_INVALIDATED_WINDOWS = (1, 7)
+
+    # Collection backing each content type; users can be reported but not removed
+    _CONTENT_COLLECTIONS = {
+        SKILL: "shared_skills",
+        COMMENT: "plan_comments",
+        USER: "users",
+        CUSTOM_TASK: "custom_tasks"
+    }
+    _REMOVABLE_COLLECTIONS = {
+        SKILL: "shared_skills",
+        COMMENT: "plan_comments",
+        CUSTOM_TASK: "custom_tasks"
+    }
+
     @staticmethod
     def report_content(reporter_id: str, content_type: str, content_id: str, 
                       reason: str, description: str = None, evidence_urls: List[str] = None) -> Tuple[bool, str, Optional[Dict]]:
@@ -49,41 +146,38 @@ class ModerationService:
             if not ModerationService._is_valid_content_type(content_type):
                 return False, "Invalid content type", None
             
-            # Check if content exists and get reported user ID
-            content_data = ModerationService._get_content_data(content_type, content_id)
-            if not content_data:
+            if not ObjectId.is_valid(content_id):
                 return False, "Content not found", None
             
-            reported_user_id = ModerationService._get_content_owner(content_data, content_type)
+            # Convert ids and take the clock reading once for the whole report
+            now = datetime.utcnow()
+            reporter_oid = ObjectId(reporter_id)
+            content_oid = ObjectId(content_id)
+            
+            # Check if content exists and get reported user ID and content age
+            exists, reported_user_id, content_age = ModerationService._get_content_owner_and_age(
+                content_type, content_oid, now
+            )
+            if not exists:
+                return False, "Content not found", None
             
             # Prevent self-reporting
             if reporter_id == reported_user_id:
                 return False, "Cannot report your own content", None
             
-            # Check for duplicate reports
-            moderation_repo = ModerationRepository(g.db.moderation_reports)
-            existing_reports = moderation_repo.get_reports_by_content(content_type, content_id)
-            
             # Check if this user has already reported this content
-            user_already_reported = any(
-                str(report.get("reporter_id")) == reporter_id 
-                for report in existing_reports
-            )
-            
-            if user_already_reported:
+            moderation_repo = ModerationRepository(g.db.moderation_reports)
+            if moderation_repo.user_has_reported(reporter_oid, content_type, content_oid):
                 return False, "You have already reported this content", None
             
             # Get reporter credibility score
-            reporter_credibility = ModerationService._get_user_credibility(reporter_id)
-            
-            # Calculate content age for priority scoring
-            content_age = ModerationService._calculate_content_age(content_data)
+            reporter_credibility = ModerationService._get_user_credibility(reporter_id, now)
             
             # Prepare report data
             report_data = {
-                "reporter_id": ObjectId(reporter_id),
+                "reporter_id": reporter_oid,
                 "content_type": content_type,
-                "content_id": ObjectId(content_id),
+                "content_id": content_oid,
                 "reported_user_id": ObjectId(reported_user_id),
                 "reason": reason,
                 "description": description or f"Report for {reason}",
@@ -99,12 +193,12 @@ class ModerationService:
             report = moderation_repo.create_report(report_data)
             
             # Apply automatic moderation if applicable
-            auto_action = ModerationService._check_auto_moderation_thresholds(
-                content_type, content_id, existing_reports + [report]
-            )
+            reasons_count = moderation_repo.get_reason_counts(content_type, content_oid)
+            auto_action = ModerationService._check_auto_moderation_thresholds(reasons_count)
             
             if auto_action:
-                ModerationService._apply_automatic_action(content_type, content_id, auto_action, report["_id"])
+                ModerationService._apply_automatic_action(content_type, content_oid, auto_action,
+                                                          report["_id"], reasons_count)
             
             # Notify moderators if high priority
             if report["priority_score"] >= 80:
@@ -177,13 +271,7 @@ class ModerationService:
                 return False, "Report has already been reviewed"
             
             # Validate action
-            valid_actions = [
-                ModerationService.NO_ACTION, ModerationService.WARNING,
-                ModerationService.CONTENT_REMOVAL, ModerationService.TEMPORARY_BAN,
-                ModerationService.PERMANENT_BAN, ModerationService.ACCOUNT_SUSPENSION
-            ]
-            
-            if action not in valid_actions:
+            if action not in ModerationService._VALID_ACTIONS:
                 return False, "Invalid moderation action"
             
             # Update report status
@@ -204,6 +292,10 @@ class ModerationService:
             # Notify relevant parties
             ModerationService._notify_moderation_outcome(report, action, notes)
             
+            # Short windows should reflect the review right away; longer ones can ride out the TTL
+            for days in ModerationService._STATS_INVALIDATED_WINDOWS:
+                CacheService.invalidate_moderation_stats(days)
+            
             logging.info(f"Report {report_id} reviewed by moderator {moderator_id} with action: {action}")
             
             return True, f"Report reviewed successfully with action: {action}"
@@ -220,12 +312,20 @@ class ModerationService:
             moderation_repo = ModerationRepository(g.db.moderation_reports)
             reports = moderation_repo.get_moderation_queue(moderator_id, limit)
             
-            # Enrich reports with content information
+            # Load every reporter and reported user in one query
+            usernames = ModerationService._get_usernames(
+                {report.get("reporter_id") for report in reports} |
+                {report.get("reported_user_id") for report in reports}
+            )
+            
+            # Load each distinct piece of reported content once, grouped by type
+            previews = moderation_repo.get_content_previews(
+                (report["content_type"], report.get("content_id")) for report in reports
+            )
+            
             enriched_reports = []
             for report in reports:
-                content_data = ModerationService._get_content_data(
-                    report["content_type"], str(report["content_id"])
-                )
+                content_data = previews.get((report["content_type"], report.get("content_id")))
                 
                 enriched_report = {
                     "report_id": str(report["_id"]),
@@ -235,14 +335,12 @@ class ModerationService:
                     "description": report["description"],
                     "priority_score": report.get("priority_score", 50),
                     "created_at": report["created_at"].isoformat(),
-                    "reporter_info": {
-                        "user_id": str(report["reporter_info"][0]["_id"]) if report.get("reporter_info") else None,
-                        "username": report["reporter_info"][0]["username"] if report.get("reporter_info") else "Anonymous"
-                    },
-                    "reported_user_info": {
-                        "user_id": str(report["reported_user_info"][0]["_id"]) if report.get("reported_user_info") else None,
-                        "username": report["reported_user_info"][0]["username"] if report.get("reported_user_info") else "Unknown"
-                    },
+                    "reporter_info": ModerationService._format_user_ref(
+                        report.get("reporter_id"), usernames, "Anonymous"
+                    ),
+                    "reported_user_info": ModerationService._format_user_ref(
+                        report.get("reported_user_id"), usernames, "Unknown"
+                    ),
                     "content_preview": ModerationService._get_content_preview(content_data, report["content_type"])
                 }
                 
@@ -262,24 +360,23 @@ class ModerationService:
         """Get moderation statistics and insights"""
         
         try:
-            moderation_repo = ModerationRepository(g.db.moderation_reports)
-            stats = moderation_repo.get_moderation_stats(days)
+            # Dashboards poll this endpoint; serve the cached figures while they are fresh
+            cached_stats = CacheService.get_moderation_stats(days)
+            if cached_stats is not None:
+                return cached_stats
             
-            # Get additional insights
-            frequent_reporters = moderation_repo.get_frequent_reporters(10, days)
-            frequently_reported = moderation_repo.get_frequently_reported_content(10, days)
-            
-            # Calculate response metrics
-            response_metrics = ModerationService._calculate_response_metrics(days)
+            moderation_repo = ModerationRepository(g.db.moderation_reports)
+            dashboard = moderation_repo.get_moderation_dashboard(days, limit=10)
+            insight_flags = dashboard.pop("insight_flags")
             
             enhanced_stats = {
-                **stats,
-                "frequent_reporters": frequent_reporters,
-                "frequently_reported_content": frequently_reported,
-                "response_metrics": response_metrics,
-                "insights": ModerationService._generate_moderation_insights(stats)
+                **dashboard,
+                "response_metrics": ModerationService._format_response_metrics(dashboard["response_metrics"]),
+                "insights": ModerationService._generate_moderation_insights(dashboard, insight_flags)
             }
             
+            CacheService.cache_moderation_stats(days, enhanced_stats)
+            
             return enhanced_stats
             
         except Exception as e:
@@ -335,45 +432,61 @@ class ModerationService:
     @staticmethod
     def _is_valid_report_reason(reason: str) -> bool:
         """Validate report reason"""
-        valid_reasons = [
-            ModerationService.SPAM, ModerationService.INAPPROPRIATE_CONTENT,
-            ModerationService.HARASSMENT, ModerationService.HATE_SPEECH,
-            ModerationService.VIOLENCE, ModerationService.ILLEGAL_CONTENT,
-            ModerationService.COPYRIGHT_VIOLATION, ModerationService.MISINFORMATION,
-            ModerationService.FAKE_PROFILE, ModerationService.OTHER
-        ]
-        return reason in valid_reasons
+        return reason in ModerationService._VALID_REASONS
 
     @staticmethod
     def _is_valid_content_type(content_type: str) -> bool:
         """Validate content type"""
-        valid_types = [
-            ModerationService.SKILL, ModerationService.COMMENT,
-            ModerationService.USER, ModerationService.CUSTOM_TASK
-        ]
-        return content_type in valid_types
+        return content_type in ModerationService._VALID_CONTENT_TYPES
 
     @staticmethod
-    def _get_content_data(content_type: str, content_id: str) -> Optional[Dict]:
+    def _get_content_data(content_type: str, content_id: ObjectId, projection: Dict = None) -> Optional[Dict]:
         """Get content data based on type"""
         try:
-            collections = {
-                ModerationService.SKILL: "shared_skills",
-                ModerationService.COMMENT: "plan_comments",
-                ModerationService.USER: "users",
-                ModerationService.CUSTOM_TASK: "custom_tasks"
-            }
-            
-            collection_name = collections.get(content_type)
+            collection_name = ModerationService._CONTENT_COLLECTIONS.get(content_type)
             if not collection_name:
                 return None
             
             collection = g.db[collection_name]
-            return collection.find_one({"_id": ObjectId(content_id)})
+            return collection.find_one({"_id": content_id}, projection)
             
         except Exception:
             return None
 
+    @staticmethod
+    def _get_content_owner_and_age(content_type: str, content_id: ObjectId,
+                                   now: Optional[datetime] = None) -> Tuple[bool, Optional[str], int]:
+        """Look up only the owner and creation time of reported content"""
+        content_data = ModerationService._get_content_data(
+            content_type, content_id, ModerationService._OWNER_AGE_PROJECTION
+        )
+        if not content_data:
+            return False, None, 0
+        
+        return (
+            True,
+            ModerationService._get_content_owner(content_data, content_type),
+            ModerationService._calculate_content_age(content_data, now)
+        )
+
+    @staticmethod
+    def _get_usernames(user_ids: set) -> Dict[ObjectId, str]:
+        """Get usernames for a set of user ObjectIds with a single query"""
+        from backend.auth.models import User
+        
+        user_ids = [user_id for user_id in user_ids if user_id]
+        return {
+            user["_id"]: user.get("username")
+            for user in User.find_by_ids(user_ids, {"username": 1})
+        }
+
+    @staticmethod
+    def _format_user_ref(user_id: Optional[ObjectId], usernames: Dict[ObjectId, str], fallback: str) -> Dict:
+        """Build the user reference shown in the moderation queue"""
+        if user_id not in usernames:
+            return {"user_id": None, "username": fallback}
+        return {"user_id": str(user_id), "username": usernames[user_id]}
+
     @staticmethod
     def _get_content_owner(content_data: Dict, content_type: str) -> str:
         """Get the owner/author of content"""
@@ -389,66 +502,78 @@ class ModerationService:
             return str(content_data.get("user_id", content_data.get("_id")))
 
     @staticmethod
-    def _get_user_credibility(user_id: str) -> float:
+    def _get_user_credibility(user_id: str, now: Optional[datetime] = None) -> float:
         """Calculate user credibility score for reporting"""
         try:
-            # Base credibility
-            credibility = 1.0
-            
-            # Get user's report history
-            moderation_repo = ModerationRepository(g.db.moderation_reports)
-            user_reports = moderation_repo.get_reports_by_user(user_id, 50)
-            
-            if not user_reports:
-                return credibility
-            
-            # Calculate accuracy rate
-            resolved_reports = [r for r in user_reports if r["status"] in ["resolved", "dismissed"]]
-            if resolved_reports:
-                accurate_reports = len([r for r in resolved_reports if r["status"] == "resolved"])
-                accuracy_rate = accurate_reports / len(resolved_reports)
-                
-                # Adjust credibility based on accuracy
-                if accuracy_rate >= 0.8:
-                    credibility += 0.5
-                elif accuracy_rate >= 0.6:
-                    credibility += 0.2
-                elif accuracy_rate < 0.3:
-                    credibility -= 0.3
-            
-            # Prevent spam reporting
-            recent_reports = [
-                r for r in user_reports 
-                if r["created_at"] > datetime.utcnow() - timedelta(days=7)
-            ]
-            
-            if len(recent_reports) > 10:  # More than 10 reports in a week
-                credibility -= 0.4
+            cached_credibility = CacheService.get_user_credibility(user_id)
+            if cached_credibility is not None:
+                return cached_credibility
             
-            return max(0.1, min(2.0, credibility))  # Clamp between 0.1 and 2.0
+            credibility = ModerationService._compute_user_credibility(user_id, now or datetime.utcnow())
+            CacheService.cache_user_credibility(user_id, credibility)
+            return credibility
             
         except Exception:
             return 1.0  # Default credibility
 
     @staticmethod
-    def _calculate_content_age(content_data: Dict) -> int:
+    def _compute_user_credibility(user_id: str, now: datetime) -> float:
+        """Compute user credibility score from their report history"""
+        # Base credibility
+        credibility = 1.0
+            
+        # Get user's report history
+        moderation_repo = ModerationRepository(g.db.moderation_reports)
+        user_reports = moderation_repo.get_reports_by_user(user_id, 50)
+        
+        if not user_reports:
+            return credibility
+        
+        # Calculate accuracy rate in a single pass
+        resolved_count = accurate_count = 0
+        for report in user_reports:
+            status = report["status"]
+            if status == "resolved":
+                resolved_count += 1
+                accurate_count += 1
+            elif status == "dismissed":
+                resolved_count += 1
+        
+        if resolved_count:
+            accuracy_rate = accurate_count / resolved_count
+            
+            # Adjust credibility based on accuracy
+            if accuracy_rate >= 0.8:
+                credibility += 0.5
+            elif accuracy_rate >= 0.6:
+                credibility += 0.2
+            elif accuracy_rate < 0.3:
+                credibility -= 0.3
+        
+        # Prevent spam reporting: more than 10 reports in a week
+        recent_report_count = moderation_repo.count_reports_by_user_since(
+            user_id, now - timedelta(days=7), limit=11
+        )
+        
+        if recent_report_count > 10:
+            credibility -= 0.4
+        
+        return max(0.1, min(2.0, credibility))  # Clamp between 0.1 and 2.0
+
+    @staticmethod
+    def _calculate_content_age(content_data: Dict, now: Optional[datetime] = None) -> int:
         """Calculate content age in hours"""
         try:
-            created_at = content_data.get("created_at", datetime.utcnow())
-            age_delta = datetime.utcnow() - created_at
+            now = now or datetime.utcnow()
+            created_at = content_data.get("created_at", now)
+            age_delta = now - created_at
             return int(age_delta.total_seconds() / 3600)  # Convert to hours
         except Exception:
             return 24  # Default to 24 hours
 
     @staticmethod
-    def _check_auto_moderation_thresholds(content_type: str, content_id: str, all_reports: List[Dict]) -> Optional[str]:
-        """Check if content should be automatically moderated"""
-        
-        # Count reports by reason
-        reasons_count = {}
-        for report in all_reports:
-            reason = report.get("reason", "other")
-            reasons_count[reason] = reasons_count.get(reason, 0) + 1
+    def _check_auto_moderation_thresholds(reasons_count: Dict[str, int]) -> Optional[str]:
+        """Check if content should be automatically moderated given its report counts by reason"""
         
         # Define thresholds for automatic action
         auto_thresholds = {
@@ -474,11 +599,19 @@ class ModerationService:
         return None
 
     @staticmethod
-    def _apply_automatic_action(content_type: str, content_id: str, action: str, report_id: str):
+    def _apply_automatic_action(content_type: str, content_id: ObjectId, action: str, report_id: ObjectId,
+                                reasons_count: Dict[str, int]):
         """Apply automatic moderation action"""
         try:
             if action == ModerationService.CONTENT_REMOVAL:
-                ModerationService._remove_content(content_type, content_id)
+                if any(reasons_count.get(reason, 0) for reason in ModerationService._SAFETY_CRITICAL_REASONS):
+                    ModerationService._remove_content(content_type, content_id)
+                else:
+                    # Spam waves are queued so a burst of reports becomes one update per collection;
+                    # the flush logs the removal once it is written
+                    _auto_removals.add((content_type, content_id))
+                    logging.info(f"Automatic action queued: {action} to {content_type}:{content_id}")
+                    return
             elif action == ModerationService.WARNING:
                 ModerationService._issue_warning(content_type, content_id)
             
@@ -488,23 +621,38 @@ class ModerationService:
             logging.error(f"Error applying automatic action: {e}")
 
     @staticmethod
-    def _remove_content(content_type: str, content_id: str):
+    def _remove_content(content_type: str, content_id: ObjectId):
         """Remove content from the platform"""
-        collections = {
-            ModerationService.SKILL: "shared_skills",
-            ModerationService.COMMENT: "plan_comments",
-            ModerationService.CUSTOM_TASK: "custom_tasks"
-        }
-        
-        collection_name = collections.get(content_type)
+        collection_name = ModerationService._REMOVABLE_COLLECTIONS.get(content_type)
         if collection_name:
             g.db[collection_name].update_one(
-                {"_id": ObjectId(content_id)},
+                {"_id": content_id},
                 {"$set": {"is_removed": True, "removed_at": datetime.utcnow()}}
             )
 
     @staticmethod
-    def _issue_warning(content_type: str, content_id: str):
+    def remove_contents_bulk(items: List[Tuple[str, ObjectId]]) -> int:
+        """Remove many pieces of content with one update_many per collection"""
+        # Group by collection; the set drops duplicate reports on the same item
+        ids_by_collection = {}
+        for content_type, content_id in items:
+            collection_name = ModerationService._REMOVABLE_COLLECTIONS.get(content_type)
+            if collection_name:
+                ids_by_collection.setdefault(collection_name, set()).add(content_id)
+        
+        now = datetime.utcnow()
+        removed = 0
+        for collection_name, ids in ids_by_collection.items():
+            result = g.db[collection_name].update_many(
+                {"_id": {"$in": list(ids)}},
+                {"$set": {"is_removed": True, "removed_at": now}}
+            )
+            removed += result.modified_count
+        
+        return removed
+
+    @staticmethod
+    def _issue_warning(content_type: str, content_id: ObjectId):
         """Issue a warning for content"""
         # This could be implemented to flag content or notify the user
         pass
@@ -513,17 +661,13 @@ class ModerationService:
     def _notify_moderators_urgent(report: Dict):
         """Notify moderators of urgent reports"""
         try:
-            if hasattr(current_app, 'websocket_service'):
-                websocket_service = current_app.websocket_service
-                websocket_service.notify_system_update(
-                    update_type="urgent_report",
-                    data={
-                        "report_id": str(report["_id"]),
-                        "content_type": report["content_type"],
-                        "reason": report["reason"],
-                        "priority_score": report["priority_score"]
-                    }
-                )
+            # Urgent reports arriving together go out as one system update
+            _urgent_reports.add({
+                "report_id": str(report["_id"]),
+                "content_type": report["content_type"],
+                "reason": report["reason"],
+                "priority_score": report["priority_score"]
+            })
         except Exception as e:
             logging.error(f"Failed to notify moderators: {e}")
 
@@ -531,9 +675,10 @@ class ModerationService:
     def _execute_moderation_action(report: Dict, action: str, moderator_id: str, notes: str) -> bool:
         """Execute the moderation action"""
         try:
+            # Ids stay as ObjectIds until they reach a response or notification
             content_type = report["content_type"]
-            content_id = str(report["content_id"])
-            reported_user_id = str(report["reported_user_id"])
+            content_id = report["content_id"]
+            reported_user_id = report["reported_user_id"]
             
             if action == ModerationService.CONTENT_REMOVAL:
                 ModerationService._remove_content(content_type, content_id)
@@ -554,14 +699,14 @@ class ModerationService:
             return False
 
     @staticmethod
-    def _issue_user_warning(user_id: str, report: Dict, notes: str):
+    def _issue_user_warning(user_id: ObjectId, report: Dict, notes: str):
         """Issue a warning to a user"""
         # Create notification for the user
         NotificationService.create_notification(
             user_id=user_id,
             notification_type="moderation_warning",
             reference_type="moderation",
-            reference_id=str(report["_id"]),
+            reference_id=report["_id"],
             data={
                 "message": f"Warning issued for {report['reason']}",
                 "notes": notes,
@@ -570,14 +715,14 @@ class ModerationService:
         )
 
     @staticmethod
-    def _ban_user(user_id: str, ban_type: str, notes: str):
+    def _ban_user(user_id: ObjectId, ban_type: str, notes: str):
         """Ban a user temporarily or permanently"""
         ban_duration = None
         if ban_type == ModerationService.TEMPORARY_BAN:
             ban_duration = datetime.utcnow() + timedelta(days=7)  # 7 day ban
         
         g.db.users.update_one(
-            {"_id": ObjectId(user_id)},
+            {"_id": user_id},
             {
                 "$set": {
                     "is_banned": True,
@@ -590,10 +735,10 @@ class ModerationService:
         )
 
     @staticmethod
-    def _suspend_user(user_id: str, notes: str):
+    def _suspend_user(user_id: ObjectId, notes: str):
         """Suspend a user account"""
         g.db.users.update_one(
-            {"_id": ObjectId(user_id)},
+            {"_id": user_id},
             {
                 "$set": {
                     "is_suspended": True,
@@ -606,92 +751,53 @@ class ModerationService:
     @staticmethod
     def _update_credibility_scores(report: Dict, action: str):
         """Update credibility scores based on moderation outcome"""
-        # This would update the reporter's credibility based on whether their report was valid
-        pass
+        # The reporter's accuracy just changed, so drop their cached score
+        if report.get("reporter_id"):
+            CacheService.invalidate_user_credibility(str(report["reporter_id"]))
 
     @staticmethod
     def _notify_moderation_outcome(report: Dict, action: str, notes: str):
         """Notify relevant parties about moderation outcome"""
-        # Notify the reporter about the outcome
+        # Notify the reporter about the outcome; reviews close together are inserted in bulk
         if report.get("reporter_id"):
-            NotificationService.create_notification(
-                user_id=str(report["reporter_id"]),
-                notification_type="report_resolved",
-                reference_type="moderation",
-                reference_id=str(report["_id"]),
-                data={
+            _outcome_notifications.add({
+                "user_id": report["reporter_id"],
+                "notification_type": "report_resolved",
+                "reference_type": "moderation",
+                "reference_id": report["_id"],
+                "data": {
                     "message": f"Your report has been reviewed",
                     "action_taken": action,
                     "content_type": report["content_type"]
                 }
-            )
+            })
 
     @staticmethod
-    def _calculate_response_metrics(days: int) -> Dict:
-        """Calculate moderation response time metrics"""
-        try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
-            
-            pipeline = [
-                {"$match": {
-                    "created_at": {"$gte": cutoff_date},
-                    "reviewed_at": {"$exists": True}
-                }},
-                {"$addFields": {
-                    "response_time_hours": {
-                        "$divide": [
-                            {"$subtract": ["$reviewed_at", "$created_at"]},
-                            3600000  # Convert milliseconds to hours
-                        ]
-                    }
-                }},
-                {"$group": {
-                    "_id": None,
-                    "avg_response_time": {"$avg": "$response_time_hours"},
-                    "max_response_time": {"$max": "$response_time_hours"},
-                    "min_response_time": {"$min": "$response_time_hours"},
-                    "total_resolved": {"$sum": 1}
-                }}
-            ]
-            
-            moderation_repo = ModerationRepository(g.db.moderation_reports)
-            result = list(moderation_repo.collection.aggregate(pipeline))
-            
-            if result:
-                metrics = result[0]
-                return {
-                    "average_response_hours": round(metrics.get("avg_response_time", 0), 2),
-                    "max_response_hours": round(metrics.get("max_response_time", 0), 2),
-                    "min_response_hours": round(metrics.get("min_response_time", 0), 2),
-                    "total_resolved_reports": metrics.get("total_resolved", 0)
-                }
-            
+    def _format_response_metrics(metrics: Optional[Dict]) -> Dict:
+        """Shape the grouped response-time figures for the API"""
+        if not metrics:
             return {"average_response_hours": 0, "total_resolved_reports": 0}
-            
-        except Exception as e:
-            logging.error(f"Error calculating response metrics: {e}")
-            return {}
+        
+        return {
+            "average_response_hours": round(metrics.get("avg_response_time", 0), 2),
+            "max_response_hours": round(metrics.get("max_response_time", 0), 2),
+            "min_response_hours": round(metrics.get("min_response_time", 0), 2),
+            "total_resolved_reports": metrics.get("total_resolved", 0)
+        }
 
     @staticmethod
-    def _generate_moderation_insights(stats: Dict) -> List[str]:
-        """Generate insights from moderation statistics"""
+    def _generate_moderation_insights(stats: Dict, flags: Dict) -> List[str]:
+        """Turn the insight flags computed in the stats aggregation into messages"""
         insights = []
         
-        total_reports = stats.get("total_reports", 0)
-        by_status = stats.get("by_status", {})
+        if flags.get("high_pending"):
+            pending_count = stats.get("by_status", {}).get("pending", 0)
+            insights.append(f"High number of pending reports ({pending_count}) - consider increasing moderation capacity")
         
-        if total_reports > 0:
-            pending_count = by_status.get("pending", 0)
-            if pending_count > total_reports * 0.3:
-                insights.append(f"High number of pending reports ({pending_count}) - consider increasing moderation capacity")
-            
-            resolved_count = by_status.get("resolved", 0)
-            if resolved_count > 0:
-                resolution_rate = (resolved_count / total_reports) * 100
-                if resolution_rate > 80:
-                    insights.append("High resolution rate indicates effective moderation")
-                else:
-                    insights.append("Low resolution rate - review moderation processes")
+        if flags.get("high_resolution_rate"):
+            insights.append("High resolution rate indicates effective moderation")
+        elif flags.get("low_resolution_rate"):
+            insights.append("Low resolution rate - review moderation processes")
         
         return insights
 
@@ -1,9 +1,86 @@
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
 from flask import g, current_app
 from bson import ObjectId
+from pymongo import InsertOne
 import logging
+from backend.auth.models import User
+from backend.models.notification_types import (
+    NotificationPayload, LikeNotification, CommentNotification, ReplyNotification,
+    DownloadNotification, CustomTaskNotification, TaskVoteNotification, RatingNotification
+)
 from backend.repositories.notification_repository import NotificationRepository
+from backend.services.cache_service import CacheService
+from backend.services.user_info import get_user_info, remember_user_info
+from backend.repositories.utils import IdLike, parse_object_id, to_object_id
+
+# Relative-time units, largest first, for _format_timestamp
+_TIMESTAMP_UNITS = ((86400, "day"), (3600, "hour"), (60, "minute"))
+
+def _skill_rated_message(data: Dict) -> str:
+    review = data.get("review_preview", "")
+    review_text = f": \"{review[:50]}...\"" if len(review) > 3 else ""
+    return f"{data['rater_name']} rated your skill \"{data['skill_title']}\" {data['stars']}{review_text}"
+
+# Messages are rendered from the structured fields on read instead of being stored
+_MESSAGE_TEMPLATES = {
+    "like_received": '{liker_name} liked your skill "{skill_title}"',
+    "comment_received": '{commenter_name} commented on your skill "{skill_title}"',
+    "comment_reply": '{replier_name} replied to your comment on "{skill_title}"',
+    "skill_downloaded": '{downloader_name} downloaded your skill "{skill_title}"',
+    "custom_task_added": '{contributor_name} added a custom task "{task_title}" to day {day} of your skill "{skill_title}"',
+    "task_voted": '{voter_name} upvoted your custom task "{task_title}"',
+    "skill_rated": _skill_rated_message
+}
+_AGGREGATED_MESSAGE_TEMPLATES = {
+    "like_received": '{count} people liked "{skill_title}"'
+}
+
+# Longest comment/reply excerpt stored in a notification
+PREVIEW_LENGTH = 100
+
+def _preview(content: str, limit: int = PREVIEW_LENGTH) -> str:
+    """Excerpt of content for notification data, with a single slice"""
+    return content if len(content) <= limit else content[:limit] + "..."
+
+# Runs notify_* helpers after the triggering request has returned
+_DISPATCH_EXEC = ThreadPoolExecutor(max_workers=4, thread_name_prefix="notification-dispatch")
+
+def _dispatched_in_background(func):
+    """Run a notify_* helper on the dispatch executor and return None right away
+
+    The actor lookup, insert and WebSocket send don't affect the HTTP
+    response, so they run in a fresh app context carrying the caller's db.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs) -> None:
+        # Batched callers flush the batch themselves, so collect into it synchronously
+        if kwargs.get("batch_context") is not None:
+            func(*args, **kwargs)
+            return None
+        
+        app = current_app._get_current_object()
+        db = g.db
+        
+        def run():
+            try:
+                with app.app_context():
+                    g.db = db
+                    func(*args, **kwargs)
+            except Exception as e:
+                logging.error(f"Failed to dispatch {func.__name__}: {e}")
+        
+        _DISPATCH_EXEC.submit(run)
+        return None
+    return wrapper
+
+def _notification_repo() -> NotificationRepository:
+    """Get the notification repository, built once per request and cached on g"""
+    if "_notification_repo" not in g:
+        g._notification_repo = NotificationRepository(g.db.notifications)
+    return g._notification_repo
 
 class NotificationService:
     """Service for managing user notifications and real-time updates"""
@@ -18,36 +95,63 @@ class NotificationService:
     FOLLOWER_ADDED = "follower_added"
     SKILL_RATED = "skill_rated"
 
+    # Repeated events of these types bump a count on one notification
+    _AGGREGATED_TYPES = frozenset({LIKE_RECEIVED, SKILL_DOWNLOADED})
+
+    # Fields needed to render the notification list
+    _LIST_PROJECTION = {
+        "notification_type": 1,
+        "reference_type": 1,
+        "reference_id": 1,
+        "created_at": 1,
+        "read": 1,
+        "actor_id": 1,
+        "data": 1
+    }
+
     @staticmethod
-    def create_notification(user_id: str, notification_type: str, 
-                          reference_type: str, reference_id: str, 
-                          data: Dict, actor_id: str = None) -> Dict:
+    def create_notification(user_id: IdLike, notification_type: str, 
+                          reference_type: str, reference_id: IdLike, 
+                          data: Dict, actor_id: Optional[IdLike] = None) -> Dict:
         """Create a new notification"""
         
-        notification_repo = NotificationRepository(g.db.notifications)
-        
-        # Check if similar notification already exists (to avoid spam)
-        existing = notification_repo.find_by_type_and_reference(
-            user_id, notification_type, reference_id, reference_type
-        )
+        notification_repo = _notification_repo()
+        notification_id = ObjectId()
         
-        if existing and notification_type in [
-            NotificationService.LIKE_RECEIVED, 
-            NotificationService.SKILL_DOWNLOADED
-        ]:
-            # For some notification types, aggregate rather than create duplicates
-            return NotificationService._update_aggregated_notification(
-                existing, data, actor_id
+        # For some notification types, aggregate rather than create duplicates
+        if notification_type in NotificationService._AGGREGATED_TYPES:
+            existing_id = CacheService.claim_notification_aggregate(
+                user_id, notification_type, reference_type, reference_id, str(notification_id)
             )
+            
+            if existing_id is None:
+                # Redis unavailable; fall back to looking the notification up
+                existing = notification_repo.find_by_type_and_reference(
+                    user_id, notification_type, reference_id, reference_type
+                )
+                existing_id = str(existing["_id"]) if existing else None
+            
+            if existing_id and existing_id != str(notification_id):
+                aggregated = NotificationService._update_aggregated_notification(
+                    to_object_id(existing_id), notification_type, actor_id
+                )
+                if aggregated:
+                    return aggregated
+                
+                # The aggregated notification was deleted; start a fresh one
+                CacheService.reset_notification_aggregate(
+                    user_id, notification_type, reference_type, reference_id, str(notification_id)
+                )
         
         # Create new notification
         notification_data = {
-            "user_id": ObjectId(user_id),
+            "_id": notification_id,
+            "user_id": to_object_id(user_id),
             "notification_type": notification_type,
             "reference_type": reference_type,  # 'skill', 'comment', 'task', 'user'
-            "reference_id": ObjectId(reference_id),
+            "reference_id": to_object_id(reference_id),
             "data": data,
-            "actor_id": ObjectId(actor_id) if actor_id else None
+            "actor_id": to_object_id(actor_id) if actor_id else None
         }
         
         notification = notification_repo.create(notification_data)
@@ -56,16 +160,11 @@ class NotificationService:
         try:
             if hasattr(current_app, 'websocket_service'):
                 websocket_service = current_app.websocket_service
-                websocket_service.notify_user_personal(
-                    user_id=user_id,
+                # Only the id travels over the socket; clients fetch details from the list endpoint
+                websocket_service.queue_user_personal(
+                    user_id=str(user_id),
                     notification_type=notification_type,
-                    data={
-                        "notification_id": str(notification["_id"]),
-                        "message": NotificationService._format_notification_message(
-                            notification_type, data
-                        ),
-                        **data
-                    }
+                    data={"id": str(notification["_id"])}
                 )
         except Exception as e:
             logging.error(f"Failed to send real-time notification: {e}")
@@ -75,150 +174,248 @@ class NotificationService:
         return notification
 
     @staticmethod
+    def create_notifications_bulk(items: List[Dict]) -> List[Dict]:
+        """Create many notifications with one bulk write
+
+        Each item takes the same keyword arguments as create_notification.
+        Likes and downloads are folded into the matching notification (and
+        into each other within the batch) with upserts; everything else is
+        inserted. Returns the newly created notifications.
+        """
+        
+        notification_repo = _notification_repo()
+        now = datetime.utcnow()
+        
+        operations = []
+        new_notifications = {}  # operation index -> document, for inserts and possible upserts
+        aggregated = {}  # aggregation key -> [document, event count]
+        
+        for item in items:
+            notification = {
+                "user_id": to_object_id(item["user_id"]),
+                "notification_type": item["notification_type"],
+                "reference_type": item["reference_type"],
+                "reference_id": to_object_id(item["reference_id"]),
+                "data": item["data"],
+                "actor_id": to_object_id(item["actor_id"]) if item.get("actor_id") else None
+            }
+            
+            if notification["notification_type"] in NotificationService._AGGREGATED_TYPES:
+                key = (notification["user_id"], notification["notification_type"],
+                       notification["reference_type"], notification["reference_id"])
+                if key in aggregated:
+                    aggregated[key][1] += 1
+                else:
+                    aggregated[key] = [notification, 1]
+                continue
+            
+            notification.update({"_id": ObjectId(), "created_at": now, "read": False, "delivered": False})
+            new_notifications[len(operations)] = notification
+            operations.append(InsertOne(notification))
+        
+        for notification, count in aggregated.values():
+            new_notifications[len(operations)] = notification
+            operations.append(notification_repo.aggregated_upsert(notification, count))
+        
+        if not operations:
+            return []
+        
+        result = notification_repo.bulk_create(operations)
+        
+        # Upserts that matched an existing notification were only aggregated
+        notifications = []
+        new_unread = {}
+        for index, notification in new_notifications.items():
+            if "_id" not in notification:
+                if index not in result.upserted_ids:
+                    continue
+                notification.update({"_id": result.upserted_ids[index], "created_at": now,
+                                     "read": False, "delivered": False})
+            notifications.append(notification)
+            new_unread[notification["user_id"]] = new_unread.get(notification["user_id"], 0) + 1
+        
+        notification_repo.increment_unread(new_unread)
+        
+        # Send real-time notifications if WebSocket is available
+        try:
+            if hasattr(current_app, 'websocket_service'):
+                websocket_service = current_app.websocket_service
+                for notification in notifications:
+                    websocket_service.queue_user_personal(
+                        user_id=str(notification["user_id"]),
+                        notification_type=notification["notification_type"],
+                        data={"id": str(notification["_id"])}
+                    )
+        except Exception as e:
+            logging.error(f"Failed to send real-time notifications: {e}")
+        
+        logging.info(f"Wrote {len(items)} notifications in bulk ({len(notifications)} new)")
+        
+        return notifications
+
+    @staticmethod
+    def flush(batch_context: List[Dict]) -> List[Dict]:
+        """Write the notifications collected in a batch_context and empty it"""
+        items = list(batch_context)
+        batch_context.clear()
+        return NotificationService.create_notifications_bulk(items)
+
+    @staticmethod
+    def _create_or_batch(batch_context: Optional[List[Dict]], data: NotificationPayload,
+                         **notification) -> Optional[Dict]:
+        """Create a notification now, or queue it on the caller's batch_context"""
+        notification["data"] = data.to_data()
+        if batch_context is not None:
+            batch_context.append(notification)
+            return None
+        return NotificationService.create_notification(**notification)
+
+    @staticmethod
+    @_dispatched_in_background
     def notify_like_received(skill_id: str, skill_owner_id: str, liker_id: str, 
-                           skill_title: str) -> Optional[Dict]:
+                           skill_title: str,
+                           batch_context: Optional[List[Dict]] = None) -> None:
         """Notify skill owner about received like"""
         
         if skill_owner_id == liker_id:  # Don't notify self-likes
             return None
         
         # Get liker info
-        from backend.auth.models import User
         liker = User.find_by_id(liker_id)
         liker_name = liker.get("username", "Someone") if liker else "Someone"
         
-        return NotificationService.create_notification(
+        return NotificationService._create_or_batch(
+            batch_context,
             user_id=skill_owner_id,
             notification_type=NotificationService.LIKE_RECEIVED,
             reference_type="skill",
             reference_id=skill_id,
-            data={
-                "skill_title": skill_title,
-                "liker_name": liker_name,
-                "message": f"{liker_name} liked your skill \"{skill_title}\""
-            },
+            data=LikeNotification(skill_title=skill_title, liker_name=liker_name),
             actor_id=liker_id
         )
 
     @staticmethod
+    @_dispatched_in_background
     def notify_comment_received(skill_id: str, skill_owner_id: str, commenter_id: str,
-                              skill_title: str, comment_content: str) -> Optional[Dict]:
+                              skill_title: str, comment_content: str,
+                              batch_context: Optional[List[Dict]] = None) -> None:
         """Notify skill owner about received comment"""
         
         if skill_owner_id == commenter_id:  # Don't notify self-comments
             return None
         
         # Get commenter info
-        from backend.auth.models import User
         commenter = User.find_by_id(commenter_id)
         commenter_name = commenter.get("username", "Someone") if commenter else "Someone"
         
         # Truncate comment for notification
-        short_comment = comment_content[:100] + "..." if len(comment_content) > 100 else comment_content
+        short_comment = _preview(comment_content)
         
-        return NotificationService.create_notification(
+        return NotificationService._create_or_batch(
+            batch_context,
             user_id=skill_owner_id,
             notification_type=NotificationService.COMMENT_RECEIVED,
             reference_type="skill",
             reference_id=skill_id,
-            data={
-                "skill_title": skill_title,
-                "commenter_name": commenter_name,
-                "comment_preview": short_comment,
-                "message": f"{commenter_name} commented on your skill \"{skill_title}\""
-            },
+            data=CommentNotification(
+                skill_title=skill_title,
+                commenter_name=commenter_name,
+                comment_preview=short_comment
+            ),
             actor_id=commenter_id
         )
 
     @staticmethod
+    @_dispatched_in_background
     def notify_comment_reply(parent_comment_id: str, parent_author_id: str, 
                            replier_id: str, skill_id: str, skill_title: str,
-                           reply_content: str) -> Optional[Dict]:
+                           reply_content: str,
+                           batch_context: Optional[List[Dict]] = None) -> None:
         """Notify parent comment author about reply"""
         
         if parent_author_id == replier_id:  # Don't notify self-replies
             return None
         
         # Get replier info
-        from backend.auth.models import User
         replier = User.find_by_id(replier_id)
         replier_name = replier.get("username", "Someone") if replier else "Someone"
         
         # Truncate reply for notification
-        short_reply = reply_content[:100] + "..." if len(reply_content) > 100 else reply_content
+        short_reply = _preview(reply_content)
         
-        return NotificationService.create_notification(
+        return NotificationService._create_or_batch(
+            batch_context,
             user_id=parent_author_id,
             notification_type=NotificationService.COMMENT_REPLY,
             reference_type="comment",
             reference_id=parent_comment_id,
-            data={
-                "skill_title": skill_title,
-                "skill_id": skill_id,
-                "replier_name": replier_name,
-                "reply_preview": short_reply,
-                "message": f"{replier_name} replied to your comment on \"{skill_title}\""
-            },
+            data=ReplyNotification(
+                skill_title=skill_title,
+                skill_id=skill_id,
+                replier_name=replier_name,
+                reply_preview=short_reply
+            ),
             actor_id=replier_id
         )
 
     @staticmethod
+    @_dispatched_in_background
     def notify_skill_downloaded(skill_id: str, skill_owner_id: str, downloader_id: str,
-                              skill_title: str) -> Optional[Dict]:
+                              skill_title: str,
+                              batch_context: Optional[List[Dict]] = None) -> None:
         """Notify skill owner about skill download"""
         
         if skill_owner_id == downloader_id:  # Don't notify self-downloads
             return None
         
         # Get downloader info
-        from backend.auth.models import User
         downloader = User.find_by_id(downloader_id)
         downloader_name = downloader.get("username", "Someone") if downloader else "Someone"
         
-        return NotificationService.create_notification(
+        return NotificationService._create_or_batch(
+            batch_context,
             user_id=skill_owner_id,
             notification_type=NotificationService.SKILL_DOWNLOADED,
             reference_type="skill",
             reference_id=skill_id,
-            data={
-                "skill_title": skill_title,
-                "downloader_name": downloader_name,
-                "message": f"{downloader_name} downloaded your skill \"{skill_title}\""
-            },
+            data=DownloadNotification(skill_title=skill_title, downloader_name=downloader_name),
             actor_id=downloader_id
         )
 
     @staticmethod
+    @_dispatched_in_background
     def notify_custom_task_added(skill_id: str, skill_owner_id: str, contributor_id: str,
-                               skill_title: str, day: int, task_title: str) -> Optional[Dict]:
+                               skill_title: str, day: int, task_title: str,
+                               batch_context: Optional[List[Dict]] = None) -> None:
         """Notify skill owner about custom task added to their skill"""
         
         if skill_owner_id == contributor_id:  # Don't notify if owner added their own task
             return None
         
         # Get contributor info
-        from backend.auth.models import User
         contributor = User.find_by_id(contributor_id)
         contributor_name = contributor.get("username", "Someone") if contributor else "Someone"
         
-        return NotificationService.create_notification(
+        return NotificationService._create_or_batch(
+            batch_context,
             user_id=skill_owner_id,
             notification_type=NotificationService.CUSTOM_TASK_ADDED,
             reference_type="skill",
             reference_id=skill_id,
-            data={
-                "skill_title": skill_title,
-                "contributor_name": contributor_name,
-                "day": day,
-                "task_title": task_title,
-                "message": f"{contributor_name} added a custom task \"{task_title}\" to day {day} of your skill \"{skill_title}\""
-            },
+            data=CustomTaskNotification(
+                skill_title=skill_title,
+                contributor_name=contributor_name,
+                day=day,
+                task_title=task_title
+            ),
             actor_id=contributor_id
         )
 
     @staticmethod
+    @_dispatched_in_background
     def notify_task_voted(task_id: str, task_author_id: str, voter_id: str,
-                        vote_type: str, skill_title: str, task_title: str) -> Optional[Dict]:
+                        vote_type: str, skill_title: str, task_title: str,
+                        batch_context: Optional[List[Dict]] = None) -> None:
         """Notify task author about vote on their custom task"""
         
         if task_author_id == voter_id:  # Don't notify self-votes
@@ -229,78 +426,101 @@ class NotificationService:
             return None
         
         # Get voter info
-        from backend.auth.models import User
         voter = User.find_by_id(voter_id)
         voter_name = voter.get("username", "Someone") if voter else "Someone"
         
-        return NotificationService.create_notification(
+        return NotificationService._create_or_batch(
+            batch_context,
             user_id=task_author_id,
             notification_type=NotificationService.TASK_VOTED,
             reference_type="task",
             reference_id=task_id,
-            data={
-                "skill_title": skill_title,
-                "task_title": task_title,
-                "voter_name": voter_name,
-                "vote_type": vote_type,
-                "message": f"{voter_name} upvoted your custom task \"{task_title}\""
-            },
+            data=TaskVoteNotification(
+                skill_title=skill_title,
+                task_title=task_title,
+                voter_name=voter_name,
+                vote_type=vote_type
+            ),
             actor_id=voter_id
         )
 
     @staticmethod
+    @_dispatched_in_background
     def notify_skill_rated(skill_id: str, skill_owner_id: str, rater_id: str,
-                         skill_title: str, rating: int, review: str = None) -> Optional[Dict]:
+                         skill_title: str, rating: int, review: str = None,
+                         batch_context: Optional[List[Dict]] = None) -> None:
         """Notify skill owner about rating received"""
         
         if skill_owner_id == rater_id:  # Don't notify self-ratings
             return None
         
         # Get rater info
-        from backend.auth.models import User
         rater = User.find_by_id(rater_id)
         rater_name = rater.get("username", "Someone") if rater else "Someone"
         
         # Format rating message
         stars = "⭐" * rating
-        review_text = f": \"{review[:50]}...\"" if review and len(review) > 3 else ""
         
-        return NotificationService.create_notification(
+        return NotificationService._create_or_batch(
+            batch_context,
             user_id=skill_owner_id,
             notification_type=NotificationService.SKILL_RATED,
             reference_type="skill",
             reference_id=skill_id,
-            data={
-                "skill_title": skill_title,
-                "rater_name": rater_name,
-                "rating": rating,
-                "stars": stars,
-                "review_preview": review[:100] if review else "",
-                "message": f"{rater_name} rated your skill \"{skill_title}\" {stars}{review_text}"
-            },
+            data=RatingNotification(
+                skill_title=skill_title,
+                rater_name=rater_name,
+                rating=rating,
+                stars=stars,
+                review_preview=review[:100] if review else ""
+            ),
             actor_id=rater_id
         )
 
     @staticmethod
-    def get_user_notifications(user_id: str, limit: int = 50, unread_only: bool = False) -> Dict:
-        """Get notifications for a user"""
+    def get_user_notifications(user_id: str, limit: int = 50, unread_only: bool = False,
+                               cursor: Optional[str] = None) -> Dict:
+        """Get a page of notifications for a user
+
+        Pages are keyed on _id: pass the returned next_cursor to get the
+        following (older) page.
+        """
         
-        notification_repo = NotificationRepository(g.db.notifications)
+        notification_repo = _notification_repo()
+        before_id = parse_object_id(cursor, "cursor") if cursor else None
         
-        notifications = notification_repo.find_by_user(user_id, limit, unread_only)
-        unread_count = notification_repo.find_unread_count(user_id)
+        # Fetch one extra document to learn whether another page exists; actors are joined in
+        notifications = notification_repo.find_by_user_with_actors(
+            user_id, limit + 1, unread_only, before_id, NotificationService._LIST_PROJECTION
+        )
+        has_more = len(notifications) > limit
+        notifications = notifications[:limit]
+        next_cursor = str(notifications[-1]["_id"]) if has_more else None
+        
+        # A complete unread-only listing already is the unread count
+        if unread_only and not before_id and not has_more:
+            unread_count = len(notifications)
+        else:
+            unread_count = notification_repo.find_unread_count(user_id)
+        
+        users_cache = {n["actor"]["_id"]: n.pop("actor") for n in notifications if n.get("actor")}
         
         # Enrich notifications with user info
+        now = datetime.utcnow()
         enriched_notifications = []
         for notification in notifications:
             # Add actor info if available
             if notification.get("actor_id"):
-                actor_info = NotificationService._get_user_info(str(notification["actor_id"]))
+                actor_info = NotificationService._get_user_info(notification["actor_id"], users_cache)
                 notification["actor_info"] = actor_info
             
+            notification["message"] = NotificationService._format_notification_message(
+                notification["notification_type"], notification.get("data", {})
+            )
+            
             # Format timestamps
             notification["created_at_formatted"] = NotificationService._format_timestamp(
-                notification["created_at"]
+                notification["created_at"], now
             )
             
             enriched_notifications.append(notification)
@@ -308,14 +528,15 @@ class NotificationService:
         return {
             "notifications": enriched_notifications,
             "unread_count": unread_count,
-            "total_count": len(notifications)
+            "total_count": len(notifications),
+            "next_cursor": next_cursor
         }
 
     @staticmethod
     def mark_notification_read(notification_id: str, user_id: str) -> bool:
         """Mark a notification as read"""
         
-        notification_repo = NotificationRepository(g.db.notifications)
+        notification_repo = _notification_repo()
         result = notification_repo.mark_as_read(notification_id, user_id)
         
         return result.modified_count > 0
@@ -324,7 +545,7 @@ class NotificationService:
     def mark_all_notifications_read(user_id: str) -> int:
         """Mark all notifications as read for a user"""
         
-        notification_repo = NotificationRepository(g.db.notifications)
+        notification_repo = _notification_repo()
         result = notification_repo.mark_all_as_read(user_id)
         
         return result.modified_count
@@ -333,7 +554,7 @@ class NotificationService:
     def delete_notification(notification_id: str, user_id: str) -> bool:
         """Delete a notification"""
         
-        notification_repo = NotificationRepository(g.db.notifications)
+        notification_repo = _notification_repo()
         result = notification_repo.delete_notification(notification_id, user_id)
         
         return result.deleted_count > 0
@@ -342,88 +563,76 @@ class NotificationService:
     def get_notification_stats(user_id: str) -> Dict:
         """Get notification statistics for a user"""
         
-        notification_repo = NotificationRepository(g.db.notifications)
+        notification_repo = _notification_repo()
         return notification_repo.get_notification_stats(user_id)
 
     @staticmethod
     def cleanup_old_notifications(days_old: int = 30) -> int:
-        """Clean up old notifications (background task)"""
+        """Clean up old notifications
+
+        Notifications past 30 days are already expired by the TTL index on
+        created_at; this remains for purging with a shorter retention.
+        """
         
-        notification_repo = NotificationRepository(g.db.notifications)
+        notification_repo = _notification_repo()
         result = notification_repo.delete_old_notifications(days_old)
         
         logging.info(f"Cleaned up {result.deleted_count} old notifications")
         return result.deleted_count
 
     @staticmethod
-    def _update_aggregated_notification(existing: Dict, new_data: Dict, actor_id: str = None) -> Dict:
+    def _update_aggregated_notification(notification_id: ObjectId, notification_type: str,
+                                         actor_id: str = None) -> Optional[Dict]:
         """Update an existing notification with aggregated data"""
         
-        notification_repo = NotificationRepository(g.db.notifications)
-        
-        # Aggregate the data (e.g., multiple likes)
-        aggregated_data = existing["data"].copy()
-        
-        if "count" not in aggregated_data:
-            aggregated_data["count"] = 1
-        
-        aggregated_data["count"] += 1
+        notification_repo = _notification_repo()
         
         # Update latest actor info
-        if actor_id:
-            actor_info = NotificationService._get_user_info(actor_id)
-            aggregated_data["latest_actor"] = actor_info
-        
-        # Update message for aggregated notifications
-        if aggregated_data["count"] > 1:
-            base_message = new_data.get("message", "")
-            if "liked your skill" in base_message:
-                skill_title = aggregated_data.get("skill_title", "your skill")
-                aggregated_data["message"] = f"{aggregated_data['count']} people liked \"{skill_title}\""
+        latest_actor = NotificationService._get_user_info(actor_id) if actor_id else None
         
-        # Update the notification
-        notification_repo.update_notification_data(str(existing["_id"]), aggregated_data)
-        
-        # Get updated notification
-        return notification_repo.find_by_id(str(existing["_id"]))
+        return notification_repo.increment_count_and_set_actor(notification_id, latest_actor)
 
     @staticmethod
     def _format_notification_message(notification_type: str, data: Dict) -> str:
-        """Format notification message based on type"""
+        """Format notification message based on type
+
+        Messages for the notify_* types are rendered from the stored fields;
+        other notifications (and ones stored before templating) carry their
+        own message in data.
+        """
+        if data.get("count", 1) > 1 and notification_type in _AGGREGATED_MESSAGE_TEMPLATES:
+            template = _AGGREGATED_MESSAGE_TEMPLATES[notification_type]
+        else:
+            template = _MESSAGE_TEMPLATES.get(notification_type)
+        
+        if template is not None:
+            try:
+                return template(data) if callable(template) else template.format_map(data)
+            except (KeyError, TypeError, ValueError):
+                pass
+        
         return data.get("message", f"New {notification_type.replace('_', ' ')}")
 
     @staticmethod
-    def _format_timestamp(timestamp: datetime) -> str:
+    def _format_timestamp(timestamp: datetime, now: Optional[datetime] = None) -> str:
         """Format timestamp for display"""
-        now = datetime.utcnow()
-        diff = now - timestamp
-        
-        if diff.days > 0:
-            return f"{diff.days} day{'s' if diff.days > 1 else ''} ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hour{'s' if hours > 1 else ''} ago"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
-        else:
-            return "Just now"
+        now = now or datetime.utcnow()
+        total_seconds = int((now - timestamp).total_seconds())
+        
+        for unit_seconds, unit in _TIMESTAMP_UNITS:
+            if total_seconds >= unit_seconds:
+                count = total_seconds // unit_seconds
+                return f"{count} {unit}{'s' if count > 1 else ''} ago"
+        
+        return "Just now"
 
     @staticmethod
-    def _get_user_info(user_id: str) -> Dict:
-        """Get basic user information"""
-        from backend.auth.models import User
-        
-        user = User.find_by_id(user_id)
-        if user:
-            return {
-                "user_id": user_id,
-                "username": user.get("username", "Unknown"),
-                "avatar_url": f"https://ui-avatars.com/api/?name={user.get('username', 'U')}&background=8B5CF6&color=fff&size=40"
-            }
-        else:
-            return {
-                "user_id": user_id,
-                "username": "Unknown User",
-                "avatar_url": "https://ui-avatars.com/api/?name=U&background=8B5CF6&color=fff&size=40"
-            }
\ No newline at end of file
+    def _get_user_info(user_id, users_cache: Optional[Dict] = None) -> Dict:
+        """Get basic user information, from users_cache (keyed by ObjectId) when given
+
+        Results are memoized for the rest of the request, so an actor that
+        appears on many notifications is only formatted (or fetched) once.
+        """
+        if users_cache is not None:
+            return remember_user_info(user_id, users_cache.get(to_object_id(user_id)))
+        return get_user_info(user_id)
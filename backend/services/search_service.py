@@ -6,10 +6,21 @@ import logging
 import re
 from backend.repositories.shared_skill_repository import SharedSkillRepository
 from backend.repositories.custom_task_repository import CustomTaskRepository
+from backend.services.cache_service import CacheService
+from backend.services.user_info import get_user_info, prefetch_users
 
 class SearchService:
     """Service for searching and discovering shared skills"""
 
+    # Equality fields leading adv_search_sort_idx
+    _ADVANCED_SORT_PREFIX = frozenset({"visibility", "category", "difficulty", "has_custom_tasks"})
+
+    # Custom task search results skip the long instructions and resource lists
+    _TASK_RESULT_PROJECTION = {
+        "skill_id": 1, "day": 1, "user_id": 1, "task.title": 1, "task.description": 1,
+        "task.task_type": 1, "task.estimated_time": 1, "votes": 1, "likes_count": 1, "created_at": 1
+    }
+
     @staticmethod
     def search_skills(query: str, filters: Dict = None, page: int = 1, limit: int = 10) -> Dict[str, Any]:
         """Search skills using text search with filters and pagination"""
@@ -28,28 +39,48 @@ class SearchService:
         # Calculate skip for pagination
         skip = (page - 1) * limit
         
+        # Only the first page pays for an exact count; deeper pages probe one
+        # extra row to learn whether another page exists
+        with_total = page == 1
+        fetch_limit = limit if with_total else limit + 1
+        
         # Perform search
         if len(query) < 2:
             # For very short queries, use basic filtering
-            skills = shared_skill_repo.find_public_skills(skip=skip, limit=limit, filters=filters)
+            if with_total:
+                skills, total_count = shared_skill_repo.find_public_skills_page(
+                    skip=skip, limit=fetch_limit, filters=filters, projection=SharedSkillRepository.LIST_PROJECTION
+                )
+            else:
+                skills = shared_skill_repo.find_public_skills(
+                    skip=skip, limit=fetch_limit, filters=filters, projection=SharedSkillRepository.LIST_PROJECTION
+                )
+                total_count = None
         else:
-            # Use text search
-            skills = shared_skill_repo.search_skills(query, skip=skip, limit=limit, filters=filters)
+            # Use text search; on the first page the total comes back from the same aggregation
+            skills, total_count = shared_skill_repo.search_skills(
+                query, skip=skip, limit=fetch_limit, filters=filters, with_total=with_total
+            )
         
-        # Count total results for pagination
-        total_count = SearchService._count_search_results(query, filters)
+        if with_total:
+            has_next = (skip + limit) < total_count
+            total_pages = (total_count + limit - 1) // limit
+        else:
+            has_next = len(skills) > limit
+            skills = skills[:limit]
+            total_pages = None
         
         # Enrich skills with additional data
-        enriched_skills = SearchService._enrich_search_results(skills, query)
+        enriched_skills = SearchService._enrich_search_results(skills)
         
         return {
             "query": query,
             "skills": enriched_skills,
             "pagination": {
                 "current_page": page,
-                "total_pages": (total_count + limit - 1) // limit,
+                "total_pages": total_pages,
                 "total_count": total_count,
-                "has_next": (skip + limit) < total_count,
+                "has_next": has_next,
                 "has_previous": page > 1
             },
             "filters_applied": filters or {}
@@ -57,48 +88,64 @@ class SearchService:
 
     @staticmethod
     def get_search_suggestions(query: str, limit: int = 5) -> List[str]:
-        """Get search suggestions based on partial query"""
+        """Get search suggestions based on partial query
+
+        Prefix matches on the lowercased title/tags fields are served from an
+        index range; the unanchored scan only runs when they come up short.
+        """
         
         if not query or len(query) < 2:
             return []
         
         query_regex = re.escape(query.lower())
         
-        # Search in titles and tags
-        shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
+        suggestions = SearchService._collect_suggestions("^" + query_regex, limit, [])
+        if len(suggestions) < limit:
+            suggestions = SearchService._collect_suggestions(query_regex, limit, suggestions)
         
-        # Aggregate suggestions from titles
-        title_pipeline = [
-            {"$match": {
-                "visibility": "public",
-                "title": {"$regex": query_regex, "$options": "i"}
-            }},
-            {"$project": {"title": 1}},
-            {"$limit": limit}
-        ]
+        return suggestions[:limit]
+
+    @staticmethod
+    def _collect_suggestions(pattern: str, limit: int, suggestions: List[str]) -> List[str]:
+        """Append title then tag suggestions matching pattern until limit is reached"""
+        
+        # Suggestions from titles; a plain find walks the title_lower index
+        title_query = {
+            "visibility": "public",
+            "title_lower": {"$regex": pattern}
+        }
         
-        title_results = list(g.db.shared_skills.aggregate(title_pipeline))
-        suggestions = [result["title"] for result in title_results]
+        with g.db.shared_skills.find(title_query, {"title": 1}).limit(limit).batch_size(limit) as cursor:
+            for result in cursor:
+                if len(suggestions) >= limit:
+                    break
+                if result["title"] not in suggestions:
+                    suggestions.append(result["title"])
         
         # Add tag suggestions if we need more
         if len(suggestions) < limit:
             tag_pipeline = [
                 {"$match": {
                     "visibility": "public",
-                    "tags": {"$regex": query_regex, "$options": "i"}
+                    "tags_lower": {"$regex": pattern}
                 }},
-                {"$unwind": "$tags"},
+                {"$project": {"tags_lower": 1}},
+                {"$unwind": "$tags_lower"},
                 {"$match": {
-                    "tags": {"$regex": query_regex, "$options": "i"}
+                    "tags_lower": {"$regex": pattern}
                 }},
-                {"$group": {"_id": "$tags"}},
-                {"$limit": limit - len(suggestions)}
+                {"$group": {"_id": "$tags_lower"}},
+                {"$limit": limit}
             ]
             
-            tag_results = list(g.db.shared_skills.aggregate(tag_pipeline))
-            suggestions.extend([result["_id"] for result in tag_results])
-        
-        return suggestions[:limit]
+            with g.db.shared_skills.aggregate(tag_pipeline, batchSize=limit) as cursor:
+                for result in cursor:
+                    if len(suggestions) >= limit:
+                        break
+                    if result["_id"] not in suggestions:
+                        suggestions.append(result["_id"])
+        
+        return suggestions
 
     @staticmethod
     def get_trending_searches(days: int = 7, limit: int = 10) -> List[Dict]:
@@ -106,8 +153,7 @@ class SearchService:
         
         # This would require implementing search analytics
         # For now, return popular categories as trending terms
-        shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
-        categories = shared_skill_repo.get_categories_with_counts()
+        categories = SearchService._get_category_counts()
         
         return [
             {
@@ -126,12 +172,12 @@ class SearchService:
         query = {}
         filters = {}
         
-        # Text search
-        if criteria.get("title"):
-            query["title"] = {"$regex": criteria["title"], "$options": "i"}
-        
-        if criteria.get("description"):
-            query["description"] = {"$regex": criteria["description"], "$options": "i"}
+        # Text search over the weighted title/tags/description index
+        search_terms = " ".join(
+            criteria[field].strip() for field in ("title", "description") if criteria.get(field)
+        )
+        if search_terms:
+            query["$text"] = {"$search": search_terms}
         
         # Category filter
         if criteria.get("category"):
@@ -152,39 +198,53 @@ class SearchService:
         if criteria.get("has_custom_tasks") is not None:
             filters["has_custom_tasks"] = criteria["has_custom_tasks"]
         
-        # Tags filter
+        # Tags filter, matched against the lowercased tags stored at share time
         if criteria.get("tags"):
-            if isinstance(criteria["tags"], list):
-                query["tags"] = {"$in": criteria["tags"]}
-            else:
-                query["tags"] = criteria["tags"]
+            tags = criteria["tags"] if isinstance(criteria["tags"], list) else [criteria["tags"]]
+            tags_lower = sorted({tag.strip().lower() for tag in tags if tag.strip()})
+            if tags_lower:
+                query["tags_lower"] = {"$in": tags_lower}
         
         # Date range filter
+        created_after = None
         if criteria.get("created_after"):
             try:
-                date = datetime.fromisoformat(criteria["created_after"])
-                query["created_at"] = {"$gte": date}
+                created_after = datetime.fromisoformat(criteria["created_after"])
             except (ValueError, TypeError):
-                pass
+                raise ValueError("Invalid created_after date. Use ISO format (YYYY-MM-DD).")
         
         # Apply search
         shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
         
-        # Combine query and filters
-        final_query = {**query, "visibility": "public"}
+        # Combine query and filters, equality fields first in adv_search_sort_idx order
+        final_query = {"visibility": "public"}
+        if created_after:
+            final_query["created_at"] = {"$gte": created_after}
         if filters.get("category"):
             final_query["category"] = filters["category"]
         if filters.get("difficulty"):
             final_query["difficulty"] = filters["difficulty"]
-        if filters.get("min_rating"):
-            final_query["rating.average"] = {"$gte": filters["min_rating"]}
         if filters.get("has_custom_tasks") is not None:
             final_query["has_custom_tasks"] = filters["has_custom_tasks"]
+        if filters.get("min_rating"):
+            final_query["rating.average"] = {"$gte": filters["min_rating"]}
+        final_query.update(query)
         
-        # Execute search
-        skills = list(g.db.shared_skills.find(final_query)
-                     .sort([("rating.average", -1), ("likes_count", -1)])
-                     .limit(50))
+        # Execute search, ranking text matches by relevance
+        projection = SharedSkillRepository.LIST_PROJECTION
+        if search_terms:
+            cursor = (g.db.shared_skills.find(final_query, {**projection, "score": {"$meta": "textScore"}})
+                      .sort([("score", {"$meta": "textScore"})]))
+        else:
+            cursor = (g.db.shared_skills.find(final_query, projection)
+                      .sort([("rating.average", -1), ("likes_count", -1)]))
+            if SearchService._ADVANCED_SORT_PREFIX.issubset(final_query):
+                # Every equality field is pinned, so the index walks straight into sort order
+                cursor = cursor.hint("adv_search_sort_idx")
+            elif created_after and "category" not in final_query:
+                # Without a category the date range is the most selective prefix
+                cursor = cursor.hint("recent_rating_idx")
+        skills = list(cursor.limit(50))
         
         # Enrich results
         enriched_skills = SearchService._enrich_search_results(skills)
@@ -201,32 +261,33 @@ class SearchService:
         
         custom_task_repo = CustomTaskRepository(g.db.custom_tasks)
         
-        # Build search query
-        search_query = {
-            "$or": [
-                {"task.title": {"$regex": query, "$options": "i"}},
-                {"task.description": {"$regex": query, "$options": "i"}},
-                {"task.instructions": {"$regex": query, "$options": "i"}}
-            ]
-        }
+        # Build search query against the task text index
+        search_query = {"$text": {"$search": query}}
         
         if skill_id:
             search_query["skill_id"] = ObjectId(skill_id)
         
-        # Search tasks
-        tasks = list(g.db.custom_tasks.find(search_query)
-                    .sort([("votes.up", -1), ("created_at", -1)])
+        # Search tasks, most relevant first with votes as the tiebreak
+        projection = {**SearchService._TASK_RESULT_PROJECTION, "score": {"$meta": "textScore"}}
+        tasks = list(g.db.custom_tasks.find(search_query, projection)
+                    .sort([("score", {"$meta": "textScore"}), ("votes.up", -1), ("created_at", -1)])
                     .limit(limit))
         
-        # Enrich with user and skill info
+        # Enrich with user and skill info, fetched once for the whole result set
+        prefetch_users([task["user_id"] for task in tasks])
+        skills_by_id = {
+            skill["_id"]: skill
+            for skill in g.db.shared_skills.find(
+                {"_id": {"$in": list({task["skill_id"] for task in tasks})}},
+                {"title": 1, "category": 1}
+            )
+        } if tasks else {}
+        
         for task in tasks:
-            task["user_info"] = SearchService._get_user_info(str(task["user_id"]))
+            task["user_info"] = get_user_info(str(task["user_id"]))
             
             # Get skill info
-            skill_info = g.db.shared_skills.find_one(
-                {"_id": task["skill_id"]},
-                {"title": 1, "category": 1}
-            )
+            skill_info = skills_by_id.get(task["skill_id"])
             if skill_info:
                 task["skill_info"] = {
                     "title": skill_info["title"],
@@ -239,10 +300,12 @@ class SearchService:
     def get_filter_options() -> Dict[str, List]:
         """Get available filter options for search"""
         
-        shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
+        cached_options = CacheService.get_filter_options()
+        if cached_options is not None:
+            return cached_options
         
         # Get categories
-        categories = shared_skill_repo.get_categories_with_counts()
+        categories = SearchService._get_category_counts()
         
         # Get difficulty levels with counts
         difficulty_pipeline = [
@@ -254,13 +317,12 @@ class SearchService:
             {"$sort": {"count": -1}}
         ]
         
-        difficulty_results = list(g.db.shared_skills.aggregate(difficulty_pipeline))
         difficulties = [
             {
                 "difficulty": result["_id"],
                 "count": result["count"]
             }
-            for result in difficulty_results
+            for result in g.db.shared_skills.aggregate(difficulty_pipeline)
         ]
         
         # Get popular tags
@@ -275,16 +337,15 @@ class SearchService:
             {"$limit": 20}
         ]
         
-        tag_results = list(g.db.shared_skills.aggregate(tag_pipeline))
         tags = [
             {
                 "tag": result["_id"],
                 "count": result["count"]
             }
-            for result in tag_results
+            for result in g.db.shared_skills.aggregate(tag_pipeline, batchSize=20)
         ]
         
-        return {
+        options = {
             "categories": categories,
             "difficulties": difficulties,
             "popular_tags": tags,
@@ -295,77 +356,36 @@ class SearchService:
                 {"label": "3.0+ stars", "value": 3.0}
             ]
         }
+        
+        CacheService.cache_filter_options(options)
+        return options
 
     @staticmethod
-    def _count_search_results(query: str, filters: Dict = None) -> int:
-        """Count search results for pagination"""
-        
-        if len(query) < 2:
-            # For short queries, count with filters
-            search_query = {"visibility": "public"}
-        else:
-            # Text search count
-            search_query = {
-                "$text": {"$search": query},
-                "visibility": "public"
-            }
-        
-        # Apply filters
-        if filters:
-            if filters.get("category"):
-                search_query["category"] = filters["category"]
-            if filters.get("difficulty"):
-                search_query["difficulty"] = filters["difficulty"]
-            if filters.get("has_custom_tasks") is not None:
-                search_query["has_custom_tasks"] = filters["has_custom_tasks"]
-            if filters.get("min_rating"):
-                search_query["rating.average"] = {"$gte": float(filters["min_rating"])}
-        
-        return g.db.shared_skills.count_documents(search_query)
+    def _get_category_counts() -> List[Dict]:
+        """Public skill category counts, cached for a few minutes"""
+        categories = CacheService.get_category_counts()
+        if categories is None:
+            shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
+            categories = shared_skill_repo.get_categories_with_counts()
+            CacheService.cache_category_counts(categories)
+        return categories
 
     @staticmethod
-    def _enrich_search_results(skills: List[Dict], query: str = None) -> List[Dict]:
+    def _enrich_search_results(skills: List[Dict]) -> List[Dict]:
         """Enrich search results with additional information"""
         
+        # Fetch owners and custom task counts for the whole page up front
+        prefetch_users([skill["shared_by"] for skill in skills])
+        custom_task_repo = CustomTaskRepository(g.db.custom_tasks)
+        task_counts = custom_task_repo.count_tasks_for_skills(
+            [skill["_id"] for skill in skills if skill.get("has_custom_tasks")]
+        )
+        
         for skill in skills:
             # Add user info
-            skill["user_info"] = SearchService._get_user_info(str(skill["shared_by"]))
+            skill["user_info"] = get_user_info(str(skill["shared_by"]))
             
             # Add custom task count if applicable
-            if skill.get("has_custom_tasks"):
-                custom_task_repo = CustomTaskRepository(g.db.custom_tasks)
-                task_count = custom_task_repo.count_tasks_for_skill(str(skill["_id"]))
-                skill["custom_task_count"] = task_count
-            else:
-                skill["custom_task_count"] = 0
-            
-            # Add relevance score for text searches
-            if query and "score" in skill:
-                # Boost score for exact title matches
-                if query.lower() in skill["title"].lower():
-                    skill["relevance"] = "high"
-                elif any(tag for tag in skill.get("tags", []) if query.lower() in tag.lower()):
-                    skill["relevance"] = "medium"
-                else:
-                    skill["relevance"] = "low"
+            skill["custom_task_count"] = task_counts.get(skill["_id"], 0)
         
         return skills
-
-    @staticmethod
-    def _get_user_info(user_id: str) -> Dict:
-        """Get basic user information"""
-        from backend.auth.models import User
-        
-        user = User.find_by_id(user_id)
-        if user:
-            return {
-                "user_id": user_id,
-                "username": user.get("username", "Unknown"),
-                "avatar_url": f"https://ui-avatars.com/api/?name={user.get('username', 'U')}&background=8B5CF6&color=fff&size=40"
-            }
-        else:
-            return {
-                "user_id": user_id,
-                "username": "Unknown User",
-                "avatar_url": "https://ui-avatars.com/api/?name=U&background=8B5CF6&color=fff&size=40"
-            }
\ No newline at end of file
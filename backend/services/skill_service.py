@@ -1,4 +1,5 @@
 from typing import List, Optional, Dict, Any, cast
+import asyncio
 from datetime import datetime, timedelta
 from backend.models.base import SkillPlan
 from backend.repositories.skill_repository import SkillRepository
@@ -15,13 +16,6 @@ class SkillService:
      
         skill_repo = SkillRepository(g.db.skills)
 
-        try:
-            import asyncio
-            daily_tasks_list = asyncio.run(AIService.generate_structured_plan(topic=title, plan_type="skill"))
-        except (ValueError, ConnectionError) as e:
-            logging.error(f"AI Service failed to generate plan for skill '{title}': {e}")
-            raise
-
         now = datetime.utcnow()
         start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
         if start_date_str:
@@ -30,15 +24,26 @@ class SkillService:
             except ValueError:
                 raise ValueError("Invalid date format. Use YYYY-MM-DD.")
 
+        # The plan and the image are independent, so fetch them concurrently on one loop
+        async def _generate_plan_and_image():
+            return await asyncio.gather(
+                AIService.generate_structured_plan(topic=title, plan_type="skill"),
+                UnsplashService.fetch_image(title, use_specific_query=True),
+                return_exceptions=True
+            )
 
-        image_url = None
-        try:
-            logging.info(f"Fetching skill-specific image for: {title}")
-            image_url = asyncio.run(UnsplashService.fetch_image(title, use_specific_query=True))
-            logging.info(f"Successfully fetched image: {image_url}")
-        except Exception as e:
-            logging.error(f"Unsplash fetch failed for skill '{title}': {e}")
+        logging.info(f"Generating plan and fetching skill-specific image for: {title}")
+        daily_tasks_list, image_url = asyncio.run(UnsplashService.closing(_generate_plan_and_image()))
+
+        if isinstance(daily_tasks_list, Exception):
+            logging.error(f"AI Service failed to generate plan for skill '{title}': {daily_tasks_list}")
+            raise daily_tasks_list
+
+        if isinstance(image_url, Exception):
+            logging.error(f"Unsplash fetch failed for skill '{title}': {image_url}")
             image_url = UnsplashService._get_fallback_image(title)
+        else:
+            logging.info(f"Successfully fetched image: {image_url}")
 
         skill_plan_data = {
             "user_id": user_id,
@@ -95,54 +100,53 @@ class SkillService:
     def complete_skill_day(skill_id: str, user_id: str, day_number: int) -> dict:
         repository = SkillRepository(g.db.skills)
         completion_repo = SkillCompletionRepository(g.db.skill_completions)
-        skill = repository.find_by_id(skill_id, user_id)
         
-        if not skill:
-            raise ValueError("Skill not found or access denied")
         if not (1 <= day_number <= 30):
             raise ValueError("Day number must be between 1 and 30")
 
-        daily_tasks = skill.get('curriculum', {}).get('daily_tasks', [])
-        if not (0 <= day_number - 1 < len(daily_tasks)):
-            raise ValueError("Invalid day number for the curriculum")
-
-        if daily_tasks[day_number - 1].get('completed', False):
-            raise ValueError("Day is already completed")
-        
-        repository.update_day_completion(skill_id, user_id, day_number)
+        skill = repository.update_day_completion(skill_id, user_id, day_number)
+        if not skill:
+            SkillService._raise_day_update_error(repository, skill_id, user_id, day_number, "Day is already completed")
         
+        day_task = skill['curriculum']['daily_tasks'][0]
         completion_data = {
             "skill_title": skill.get('title', skill.get('skill_name', 'Unknown')),
-            "day_title": daily_tasks[day_number - 1].get('title', f'Day {day_number}'),
-            "day_description": daily_tasks[day_number - 1].get('description', ''),
+            "day_title": day_task.get('title', f'Day {day_number}'),
+            "day_description": day_task.get('description', ''),
         }
         completion_repo.create_completion(skill_id, user_id, day_number, completion_data)
         
-        return SkillService._recalculate_progress(skill_id, user_id, repository)
+        return skill['progress']
 
     @staticmethod
     def undo_skill_day(skill_id: str, user_id: str, day_number: int) -> dict:
         repository = SkillRepository(g.db.skills)
         completion_repo = SkillCompletionRepository(g.db.skill_completions)
-        skill = repository.find_by_id(skill_id, user_id)
         
-        if not skill:
-            raise ValueError("Skill not found or access denied")
         if not (1 <= day_number <= 30):
             raise ValueError("Day number must be between 1 and 30")
 
+        skill = repository.update_day_completion_undo(skill_id, user_id, day_number)
+        if not skill:
+            SkillService._raise_day_update_error(repository, skill_id, user_id, day_number, "Day is not completed")
+        
+        completion_repo.delete_completion(skill_id, user_id, day_number)
+        
+        return skill['progress']
+
+    @staticmethod
+    def _raise_day_update_error(repository: SkillRepository, skill_id: str, user_id: str,
+                                day_number: int, state_error: str) -> None:
+        # Only reached when the conditional update matched nothing; work out why
+        skill = repository.find_by_id(skill_id, user_id)
+        if not skill:
+            raise ValueError("Skill not found or access denied")
+
         daily_tasks = skill.get('curriculum', {}).get('daily_tasks', [])
         if not (0 <= day_number - 1 < len(daily_tasks)):
             raise ValueError("Invalid day number for the curriculum")
 
-        if not daily_tasks[day_number - 1].get('completed', False):
-            raise ValueError("Day is not completed")
-        
-        repository.update_day_completion_undo(skill_id, user_id, day_number)
-        
-        completion_repo.delete_completion(skill_id, user_id, day_number)
-        
-        return SkillService._recalculate_progress(skill_id, user_id, repository)
+        raise ValueError(state_error)
 
     @staticmethod
     def update_skill(skill_id: str, user_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -157,61 +161,19 @@ class SkillService:
         
         return updated_skill
 
-    @staticmethod
-    def _recalculate_progress(skill_id: str, user_id: str, repository: SkillRepository) -> dict:
-        skill = repository.find_by_id(skill_id, user_id)
-        if not skill:
-            raise ValueError("Skill not found or access denied")
-        
-        daily_tasks = skill.get('curriculum', {}).get('daily_tasks', [])
-        total_days = len(daily_tasks)
-        
-        actual_completed = sum(1 for task in daily_tasks if task.get('completed', False))
-        
-        current_day = 1
-        for i, task in enumerate(daily_tasks):
-            if not task.get('completed', False):
-                current_day = i + 1
-                break
-        else:
-            current_day = total_days
-        
-        completion_percentage = round((actual_completed / total_days) * 100, 2) if total_days > 0 else 0
-        
-        progress_data = {
-            "completed_days": actual_completed,
-            "completion_percentage": completion_percentage,
-            "current_day": current_day,
-            "last_activity": datetime.utcnow(),
-            "projected_completion": skill.get('progress', {}).get('started_at', datetime.utcnow()) + timedelta(days=total_days)
-        }
-        
-        repository.update_progress_stats(skill_id, user_id, progress_data)
-        return progress_data
-
     @staticmethod
     def validate_and_fix_progress(skill_id: str, user_id: str) -> dict:
         repository = SkillRepository(g.db.skills)
-        skill = repository.find_by_id(skill_id, user_id)
+        skill = repository.normalize_and_recalculate(skill_id, user_id)
         
         if not skill:
             raise ValueError("Skill not found or access denied")
         
-        progress_data = SkillService._recalculate_progress(skill_id, user_id, repository)
-        
-        daily_tasks = skill.get('curriculum', {}).get('daily_tasks', [])
-        total_days = len(daily_tasks)
-        
-        for i, task in enumerate(daily_tasks):
-            if 'completed' in task and not isinstance(task['completed'], bool):
-                repository.update_day_completion_undo(skill_id, user_id, i + 1)
-                logging.warning(f"Fixed invalid completion state for skill {skill_id}, day {i + 1}")
-        
-        final_progress = SkillService._recalculate_progress(skill_id, user_id, repository)
+        total_days = len(skill.get('curriculum', {}).get('daily_tasks', []))
         
         return {
             "skill_id": skill_id,
-            "progress": final_progress,
+            "progress": skill["progress"],
             "total_days": total_days,
             "validation_complete": True
         }
@@ -228,9 +190,6 @@ class SkillService:
         logging.info(f"Refreshing image for skill '{skill_name}' (ID: {skill_id})")
         
         try:
-            import asyncio
-            from backend.services.unsplash_service import UnsplashService
-            
             strategies = [
                 (True, "specific query"),    
                 (False, "category query"),  
@@ -239,22 +198,24 @@ class SkillService:
             new_image_url = None
             current_image = skill.get('image_url', '')
             
-            for use_specific, strategy_name in strategies:
-                try:
-                    logging.info(f"Trying {strategy_name} for skill '{skill_name}'")
-                    candidate_url = asyncio.run(UnsplashService.fetch_image(skill_name, use_specific))
-                    
-                    if candidate_url and candidate_url != current_image:
-                        new_image_url = candidate_url
-                        logging.info(f"Successfully got new image with {strategy_name}: {new_image_url}")
-                        break
-                    else:
-                        logging.info(f"{strategy_name} returned same image or failed, trying next strategy")
-                        continue
-                        
-                except Exception as e:
-                    logging.warning(f"{strategy_name} failed: {e}")
-                    continue
+            # Run every strategy at once, then take the first (in preference order) that gives a new image
+            async def _fetch_candidates():
+                return await asyncio.gather(
+                    *(UnsplashService.fetch_image(skill_name, use_specific, use_cache=False) for use_specific, _ in strategies),
+                    return_exceptions=True
+                )
+            
+            candidates = asyncio.run(UnsplashService.closing(_fetch_candidates()))
+            
+            for (use_specific, strategy_name), candidate_url in zip(strategies, candidates):
+                if isinstance(candidate_url, Exception):
+                    logging.warning(f"{strategy_name} failed: {candidate_url}")
+                elif candidate_url and candidate_url != current_image:
+                    new_image_url = candidate_url
+                    logging.info(f"Successfully got new image with {strategy_name}: {new_image_url}")
+                    break
+                else:
+                    logging.info(f"{strategy_name} returned same image or failed, trying next strategy")
             
             if not new_image_url:
                 logging.info("All strategies failed, forcing fallback image")
@@ -267,10 +228,9 @@ class SkillService:
                 'updated_at': datetime.utcnow()
             }
             
-            repository.update_skill(skill_id, user_id, update_data)
+            updated_skill = repository.update_skill(skill_id, user_id, update_data)
             logging.info(f"Updated skill {skill_id} with new image")
             
-            updated_skill = repository.find_by_id(skill_id, user_id)
             updated_skill['_id'] = str(updated_skill['_id'])
             logging.info(f"Returning updated skill: {updated_skill.get('title')} with image: {updated_skill.get('image_url')}")
             return updated_skill
@@ -1,13 +1,77 @@
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from functools import lru_cache
 from flask import g
-from bson import ObjectId
 import logging
+import re
 from backend.repositories.shared_skill_repository import SharedSkillRepository
 from backend.repositories.skill_repository import SkillRepository
 from backend.repositories.custom_task_repository import CustomTaskRepository
 from backend.repositories.interaction_repository import InteractionRepository
 from backend.repositories.comment_repository import CommentRepository
+from backend.repositories.utils import parse_object_id, to_object_id
+from backend.services.cache_service import CacheService
+from backend.services.user_info import get_user_info, prefetch_users, remember_user_info
+from backend.services.executors import run_concurrently
+
+# Skill categories in priority order: the first one with a keyword in the title wins
+_CATEGORY_KEYWORDS = {
+    # Programming and Technology
+    'programming': frozenset({
+        'python', 'javascript', 'react', 'node', 'programming', 'coding', 
+        'web development', 'app development', 'software', 'algorithm'
+    }),
+    # Languages
+    'languages': frozenset({
+        'spanish', 'french', 'german', 'chinese', 'japanese', 'korean', 
+        'italian', 'portuguese', 'language', 'speaking', 'conversation'
+    }),
+    # Creative Arts
+    'creative': frozenset({
+        'drawing', 'painting', 'photography', 'design', 'photoshop', 
+        'illustrator', 'art', 'artist', 'creative', 'graphic', 'designer'
+    }),
+    # Music
+    'music': frozenset({'guitar', 'piano', 'violin', 'music', 'musician', 'singing', 'composition', 'instrument'}),
+    # Business and Career
+    'business': frozenset({
+        'business', 'marketing', 'management', 'leadership', 'career', 
+        'entrepreneurship', 'sales', 'strategy'
+    }),
+    # Health and Fitness
+    'health': frozenset({'fitness', 'workout', 'yoga', 'meditation', 'health', 'healthy', 'exercise', 'diet'}),
+    # Science and Education
+    'science': frozenset({'math', 'mathematics', 'physics', 'chemistry', 'biology', 'science', 'research', 'study'}),
+    # Cooking and Food
+    'cooking': frozenset({'cooking', 'baking', 'recipe', 'cuisine', 'food', 'chef', 'culinary'}),
+}
+
+# Single words are matched against the title's tokens by set intersection;
+# the few multi-word phrases still need a substring check
+_CATEGORY_LOOKUP = tuple(
+    (
+        category,
+        frozenset(keyword for keyword in keywords if ' ' not in keyword),
+        tuple(keyword for keyword in keywords if ' ' in keyword)
+    )
+    for category, keywords in _CATEGORY_KEYWORDS.items()
+)
+
+_WORD_PATTERN = re.compile(r'[a-z]+')
+
+@lru_cache(maxsize=4096)
+def _categorize_skill(title: str) -> str:
+    """Categorize a skill based on its title; common titles recur across users"""
+    title_lower = title.lower()
+    tokens = set(_WORD_PATTERN.findall(title_lower))
+    # Let simple plurals ("recipes", "workouts") hit their singular keyword
+    tokens.update([token[:-1] for token in tokens if token.endswith('s')])
+    
+    for category, words, phrases in _CATEGORY_LOOKUP:
+        if not words.isdisjoint(tokens) or any(phrase in title_lower for phrase in phrases):
+            return category
+    
+    return 'other'
 
 class SocialService:
     """Service for managing social features - skill sharing, discovery, and community interactions"""
@@ -17,9 +81,13 @@ class SocialService:
                    visibility: str = "public", include_custom_tasks: bool = False) -> Dict[str, Any]:
         """Share a user's skill with the community"""
         
+        # Validate and convert the ids once up front
+        skill_oid = parse_object_id(skill_id, "skill id")
+        user_oid = to_object_id(user_id)
+        
         # Get the original skill
         skill_repo = SkillRepository(g.db.skills)
-        original_skill = skill_repo.find_by_id(skill_id, user_id)
+        original_skill = skill_repo.find_by_id(skill_oid, user_id)
         
         if not original_skill:
             raise ValueError("Skill not found or access denied")
@@ -27,27 +95,27 @@ class SocialService:
         # Check if skill is already shared by this user
         shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
         existing_shared = g.db.shared_skills.find_one({
-            "original_skill_id": ObjectId(skill_id),
-            "shared_by": ObjectId(user_id)
-        })
+            "original_skill_id": skill_oid,
+            "shared_by": user_oid
+        }, {"_id": 1})
         
         if existing_shared:
             raise ValueError("This skill has already been shared")
         
         # Determine category from skill title/content
-        category = SocialService._categorize_skill(original_skill.get('title', ''))
+        category = _categorize_skill(original_skill.get('title', ''))
         
         # Check for custom tasks if requested
         has_custom_tasks = False
         if include_custom_tasks:
             custom_task_repo = CustomTaskRepository(g.db.custom_tasks)
-            task_count = custom_task_repo.count_tasks_for_skill(skill_id)
+            task_count = custom_task_repo.count_tasks_for_skill(skill_oid)
             has_custom_tasks = task_count > 0
         
         # Create shared skill data
         shared_skill_data = {
-            "original_skill_id": ObjectId(skill_id),
-            "shared_by": ObjectId(user_id),
+            "original_skill_id": skill_oid,
+            "shared_by": user_oid,
             "title": original_skill["title"],
             "description": description.strip(),
             "curriculum": original_skill["curriculum"],
@@ -61,6 +129,7 @@ class SocialService:
         
         # Create the shared skill
         shared_skill = shared_skill_repo.create(shared_skill_data)
+        CacheService.invalidate_search_filters()
         
         logging.info(f"User {user_id} shared skill '{original_skill['title']}' as {shared_skill['_id']}")
         
@@ -76,18 +145,29 @@ class SocialService:
 
     @staticmethod
     def get_shared_skills(filters: Dict = None, page: int = 1, limit: int = 10) -> Dict[str, Any]:
-        """Get shared skills with pagination and filtering"""
+        """Get shared skills with pagination and filtering (cached briefly; identical for every user)"""
+        return CacheService.get_or_set_with_fallback(
+            CacheService.public_skills_key(filters, page, limit),
+            lambda: SocialService._fetch_shared_skills(filters, page, limit),
+            ttl=CacheService.PUBLIC_LIST_TTL
+        )
+
+    @staticmethod
+    def _fetch_shared_skills(filters: Optional[Dict], page: int, limit: int) -> Dict[str, Any]:
         shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
         
         # Calculate skip
         skip = (page - 1) * limit
         
         # Get skills
-        skills = shared_skill_repo.find_public_skills(skip=skip, limit=limit, filters=filters)
-        total_count = shared_skill_repo.count_public_skills(filters=filters)
+        # Get the page and the total count in one aggregation
+        skills, total_count = shared_skill_repo.find_public_skills_page(
+            skip=skip, limit=limit, filters=filters,
+            projection=SharedSkillRepository.LIST_PROJECTION, with_sharer=True
+        )
         
-        # Enrich with user information
-        enriched_skills = SocialService._enrich_skills_with_user_info(skills)
+        # User information arrives joined onto each skill
+        enriched_skills = SocialService._attach_sharer_info(skills)
         
         return {
             "skills": enriched_skills,
@@ -114,6 +194,7 @@ class SocialService:
         custom_tasks = custom_task_repo.find_by_skill(skill_id)
         
         # Organize custom tasks by day
+        prefetch_users([task["user_id"] for task in custom_tasks])
         tasks_by_day = {}
         for task in custom_tasks:
             day = task["day"]
@@ -121,28 +202,19 @@ class SocialService:
                 tasks_by_day[day] = []
             
             # Add user info to task
-            task["user_info"] = SocialService._get_user_info(str(task["user_id"]))
+            task["user_info"] = get_user_info(str(task["user_id"]))
             tasks_by_day[day].append(task)
         
-        # Get interaction stats
+        # Get interaction stats and the user's own interactions in one round-trip
         interaction_repo = InteractionRepository(g.db.plan_interactions)
-        interaction_stats = interaction_repo.get_plan_stats(skill_id)
-        
-        # Get user's interactions if user_id provided
-        user_interactions = {}
-        if user_id:
-            user_interactions = {
-                "has_liked": interaction_repo.check_user_has_liked(user_id, skill_id),
-                "has_downloaded": interaction_repo.check_user_has_downloaded(user_id, skill_id),
-                "user_rating": interaction_repo.get_user_rating_for_plan(user_id, skill_id)
-            }
+        interaction_stats, user_interactions = interaction_repo.get_plan_stats_with_user(skill_id, user_id)
         
         # Get comment stats
         comment_repo = CommentRepository(g.db.plan_comments)
         comment_stats = comment_repo.get_plan_comment_stats(skill_id)
         
         # Enrich with user info
-        skill["user_info"] = SocialService._get_user_info(str(skill["shared_by"]))
+        skill["user_info"] = get_user_info(str(skill["shared_by"]))
         
         return {
             "skill": skill,
@@ -157,24 +229,36 @@ class SocialService:
     @staticmethod
     def get_trending_skills(time_period: str = "week", limit: int = 10) -> List[Dict]:
         """Get trending skills based on recent activity"""
-        shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
-        trending_skills = shared_skill_repo.get_trending_skills(time_period, limit)
-        
-        return SocialService._enrich_skills_with_user_info(trending_skills)
+        def fetch_trending_skills() -> List[Dict]:
+            shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
+            trending_skills = shared_skill_repo.get_trending_skills(time_period, limit)
+            return SocialService._enrich_skills_with_user_info(trending_skills)
+        
+        return CacheService.get_or_set_with_fallback(
+            CacheService.trending_shared_skills_key(time_period, limit),
+            fetch_trending_skills,
+            ttl=CacheService.SHORT_TTL
+        )
 
     @staticmethod
     def get_categories() -> List[Dict]:
-        """Get skill categories with counts"""
-        shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
-        return shared_skill_repo.get_categories_with_counts()
+        """Get skill categories with counts, sharing the search filters' cached counts"""
+        categories = CacheService.get_category_counts()
+        if categories is None:
+            shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
+            categories = shared_skill_repo.get_categories_with_counts()
+            CacheService.cache_category_counts(categories)
+        return categories
 
     @staticmethod
     def download_skill(user_id: str, shared_skill_id: str) -> Dict[str, Any]:
         """Download a shared skill to user's personal collection"""
         
+        shared_skill_oid = parse_object_id(shared_skill_id, "shared skill id")
+        
         # Get the shared skill
         shared_skill_repo = SharedSkillRepository(g.db.shared_skills)
-        shared_skill = shared_skill_repo.find_by_id(shared_skill_id)
+        shared_skill = shared_skill_repo.find_by_id(shared_skill_oid)
         
         if not shared_skill:
             raise ValueError("Shared skill not found")
@@ -207,17 +291,18 @@ class SocialService:
             },
             "status": "active",
             "source": "community",  # Mark as community-downloaded
-            "source_skill_id": ObjectId(shared_skill_id)
+            "source_skill_id": shared_skill_oid
         }
         
         new_skill = skill_repo.create(skill_data)
         
-        # Record the download interaction
+        # Record the download interaction and bump the download count side by side;
+        # they touch different collections and only depend on the skill existing
         interaction_repo = InteractionRepository(g.db.plan_interactions)
-        interaction_repo.upsert_interaction(user_id, shared_skill_id, "download")
-        
-        # Update download count
-        shared_skill_repo.increment_downloads(shared_skill_id)
+        run_concurrently(
+            (interaction_repo.upsert_interaction, user_id, shared_skill_oid, "download"),
+            (shared_skill_repo.increment_downloads, shared_skill_oid)
+        )
         
         logging.info(f"User {user_id} downloaded shared skill {shared_skill_id}")
         
@@ -227,90 +312,22 @@ class SocialService:
             "message": "Skill successfully added to your collection"
         }
 
-    @staticmethod
-    def _categorize_skill(title: str) -> str:
-        """Categorize a skill based on its title"""
-        title_lower = title.lower()
-        
-        # Programming and Technology
-        if any(tech in title_lower for tech in [
-            'python', 'javascript', 'react', 'node', 'programming', 'coding', 
-            'web development', 'app development', 'software', 'algorithm'
-        ]):
-            return 'programming'
-        
-        # Languages
-        elif any(lang in title_lower for lang in [
-            'spanish', 'french', 'german', 'chinese', 'japanese', 'korean', 
-            'italian', 'portuguese', 'language', 'speaking', 'conversation'
-        ]):
-            return 'languages'
-        
-        # Creative Arts
-        elif any(art in title_lower for tech in [
-            'drawing', 'painting', 'photography', 'design', 'photoshop', 
-            'illustrator', 'art', 'creative', 'graphic'
-        ]):
-            return 'creative'
-        
-        # Music
-        elif any(music in title_lower for music in [
-            'guitar', 'piano', 'violin', 'music', 'singing', 'composition', 'instrument'
-        ]):
-            return 'music'
-        
-        # Business and Career
-        elif any(biz in title_lower for biz in [
-            'business', 'marketing', 'management', 'leadership', 'career', 
-            'entrepreneurship', 'sales', 'strategy'
-        ]):
-            return 'business'
-        
-        # Health and Fitness
-        elif any(health in title_lower for health in [
-            'fitness', 'workout', 'yoga', 'meditation', 'health', 'exercise', 'diet'
-        ]):
-            return 'health'
-        
-        # Science and Education
-        elif any(science in title_lower for science in [
-            'math', 'physics', 'chemistry', 'biology', 'science', 'research', 'study'
-        ]):
-            return 'science'
-        
-        # Cooking and Food
-        elif any(food in title_lower for food in [
-            'cooking', 'baking', 'recipe', 'cuisine', 'food', 'chef', 'culinary'
-        ]):
-            return 'cooking'
-        
-        else:
-            return 'other'
-
     @staticmethod
     def _enrich_skills_with_user_info(skills: List[Dict]) -> List[Dict]:
         """Add user information to skills"""
-        from backend.auth.models import User
+        prefetch_users([skill["shared_by"] for skill in skills])
         
         for skill in skills:
             user_id = str(skill["shared_by"])
-            skill["user_info"] = SocialService._get_user_info(user_id)
+            skill["user_info"] = get_user_info(user_id)
         
         return skills
 
     @staticmethod
-    def _get_user_info(user_id: str) -> Dict:
-        """Get basic user information"""
-        from backend.auth.models import User
-        
-        user = User.find_by_id(user_id)
-        if user:
-            return {
-                "username": user.get("username", "Unknown"),
-                "avatar_url": f"https://ui-avatars.com/api/?name={user.get('username', 'U')}&background=8B5CF6&color=fff&size=40"
-            }
-        else:
-            return {
-                "username": "Unknown User",
-                "avatar_url": "https://ui-avatars.com/api/?name=U&background=8B5CF6&color=fff&size=40"
-            }
\ No newline at end of file
+    def _attach_sharer_info(skills: List[Dict]) -> List[Dict]:
+        """Turn the server-side "sharer" join into user_info, memoizing it for the request"""
+        for skill in skills:
+            sharer = skill.pop("sharer", None)
+            skill["user_info"] = remember_user_info(skill["shared_by"], sharer[0] if sharer else None)
+        
+        return skills
@@ -4,26 +4,45 @@ from backend.repositories.skill_repository import SkillRepository
 from backend.repositories.habit_repository import HabitRepository
 from backend.repositories.checkin_repository import CheckinRepository
 from backend.repositories.skill_completion_repository import SkillCompletionRepository
+from backend.repositories.utils import coerce_datetime
+from backend.services.executors import STATS_EXECUTOR, run_concurrently
 
 
 class StatsService:
+    # Skill fields the dashboard reads; leaves out the curriculum
+    SKILL_STATS_PROJECTION = {
+        "title": 1, "skill_name": 1, "status": 1, "created_at": 1, "image_url": 1,
+        "progress.completion_percentage": 1, "progress.completed_days": 1, "progress.current_day": 1
+    }
+
     @staticmethod
     def get_user_stats(user_id: str, skill_repo: SkillRepository, habit_repo: HabitRepository, checkin_repo: CheckinRepository, completion_repo: SkillCompletionRepository) -> Dict:
         """
         Generate comprehensive user statistics for the stats dashboard
         """
         
-        skills = skill_repo.find_by_user(user_id)
-        habits = habit_repo.find_by_user(user_id)
+        skills, habits, status_summary = run_concurrently(
+            (skill_repo.find_by_user, user_id, StatsService.SKILL_STATS_PROJECTION),
+            (habit_repo.find_by_user, user_id),
+            (skill_repo.get_status_summary, user_id),
+            executor=STATS_EXECUTOR
+        )
         
-        skills_stats = StatsService._calculate_skills_stats(skills, completion_repo, user_id)
+        # Normalize timestamps once so the calculations never mix strings with datetimes
+        for item in (*skills, *habits):
+            if 'created_at' in item:
+                item['created_at'] = coerce_datetime(item['created_at'])
         
-        habits_stats = StatsService._calculate_habits_stats(habits, checkin_repo, user_id)
+        skills_stats, habits_stats, activity_timeline = run_concurrently(
+            (StatsService._calculate_skills_stats, skills, status_summary, completion_repo, user_id),
+            (StatsService._calculate_habits_stats, habits, checkin_repo, user_id),
+            (StatsService._calculate_activity_timeline, skills, habits, checkin_repo, completion_repo, user_id),
+            executor=STATS_EXECUTOR
+        )
         
+        # No queries behind this one; it runs in the request thread
         overall_stats = StatsService._calculate_overall_stats(skills, habits)
         
-        activity_timeline = StatsService._calculate_activity_timeline(skills, habits, checkin_repo, completion_repo, user_id)
-        
         return {
             "overview": overall_stats,
             "skills": skills_stats,
@@ -33,8 +52,8 @@ class StatsService:
         }
     
     @staticmethod
-    def _calculate_skills_stats(skills: List[Dict], completion_repo: SkillCompletionRepository, user_id: str) -> Dict:
-        """Calculate detailed skills statistics"""
+    def _calculate_skills_stats(skills: List[Dict], status_summary: Dict[str, Dict], completion_repo: SkillCompletionRepository, user_id: str) -> Dict:
+        """Calculate detailed skills statistics; totals come from the per-status summary"""
         if not skills:
             return {
                 "total_skills": 0,
@@ -46,12 +65,12 @@ class StatsService:
                 "completion_trend": []
             }
         
-        total_skills = len(skills)
-        active_skills = len([s for s in skills if s.get('status') == 'active'])
-        completed_skills = len([s for s in skills if s.get('status') == 'completed'])
+        total_skills = sum(summary["count"] for summary in status_summary.values())
+        active_skills = status_summary.get('active', {}).get('count', 0)
+        completed_skills = status_summary.get('completed', {}).get('count', 0)
+        total_days_completed = sum(summary["completed_days"] for summary in status_summary.values())
+        completion_sum = sum(summary["completion_sum"] for summary in status_summary.values())
         
-        completion_percentages = []
-        total_days_completed = 0
         skills_breakdown = []
         
         for skill in skills:
@@ -60,9 +79,6 @@ class StatsService:
             completed_days = progress.get('completed_days', 0)
             current_day = progress.get('current_day', 1)
             
-            completion_percentages.append(completion_percentage)
-            total_days_completed += completed_days
-            
             skills_breakdown.append({
                 "id": str(skill.get('_id')),
                 "title": skill.get('title', skill.get('skill_name', 'Unknown')),
@@ -74,7 +90,7 @@ class StatsService:
                 "image_url": skill.get('image_url')
             })
         
-        average_completion = sum(completion_percentages) / len(completion_percentages) if completion_percentages else 0
+        average_completion = completion_sum / total_skills if total_skills else 0
         
         completion_trend = StatsService._calculate_skills_completion_trend(skills, completion_repo, user_id)
         
@@ -111,6 +127,11 @@ class StatsService:
         all_longest_streaks = []
         habits_breakdown = []
         
+        # 30-day checkin counts for every habit, shared with the consistency score
+        recent_counts = checkin_repo.count_recent_by_habit(
+            user_id, [str(habit.get('_id')) for habit in habits], 30
+        )
+        
         for habit in habits:
             habit_id = str(habit.get('_id'))
             streaks = habit.get('streaks', {})
@@ -122,8 +143,6 @@ class StatsService:
             all_current_streaks.append(current_streak)
             all_longest_streaks.append(longest_streak)
             
-            recent_checkins = checkin_repo.get_recent_for_habit(habit_id, 30)
-            
             habits_breakdown.append({
                 "id": habit_id,
                 "title": habit.get('title', 'Unknown'),
@@ -135,12 +154,12 @@ class StatsService:
                 "status": habit.get('status', 'active'),
                 "created_at": habit.get('created_at'),
                 "icon_url": habit.get('icon_url'),
-                "recent_activity": len(recent_checkins)
+                "recent_activity": recent_counts.get(habit_id, 0)
             })
         
         weekly_checkins = StatsService._calculate_weekly_checkins(habits, checkin_repo, user_id)
         
-        consistency_score = StatsService._calculate_consistency_score(habits, checkin_repo, user_id)
+        consistency_score = StatsService._calculate_consistency_score(habits, recent_counts)
         
         return {
             "total_habits": total_habits,
@@ -155,24 +174,29 @@ class StatsService:
     
     @staticmethod
     def _calculate_overall_stats(skills: List[Dict], habits: List[Dict]) -> Dict:
-        """Calculate overall user progress statistics"""
-        all_items = skills + habits
-        if not all_items:
-            days_active = 0
-        else:
-            creation_dates = [item.get('created_at') for item in all_items if item.get('created_at')]
-            if creation_dates:
-                oldest_date = min(creation_dates)
-                if isinstance(oldest_date, str):
-                    oldest_date = datetime.fromisoformat(oldest_date.replace('Z', '+00:00'))
-                days_active = (datetime.utcnow() - oldest_date).days
-            else:
-                days_active = 0
+        """Calculate overall user progress statistics in one pass over skills and habits
+
+        Expects created_at already normalized to naive UTC datetimes (see get_user_stats).
+        """
+        oldest_date = None
+        total_skill_days = 0
+        for skill in skills:
+            created_at = skill.get('created_at')
+            if created_at and (oldest_date is None or created_at < oldest_date):
+                oldest_date = created_at
+            total_skill_days += skill.get('progress', {}).get('completed_days', 0)
+        
+        total_habit_checkins = 0
+        for habit in habits:
+            created_at = habit.get('created_at')
+            if created_at and (oldest_date is None or created_at < oldest_date):
+                oldest_date = created_at
+            total_habit_checkins += habit.get('streaks', {}).get('total_completions', 0)
+        
+        days_active = (datetime.utcnow() - oldest_date).days if oldest_date else 0
         
         total_skills = len(skills)
         total_habits = len(habits)
-        total_skill_days = sum([skill.get('progress', {}).get('completed_days', 0) for skill in skills])
-        total_habit_checkins = sum([habit.get('streaks', {}).get('total_completions', 0) for habit in habits])
         
         return {
             "total_skills": total_skills,
@@ -188,12 +212,12 @@ class StatsService:
         """Calculate skill completion trend over the last 7 days using real completion data"""
         trend_data = []
         base_date = datetime.utcnow() - timedelta(days=6)
+        completions_by_day = StatsService._get_completions_by_day(completion_repo, user_id, base_date, 7, include_details=False)
         
         for i in range(7):
             date = base_date + timedelta(days=i)
             
-            skill_completions = completion_repo.find_completions_by_date(user_id, date)
-            completed_days = len(skill_completions)
+            completed_days = completions_by_day.get(date.strftime("%Y-%m-%d"), {}).get('count', 0)
             
             trend_data.append({
                 "date": date.strftime("%Y-%m-%d"),
@@ -208,16 +232,12 @@ class StatsService:
         """Calculate habit checkins for the last 7 days"""
         weekly_data = []
         base_date = datetime.utcnow() - timedelta(days=6)
+        checkins_by_day = StatsService._get_checkins_by_day(habits, checkin_repo, user_id, base_date, 7)
         
         for i in range(7):
             date = base_date + timedelta(days=i)
-            day_checkins = 0
-            
-            for habit in habits:
-                habit_id = str(habit.get('_id'))
-                checkin = checkin_repo.find_by_habit_and_date(habit_id, user_id, date.date())
-                if checkin:
-                    day_checkins += 1
+            date_key = date.strftime("%Y-%m-%d")
+            day_checkins = sum(1 for habit in habits if (str(habit.get('_id')), date_key) in checkins_by_day)
             
             weekly_data.append({
                 "date": date.strftime("%Y-%m-%d"),
@@ -228,8 +248,8 @@ class StatsService:
         return weekly_data
     
     @staticmethod
-    def _calculate_consistency_score(habits: List[Dict], checkin_repo: CheckinRepository, user_id: str) -> float:
-        """Calculate overall consistency score as percentage"""
+    def _calculate_consistency_score(habits: List[Dict], recent_counts: Dict[str, int]) -> float:
+        """Calculate overall consistency score as percentage from per-habit 30-day checkin counts"""
         if not habits:
             return 0.0
         
@@ -248,9 +268,7 @@ class StatsService:
                 expected_checkins = 15  
             
             total_expected += expected_checkins
-            
-            recent_checkins = checkin_repo.get_recent_for_habit(habit_id, 30)
-            total_completed += len(recent_checkins)
+            total_completed += recent_counts.get(habit_id, 0)
         
         if total_expected == 0:
             return 0.0
@@ -262,37 +280,27 @@ class StatsService:
         """Calculate activity timeline for the last 30 days using real completion data"""
         timeline_data = []
         base_date = datetime.utcnow() - timedelta(days=29)
+        checkins_by_day = StatsService._get_checkins_by_day(habits, checkin_repo, user_id, base_date, 30)
+        completions_by_day = StatsService._get_completions_by_day(completion_repo, user_id, base_date, 30)
         
         for i in range(30):
             date = base_date + timedelta(days=i)
+            date_key = date.strftime("%Y-%m-%d")
             
-            skill_completions = completion_repo.find_completions_by_date(user_id, date)
-            skill_activity = len(skill_completions)
+            skill_rollup = completions_by_day.get(date_key, {})
+            skill_activity = skill_rollup.get('count', 0)
             
-            habit_checkins = 0
-            for habit in habits:
-                habit_id = str(habit.get('_id'))
-                checkin = checkin_repo.find_by_habit_and_date(habit_id, user_id, date.date())
-                if checkin:
-                    habit_checkins += 1
+            habit_checkins = sum(1 for habit in habits if (str(habit.get('_id')), date_key) in checkins_by_day)
             
             total_activity = skill_activity + habit_checkins
             
             max_possible = len(skills) + len(habits)
             intensity = min(total_activity / max(max_possible, 1), 1.0) if max_possible > 0 else 0
             
-            completion_details = []
-            for completion in skill_completions:
-                completion_details.append({
-                    "type": "skill",
-                    "title": completion.get('completion_data', {}).get('skill_title', 'Unknown Skill'),
-                    "day_title": completion.get('completion_data', {}).get('day_title', f"Day {completion.get('day_number', 1)}"),
-                    "completed_at": completion.get('completed_at').strftime("%H:%M") if completion.get('completed_at') else "Unknown"
-                })
+            completion_details = list(skill_rollup.get('details', []))
             
             for habit in habits:
-                habit_id = str(habit.get('_id'))
-                checkin = checkin_repo.find_by_habit_and_date(habit_id, user_id, date.date())
+                checkin = checkins_by_day.get((str(habit.get('_id')), date_key))
                 if checkin:
                     completion_details.append({
                         "type": "habit",
@@ -310,4 +318,23 @@ class StatsService:
                 "completion_details": completion_details
             })
         
-        return timeline_data
\ No newline at end of file
+        return timeline_data
+    
+    @staticmethod
+    def _get_checkins_by_day(habits: List[Dict], checkin_repo: CheckinRepository, user_id: str, base_date: datetime, days: int) -> Dict:
+        """Fetch completed checkins for every habit over the window in one query"""
+        if not habits:
+            return {}
+        
+        start_date = base_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date = start_date + timedelta(days=days)
+        habit_ids = [str(habit.get('_id')) for habit in habits]
+        return checkin_repo.find_completed_by_day(user_id, habit_ids, start_date, end_date)
+    
+    @staticmethod
+    def _get_completions_by_day(completion_repo: SkillCompletionRepository, user_id: str, base_date: datetime, days: int,
+                                include_details: bool = True) -> Dict[str, Dict]:
+        """Fetch per-day skill completion rollups over the window in one aggregation"""
+        start_date = base_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date = start_date + timedelta(days=days)
+        return completion_repo.get_daily_rollup(user_id, start_date, end_date, include_details)
@@ -0,0 +1,60 @@
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+from flask import g
+from backend.auth.models import User
+
+# Placeholder avatars for the public user info attached to skills, tasks and notifications
+_AVATAR_URL_TEMPLATE = "https://ui-avatars.com/api/?name={}&background=8B5CF6&color=fff&size=40"
+
+@lru_cache(maxsize=10_000)
+def avatar_url(username: str) -> str:
+    """Placeholder avatar URL; the same users recur across list pages"""
+    return _AVATAR_URL_TEMPLATE.format(username)
+
+UNKNOWN_AVATAR_URL = avatar_url("U")
+
+def _info_cache() -> Dict[str, Dict]:
+    """Public user info memoized for the rest of the request, keyed by str(user_id)"""
+    return g.setdefault("_user_info_cache", {})
+
+def build_user_info(user_id: str, user: Optional[Dict]) -> Dict:
+    """Shape a user document (or its absence) into the public user info"""
+    if user:
+        return {
+            "user_id": user_id,
+            "username": user.get("username", "Unknown"),
+            "avatar_url": avatar_url(user.get("username", "U"))
+        }
+    else:
+        return {
+            "user_id": user_id,
+            "username": "Unknown User",
+            "avatar_url": UNKNOWN_AVATAR_URL
+        }
+
+def remember_user_info(user_id, user: Optional[Dict]) -> Dict:
+    """User info from an already-loaded user document, memoized like get_user_info"""
+    info_cache = _info_cache()
+    user_key = str(user_id)
+    if user_key not in info_cache:
+        info_cache[user_key] = build_user_info(user_key, user)
+    return info_cache[user_key]
+
+def get_user_info(user_id) -> Dict:
+    """Get basic user information, memoized for the rest of the request"""
+    info_cache = _info_cache()
+    user_key = str(user_id)
+    if user_key not in info_cache:
+        info_cache[user_key] = build_user_info(user_key, User.find_by_id(user_key, {"username": 1}))
+    return info_cache[user_key]
+
+def prefetch_users(user_ids: Iterable) -> None:
+    """Load user info for every id not yet memoized with a single query"""
+    info_cache = _info_cache()
+    missing = {str(user_id) for user_id in user_ids} - info_cache.keys()
+    if not missing:
+        return
+
+    users = {str(user["_id"]): user for user in User.find_by_ids(missing, {"username": 1})}
+    for user_id in missing:
+        info_cache[user_id] = build_user_info(user_id, users.get(user_id))
@@ -1,5 +1,7 @@
 from typing import Dict, List, Any, Optional
+from collections import defaultdict
 import logging
+import threading
 from datetime import datetime
 from flask_socketio import SocketIO, emit, join_room, leave_room, disconnect
 from flask import request
@@ -9,12 +11,20 @@ import json
 class WebSocketService:
     """Service for managing real-time WebSocket communications"""
     
+    # Personal notifications for the same user within this window share one frame
+    BATCH_WINDOW_SECONDS = 0.05
+    BATCH_SIZE = 50
+    
     def __init__(self, socketio: SocketIO):
         self.socketio = socketio
         self.connected_users = {}  # {user_id: {session_id: socket_info}}
         self.skill_rooms = {}  # {skill_id: [user_ids]}
         self.logger = logging.getLogger(__name__)
         
+        self._batch_lock = threading.Lock()
+        self._pending_personal = defaultdict(list)  # {user_id: [queued notifications]}
+        self._open_windows = set()  # user_ids with a batch window in progress
+        
         self._setup_event_handlers()
 
     def _setup_event_handlers(self):
@@ -215,6 +225,51 @@ class WebSocketService:
         except Exception as e:
             self.logger.error(f"Error sending personal notification: {e}")
 
+    def queue_user_personal(self, user_id: str, notification_type: str, data: Dict):
+        """Send a personal notification, batching bursts for the same user
+
+        The first notification in a window goes out immediately, so light
+        traffic sees no added latency. Anything else for that user during the
+        window is sent as a single "multi" notification when the window closes
+        or BATCH_SIZE items have queued up.
+        """
+        send_now = False
+        batch = None
+        
+        with self._batch_lock:
+            if user_id not in self._open_windows:
+                self._open_windows.add(user_id)
+                send_now = True
+                timer = threading.Timer(self.BATCH_WINDOW_SECONDS, self._close_batch_window, args=(user_id,))
+                timer.daemon = True
+                timer.start()
+            else:
+                pending = self._pending_personal[user_id]
+                pending.append({"notification_type": notification_type, **data})
+                if len(pending) >= self.BATCH_SIZE:
+                    batch = self._pending_personal.pop(user_id)
+        
+        if send_now:
+            self.notify_user_personal(user_id, notification_type, data)
+        elif batch:
+            self._send_personal_batch(user_id, batch)
+
+    def _close_batch_window(self, user_id: str):
+        """Flush whatever queued up for a user during their batch window"""
+        with self._batch_lock:
+            self._open_windows.discard(user_id)
+            batch = self._pending_personal.pop(user_id, None)
+        
+        if batch:
+            self._send_personal_batch(user_id, batch)
+
+    def _send_personal_batch(self, user_id: str, items: List[Dict]):
+        if len(items) == 1:
+            item = dict(items[0])
+            self.notify_user_personal(user_id, item.pop("notification_type"), item)
+        else:
+            self.notify_user_personal(user_id, "multi", {"items": items})
+
     def broadcast_trending_update(self, trending_skills: List[Dict]):
         """Broadcast trending skills update to all connected users"""
         try:
@@ -232,6 +287,23 @@ class WebSocketService:
         except Exception as e:
             self.logger.error(f"Error broadcasting trending update: {e}")
 
+    def notify_system_update(self, update_type: str, data: Dict):
+        """Broadcast a system-level update (e.g. urgent moderation reports)"""
+        try:
+            message = {
+                'type': 'system_update',
+                'update_type': update_type,
+                'data': data,
+                'timestamp': datetime.utcnow().isoformat()
+            }
+            
+            self.socketio.emit('system_update', message, broadcast=True)
+            
+            self.logger.info(f"Broadcasted {update_type} system update")
+            
+        except Exception as e:
+            self.logger.error(f"Error broadcasting system update: {e}")
+
     def notify_custom_task_added(self, skill_id: str, day: int, task_data: Dict, user_id: str):
         """Notify skill room about new custom task"""
         try: